@@ -69,10 +69,13 @@ class Common(Configuration):
     # https://docs.djangoproject.com/en/2.0/topics/http/middleware/
     MIDDLEWARE = (
         "django.middleware.security.SecurityMiddleware",
+        "apps.core.middleware.PerformanceMiddleware",
+        "apps.core.middleware.AdmissionControlMiddleware",
         "django.contrib.sessions.middleware.SessionMiddleware",
         "django.middleware.common.CommonMiddleware",
         "django.middleware.csrf.CsrfViewMiddleware",
         "django.contrib.auth.middleware.AuthenticationMiddleware",
+        "apps.core.middleware.ProfilingMiddleware",
         "django.contrib.messages.middleware.MessageMiddleware",
         "django.middleware.clickjacking.XFrameOptionsMiddleware",
     )
@@ -111,6 +114,10 @@ class Common(Configuration):
     # Media files
     MEDIA_ROOT = join(os.path.dirname(BASE_DIR), "media")
     MEDIA_URL = "/media/"
+    # Files only handed out by views that check permissions, never under MEDIA_URL
+    PRIVATE_ROOT = os.getenv(
+        "DJANGO_PRIVATE_ROOT", join(os.path.dirname(BASE_DIR), "private")
+    )
 
     # TEMPLATES
     # ------------------------------------------------------------------------------
@@ -166,6 +173,12 @@ class Common(Configuration):
     ]
 
     # Logging
+    # Statements slower than this are logged with their plan to SLOW_QUERY_LOG_FILE
+    SLOW_QUERY_THRESHOLD_MS = float(os.getenv("DJANGO_SLOW_QUERY_THRESHOLD_MS", 200))
+    SLOW_QUERY_LOG_FILE = os.getenv(
+        "DJANGO_SLOW_QUERY_LOG_FILE",
+        join(os.path.dirname(BASE_DIR), "slow_queries.log"),
+    )
     LOGGING = {
         "version": 1,
         "disable_existing_loggers": False,
@@ -178,6 +191,7 @@ class Common(Configuration):
                 "format": "%(levelname)s %(asctime)s %(module)s %(process)d %(thread)d %(message)s"
             },
             "simple": {"format": "%(levelname)s %(message)s"},
+            "message": {"format": "%(message)s"},
         },
         "filters": {
             "require_debug_true": {
@@ -199,6 +213,13 @@ class Common(Configuration):
                 "level": "ERROR",
                 "class": "django.utils.log.AdminEmailHandler",
             },
+            "slow_queries": {
+                "level": "WARNING",
+                "class": "logging.FileHandler",
+                "filename": SLOW_QUERY_LOG_FILE,
+                "formatter": "message",
+                "delay": True,
+            },
         },
         "loggers": {
             "django": {
@@ -216,6 +237,11 @@ class Common(Configuration):
                 "propagate": False,
             },
             "django.db.backends": {"handlers": ["console"], "level": "INFO"},
+            "apps.slow_queries": {
+                "handlers": ["slow_queries"],
+                "level": "WARNING",
+                "propagate": False,
+            },
         },
     }
     LOCAL_DB_PATH = os.path.join(os.path.dirname(BASE_DIR), "local_db.sqlite3")
@@ -238,11 +264,110 @@ class Common(Configuration):
             "rest_framework.permissions.IsAuthenticated",
         ],
         "DEFAULT_AUTHENTICATION_CLASSES": (
-            "rest_framework.authentication.TokenAuthentication",
-            "dj_rest_auth.jwt_auth.JWTCookieAuthentication",
+            "apps.core.authentications.CachedTokenAuthentication",
+            "apps.core.authentications.CachedJWTCookieAuthentication",
         ),
+        # scopes of apps.eightpercent.throttling on the posting endpoints
+        "DEFAULT_THROTTLE_RATES": {
+            "posting": os.getenv("DJANGO_POSTING_THROTTLE_RATE", "20/second"),
+            "posting_global": os.getenv(
+                "DJANGO_POSTING_GLOBAL_THROTTLE_RATE", "2000/second"
+            ),
+        },
     }
 
+    # Seconds a resolved token/JWT user stays cached by the authentication classes
+    AUTH_CACHE_TIMEOUT = int(os.getenv("DJANGO_AUTH_CACHE_TIMEOUT", 60))
+
+    # Bearer token required by the /metrics endpoint (only served in DEBUG when unset)
+    METRICS_TOKEN = os.getenv("DJANGO_METRICS_TOKEN")
+
+    # Seconds a signed X-Profile header token stays valid
+    PROFILING_TOKEN_MAX_AGE = int(os.getenv("DJANGO_PROFILING_TOKEN_MAX_AGE", 300))
+
+    # Password hashing processes used by the bulk user provisioning endpoint
+    PROVISION_USERS_WORKERS = int(os.getenv("DJANGO_PROVISION_USERS_WORKERS", 1))
+
+    # Background tasks (apps.core.tasks), run by `manage.py run_tasks`
+    TASKS_ALWAYS_EAGER = strtobool(os.getenv("DJANGO_TASKS_ALWAYS_EAGER", "no"))
+    # Seconds before a task claimed by a dead worker is handed out again
+    TASKS_LEASE_SECONDS = int(os.getenv("DJANGO_TASKS_LEASE_SECONDS", 300))
+
+    # Seconds a standing order claimed by `manage.py run_standing_orders` is
+    # left to it before another run may take it over
+    STANDING_ORDERS_LEASE_SECONDS = int(
+        os.getenv("DJANGO_STANDING_ORDERS_LEASE_SECONDS", 300)
+    )
+    # Seconds before the first retry of a failed task; doubles on every retry
+    TASKS_RETRY_DELAY = int(os.getenv("DJANGO_TASKS_RETRY_DELAY", 10))
+
+    # Load shedding by apps.core.middleware.AdmissionControlMiddleware; unset
+    # limits are off
+    ADMISSION_MAX_IN_FLIGHT = (
+        int(os.environ["DJANGO_ADMISSION_MAX_IN_FLIGHT"])
+        if os.getenv("DJANGO_ADMISSION_MAX_IN_FLIGHT")
+        else None
+    )
+    ADMISSION_MAX_QUEUE_MS = int(os.getenv("DJANGO_ADMISSION_MAX_QUEUE_MS", 1000))
+    ADMISSION_RETRY_AFTER = 1
+    # feed requests wait by design and are bounded by LEDGER_FEED_MAX_WAITERS
+    ADMISSION_EXEMPT_PATHS = (
+        "/metrics",
+        "/eightpercent/transactions/events",
+        "/api/v1/eightpercent/transactions/events",
+    )
+
+    # Ledger change feed: longest long-poll, SSE stream length and heartbeat.
+    # A waiting request holds its worker thread, so they are kept short and
+    # at most LEDGER_FEED_MAX_WAITERS wait per process; more are answered
+    # with 503 and Retry-After. Keep it below the threads of gunicorn.conf.py
+    # so other requests always find one.
+    LEDGER_FEED_TIMEOUT = int(os.getenv("DJANGO_LEDGER_FEED_TIMEOUT", 10))
+    LEDGER_FEED_STREAM_SECONDS = int(os.getenv("DJANGO_LEDGER_FEED_STREAM_SECONDS", 30))
+    LEDGER_FEED_HEARTBEAT = 15
+    LEDGER_FEED_MAX_WAITERS = int(os.getenv("DJANGO_LEDGER_FEED_MAX_WAITERS", 4))
+    LEDGER_FEED_RETRY_AFTER = 5
+    # Seconds between cache checks of a waiting feed request, and between
+    # database checks in case the cache is not shared between processes
+    LEDGER_FEED_POLL_INTERVAL = 0.1
+    LEDGER_FEED_DB_INTERVAL = 5
+
+    # Idempotency-Key of the posting endpoints (apps.core.idempotency): seconds
+    # a stored response is replayed, and an attempt in progress is announced
+    # in the cache (the row lock on the key is what keeps others out)
+    IDEMPOTENCY_KEY_TTL = int(os.getenv("DJANGO_IDEMPOTENCY_KEY_TTL", 86400))
+    IDEMPOTENCY_LOCK_TIMEOUT = 60
+    IDEMPOTENCY_RETRY_AFTER = 1
+
+    # Withdrawal limits checked by WithdrawSerializer (apps.eightpercent.limits):
+    # (window seconds, max withdrawals, max amount) with None for no maximum
+    WITHDRAW_LIMITS = (
+        (
+            86400,
+            None,
+            int(os.getenv("DJANGO_WITHDRAW_DAILY_AMOUNT_LIMIT", 50_000_000)),
+        ),
+    )
+
+    # Postings kept per account for `GET account/?recent=` (apps.eightpercent.recent)
+    # and seconds an untouched entry is cached
+    RECENT_ACTIVITY_SIZE = 20
+    RECENT_ACTIVITY_TTL = 86400
+
+    # Seconds `GET account/analytics/` keeps an account's metrics cached; they
+    # are recomputed as soon as something is posted
+    ACCOUNT_ANALYTICS_TTL = 86400
+
+    # Parquet export of the ledger for analytics (`manage.py export_ledger`):
+    # target directory, and age a posting needs before it is exported
+    LEDGER_EXPORT_DIR = os.getenv(
+        "DJANGO_LEDGER_EXPORT_DIR", join(os.path.dirname(BASE_DIR), "exports")
+    )
+    LEDGER_EXPORT_LAG = 300
+
+    # Default yearly rate of `manage.py accrue_interest`, paid daily on 365 days
+    INTEREST_ANNUAL_RATE = os.getenv("DJANGO_INTEREST_ANNUAL_RATE", "0.02")
+
 
 REST_USE_JWT = True
 
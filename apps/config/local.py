@@ -23,10 +23,12 @@ class Local(Common):
     EMAIL_PORT = 1025
     EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 
-    REST_FRAMEWORK = Common.REST_FRAMEWORK
-    REST_FRAMEWORK["DEFAULT_AUTHENTICATION_CLASSES"] = [  # noqa
-        "apps.core.authentications.AutoLoginAuthentication",
-    ]
+    REST_FRAMEWORK = {
+        **Common.REST_FRAMEWORK,
+        "DEFAULT_AUTHENTICATION_CLASSES": [
+            "apps.core.authentications.AutoLoginAuthentication",
+        ],
+    }
 
     LOCAL_DB_PATH = Common.LOCAL_DB_PATH
     DATABASES = {
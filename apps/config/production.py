@@ -33,10 +33,24 @@ class Production(Common):
     # AWS_HEADERS = {
     #     "Cache-Control": "max-age=86400, s-maxage=86400, must-revalidate",
     # }
-    REST_FRAMEWORK = Common.REST_FRAMEWORK
-    REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"] = [  # noqa
-        "rest_framework.renderers.JSONRenderer",
-    ]
+    REST_FRAMEWORK = {
+        **Common.REST_FRAMEWORK,
+        "DEFAULT_RENDERER_CLASSES": [
+            "rest_framework.renderers.JSONRenderer",
+        ],
+    }
+
+    # CACHES
+    # ------------------------------------------------------------------------------
+    # https://docs.djangoproject.com/en/dev/ref/settings/#caches
+    # Shared by every worker: the auth cache, the throttles, the limits and
+    # the feed versions are only correct when all processes see one cache.
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.memcached.PyMemcacheCache",
+            "LOCATION": os.getenv("DJANGO_CACHE_LOCATION", "memcached:11211"),
+        }
+    }
 
     DATABASES = {
         "default": dj_database_url.config(
@@ -27,6 +27,8 @@ class Test(Common):
         "default": {
             "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
             "LOCATION": "",
+            # the tests run in one process
+            "SHARED": True,
         }
     }
 
@@ -48,13 +50,35 @@ class Test(Common):
         )
     ]
 
+    # LOGGING
+    # ------------------------------------------------------------------------------
+    # slow statements are still counted by apps.core.slow_queries, but not
+    # appended to SLOW_QUERY_LOG_FILE in the working tree
+    LOGGING = {
+        **Common.LOGGING,
+        "handlers": {
+            **Common.LOGGING["handlers"],
+            "slow_queries": {"class": "logging.NullHandler"},
+        },
+    }
+
     # EMAIL
     # ------------------------------------------------------------------------------
     # https://docs.djangoproject.com/en/dev/ref/settings/#email-backend
     EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
 
-    REST_FRAMEWORK = Common.REST_FRAMEWORK
-    REST_FRAMEWORK["DEFAULT_AUTHENTICATION_CLASSES"] = [  # noqa
-        "rest_framework.authentication.SessionAuthentication",
-        "rest_framework.authentication.TokenAuthentication",
-    ]
+    # a copy: Common.REST_FRAMEWORK is shared by every configuration
+    REST_FRAMEWORK = {
+        **Common.REST_FRAMEWORK,
+        "DEFAULT_AUTHENTICATION_CLASSES": [
+            "rest_framework.authentication.SessionAuthentication",
+            "apps.core.authentications.CachedTokenAuthentication",
+        ],
+        "DEFAULT_THROTTLE_RATES": {
+            "posting": None,
+            "posting_global": None,
+        },
+    }
+
+    # run tasks inline
+    TASKS_ALWAYS_EAGER = True
@@ -1,6 +1,17 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.utils.module_loading import autodiscover_modules
 
 
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.core"
+
+    def ready(self):
+        from apps.core.slow_queries import install_slow_query_wrapper
+
+        connection_created.connect(
+            install_slow_query_wrapper, dispatch_uid="apps.core.slow_queries"
+        )
+        # register the @task functions of every app
+        autodiscover_modules("tasks")
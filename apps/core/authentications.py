@@ -1,7 +1,16 @@
+import copy
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
 
+from dj_rest_auth.jwt_auth import JWTCookieAuthentication
 from rest_framework import exceptions
-from rest_framework.authentication import BaseAuthentication
+from rest_framework.authentication import BaseAuthentication, TokenAuthentication
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from apps.core.caches import is_shared, token_cache_key, user_cache_key
 
 
 class AutoLoginAuthentication(BaseAuthentication):
@@ -12,3 +21,65 @@ class AutoLoginAuthentication(BaseAuthentication):
         except User.DoesNotExist:
             raise exceptions.AuthenticationFailed("No such user")
         return (user, None)
+
+
+def _detach(instance):
+    """Copy ``instance`` without its related-object cache before caching it."""
+    instance = copy.copy(instance)
+    instance._state.fields_cache = {}
+    return instance
+
+
+def cache_user(user):
+    cache.set(user_cache_key(user.pk), _detach(user), settings.AUTH_CACHE_TIMEOUT)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication that keeps the resolved token and user in the cache
+    for ``AUTH_CACHE_TIMEOUT`` seconds, so warm requests cost no queries.
+
+    Entries are dropped by the signal receivers in ``apps.users.models``
+    whenever the user or the token changes. Those only reach the other
+    workers through a shared cache, so with a process-local one nothing is
+    cached.
+    """
+
+    def authenticate_credentials(self, key):
+        if not is_shared():
+            return super().authenticate_credentials(key)
+        token = cache.get(token_cache_key(key))
+        user = cache.get(user_cache_key(token.user_id)) if token else None
+        if user is None:
+            user, token = super().authenticate_credentials(key)
+            cache.set(token_cache_key(key), _detach(token), settings.AUTH_CACHE_TIMEOUT)
+            cache_user(user)
+            return (user, token)
+
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(_("User inactive or deleted."))
+        token.user = user
+        return (user, token)
+
+
+class CachedJWTCookieAuthentication(JWTCookieAuthentication):
+    """
+    JWTCookieAuthentication that caches the user keyed on the JWT subject,
+    under the same conditions as ``CachedTokenAuthentication``.
+    """
+
+    def get_user(self, validated_token):
+        if not is_shared():
+            return super().get_user(validated_token)
+        user_id = validated_token.get(jwt_settings.USER_ID_CLAIM)
+        user = cache.get(user_cache_key(user_id)) if user_id else None
+        if user is None:
+            user = super().get_user(validated_token)
+            cache_user(user)
+            return user
+
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(
+                _("User is inactive"), code="user_inactive"
+            )
+        return user
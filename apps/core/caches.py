@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.cache import cache
+
+# Backends whose entries are only seen by the process that wrote them
+PROCESS_LOCAL_BACKENDS = (
+    "django.core.cache.backends.dummy.DummyCache",
+    "django.core.cache.backends.locmem.LocMemCache",
+)
+
+
+def is_shared(alias="default") -> bool:
+    """
+    Whether every process sees the entries of the ``alias`` cache. A
+    process-local backend can declare it with ``"SHARED": True`` when the
+    site runs in a single process, as the tests do.
+    """
+    options = settings.CACHES[alias]
+    return options.get("SHARED", options["BACKEND"] not in PROCESS_LOCAL_BACKENDS)
+
+
+def user_cache_key(user_id) -> str:
+    return f"auth:user:{user_id}"
+
+
+def token_cache_key(key) -> str:
+    return f"auth:token:{key}"
+
+
+def invalidate_user(user_id):
+    cache.delete(user_cache_key(user_id))
+
+
+def invalidate_token(key):
+    cache.delete(token_cache_key(key))
@@ -0,0 +1,230 @@
+import functools
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import (
+    DatabaseError,
+    IntegrityError,
+    OperationalError,
+    connection,
+    transaction,
+)
+from django.db.models import F
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.response import Response
+
+from apps.core.models import IdempotencyKey
+from apps.core.utils import LRUCache
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+
+# Finished responses of this process, in front of the shared cache; entries
+# carry the ``expires_at`` of their key
+_local = LRUCache(10000)
+
+
+def cache_key(user_pk, key):
+    return f"idempotency:{user_pk}:{hashlib.sha256(key.encode()).hexdigest()}"
+
+
+def request_hash_of(method, path, data):
+    body = json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder)
+    return hashlib.sha256(f"{method} {path}\n{body}".encode()).hexdigest()
+
+
+def _in_progress():
+    return Response(
+        {"error": "A request with this key is still in progress."},
+        status=status.HTTP_409_CONFLICT,
+        headers={"Retry-After": str(settings.IDEMPOTENCY_RETRY_AFTER)},
+    )
+
+
+def _replay(entry, fingerprint):
+    if entry["request_hash"] != fingerprint:
+        return Response(
+            {"error": f"{HEADER} was already used for a different request."},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    if entry["status"] == IdempotencyKey.Status.IN_FLIGHT:
+        return _in_progress()
+    response = Response(entry["body"], status=entry["response_status"])
+    response["Idempotent-Replayed"] = "true"
+    return response
+
+
+def _remember(ckey, entry):
+    _local.set(ckey, entry)
+    cache.set(ckey, entry, timeout=settings.IDEMPOTENCY_KEY_TTL)
+
+
+def _remembered(ckey):
+    """The entry of ``ckey`` in the local LRU or the cache, unless expired."""
+    entry = _local.get(ckey) or cache.get(ckey)
+    if entry is not None and entry["expires_at"] <= timezone.now():
+        _local.pop(ckey)
+        return None
+    return entry
+
+
+def _entry(record):
+    return {
+        "request_hash": record.request_hash,
+        "status": record.status,
+        "response_status": record.response_status,
+        "body": record.response_body,
+        "expires_at": record.expires_at,
+    }
+
+
+def _insert(request, key, fingerprint):
+    """
+    Insert the in-flight row of a first attempt at ``key``, committed on its
+    own so concurrent attempts find it; nothing when the row exists.
+    """
+    now = timezone.now()
+    try:
+        with transaction.atomic():
+            IdempotencyKey.objects.create(
+                user=request.user,
+                key=key,
+                request_hash=fingerprint,
+                created_at=now,
+                expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL),
+            )
+    except IntegrityError:  # a concurrent attempt got there first
+        pass
+    except OperationalError:  # SQLite: another attempt holds the write lock
+        pass
+
+
+def _lock(keys):
+    """
+    Lock the key's row until the end of the transaction and return it, or
+    ``None`` while another attempt holds the lock. An attempt that dies
+    releases it with its transaction.
+
+    Without row locks (SQLite) the attempt takes the database's write lock
+    instead, with an update of the row; a concurrent one waits for it up to
+    the busy timeout and then fails with "database is locked".
+    """
+    try:
+        with transaction.atomic():
+            if not connection.features.has_select_for_update:
+                keys.update(status=F("status"))
+            return keys.select_for_update(nowait=True).get()
+    except DatabaseError:
+        return None
+
+
+def _release(keys):
+    """Delete the in-flight row of a failed attempt, unless it was taken over."""
+    try:
+        with transaction.atomic():
+            record = _lock(keys)
+            if record is not None and record.status == IdempotencyKey.Status.IN_FLIGHT:
+                record.delete()
+    except IdempotencyKey.DoesNotExist:
+        pass
+
+
+def _attempt(keys, ckey, fingerprint, handler):
+    """
+    Run ``handler()`` in the transaction holding the lock on the key's row,
+    or answer like ``_replay`` when the key is taken. Returns ``None`` when
+    the row is gone, deleted by ``_release`` of a failed attempt.
+    """
+    with transaction.atomic():
+        try:
+            record = _lock(keys)
+        except IdempotencyKey.DoesNotExist:
+            return None
+        if record is None:  # another attempt is running
+            try:
+                return _replay(_entry(keys.get()), fingerprint)
+            except IdempotencyKey.DoesNotExist:  # its insert is not committed
+                return _in_progress()
+        now = timezone.now()
+        if record.status == IdempotencyKey.Status.DONE and record.expires_at > now:
+            _remember(ckey, _entry(record))
+            return _replay(_entry(record), fingerprint)
+
+        # a first attempt, the retry of one that died, or an expired key
+        record.request_hash = fingerprint
+        record.status = IdempotencyKey.Status.IN_FLIGHT
+        record.created_at = now
+        record.expires_at = now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+        cache.set(ckey, _entry(record), timeout=settings.IDEMPOTENCY_LOCK_TIMEOUT)
+        response = handler()
+        record.status = IdempotencyKey.Status.DONE
+        record.response_status = response.status_code
+        record.response_body = response.data
+        record.save()
+    _remember(ckey, _entry(record))
+    return response
+
+
+def run_idempotently(request, handler):
+    """
+    Run ``handler()`` at most once per ``Idempotency-Key`` header of the user.
+
+    The attempt holds a row lock on the key in the transaction that runs
+    ``handler``, and the response is stored with the key before it commits.
+    Retries get it replayed from a local LRU, the cache or the
+    ``idempotency_keys`` table without running ``handler`` again. A retry
+    while the first attempt still holds the lock gets a 409, one with a
+    different body a 422. Only a key whose lock can be taken is run again:
+    after its attempt failed, died or the key expired. Requests without the
+    header run as usual.
+    """
+    key = request.headers.get(HEADER)
+    if key is None:
+        return handler()
+    if not key or len(key) > MAX_KEY_LENGTH:
+        return Response(
+            {"error": f"{HEADER} must be 1 to {MAX_KEY_LENGTH} characters."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    ckey = cache_key(request.user.pk, key)
+    fingerprint = request_hash_of(request.method, request.path, request.data)
+    entry = _remembered(ckey)
+    if entry is not None:
+        return _replay(entry, fingerprint)
+
+    keys = IdempotencyKey.objects.filter(user=request.user, key=key)
+    record = keys.first()
+    if record is not None and record.status == IdempotencyKey.Status.DONE:
+        entry = _entry(record)
+        if record.expires_at > timezone.now():
+            _remember(ckey, entry)
+            return _replay(entry, fingerprint)
+    while True:
+        if record is None:
+            _insert(request, key, fingerprint)
+        try:
+            response = _attempt(keys, ckey, fingerprint, handler)
+        except BaseException:
+            cache.delete(ckey)
+            _release(keys)
+            raise
+        if response is not None:
+            return response
+        record = None
+
+
+def idempotent(method):
+    """Decorate a view's ``create`` to honour the ``Idempotency-Key`` header."""
+
+    @functools.wraps(method)
+    def wrapper(self, request, *args, **kwargs):
+        return run_idempotently(request, lambda: method(self, request, *args, **kwargs))
+
+    return wrapper
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from apps.core.tasks import prune_idempotency_keys
+
+
+class Command(BaseCommand):
+    help = "Delete expired Idempotency-Key responses (run it from cron)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=10000)
+        parser.add_argument(
+            "--enqueue",
+            action="store_true",
+            help="Queue the cleanup for run_tasks instead of running it here",
+        )
+
+    def handle(self, *args, **options):
+        if options["enqueue"]:
+            prune_idempotency_keys.delay(batch_size=options["batch_size"])
+            self.stdout.write("Queued the cleanup.")
+            return
+        deleted = prune_idempotency_keys(batch_size=options["batch_size"])
+        self.stdout.write(f"Deleted {deleted} expired keys.")
@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.core.parallel import process_pool, thread_pool
+from apps.core.tasks import claim_tasks, execute_unit, group_tasks, record_outcome
+
+
+class Command(BaseCommand):
+    help = "Run queued background tasks"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=1)
+        parser.add_argument(
+            "--processes",
+            action="store_true",
+            help="Run tasks in worker processes instead of threads",
+        )
+        parser.add_argument(
+            "--claim", type=int, default=100, help="Tasks claimed per round"
+        )
+        parser.add_argument(
+            "--sleep", type=float, default=1.0, help="Seconds to wait when idle"
+        )
+        parser.add_argument(
+            "--once", action="store_true", help="Exit when the queue is empty"
+        )
+
+    def handle(self, *args, **options):
+        pool = process_pool if options["processes"] else thread_pool
+        with pool(options["workers"]) as pool_map:
+            while True:
+                tasks = claim_tasks(options["claim"])
+                if not tasks:
+                    if options["once"]:
+                        return
+                    time.sleep(options["sleep"])
+                    continue
+
+                started = time.perf_counter()
+                failed = 0
+                for ids, error in pool_map(execute_unit, group_tasks(tasks)):
+                    record_outcome(ids, error)
+                    if error is not None:
+                        failed += len(ids)
+                        self.stderr.write(f"Tasks {ids} failed:\n{error}")
+                self.stdout.write(
+                    f"Ran {len(tasks)} task(s), {failed} failed, "
+                    f"in {time.perf_counter() - started:.3f}s"
+                )
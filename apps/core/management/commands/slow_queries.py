@@ -0,0 +1,73 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.slow_queries import SlowQueryLog
+
+
+class Command(BaseCommand):
+    help = "Summarize the slow-query log by statement fingerprint"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--file",
+            default=None,
+            help="Log to read (default: SLOW_QUERY_LOG_FILE)",
+        )
+        parser.add_argument("--top", type=int, default=20)
+        parser.add_argument(
+            "--order", choices=("total", "count", "max"), default="total"
+        )
+        parser.add_argument(
+            "--max-fingerprints",
+            type=int,
+            default=10000,
+            help="Fingerprints kept in memory while reading",
+        )
+        parser.add_argument("--json", action="store_true", help="Print JSON")
+
+    def handle(self, *args, **options):
+        path = options["file"] or settings.SLOW_QUERY_LOG_FILE
+        log = SlowQueryLog(max_entries=options["max_fingerprints"])
+        skipped = 0
+        try:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        log.record(
+                            entry["fingerprint"],
+                            entry["duration_ms"] / 1000,
+                            view=entry.get("view"),
+                            sql=entry.get("sql"),
+                            plan=entry.get("plan"),
+                        )
+                    except (ValueError, KeyError, TypeError):
+                        skipped += 1
+        except OSError as e:
+            raise CommandError(f"Cannot read {path}: {e}")
+
+        top = log.top(options["top"], order=options["order"])
+        if options["json"]:
+            self.stdout.write(json.dumps(top, indent=2, ensure_ascii=False))
+            return
+
+        for entry in top:
+            views = ", ".join(
+                f"{view} ({count})" for view, count in entry["views"].items()
+            )
+            self.stdout.write(
+                f"[{entry['id']}] {entry['count']} calls, "
+                f"total {entry['total'] * 1000:.1f}ms, "
+                f"avg {entry['total'] / entry['count'] * 1000:.1f}ms, "
+                f"max {entry['max'] * 1000:.1f}ms"
+            )
+            self.stdout.write(f"  views: {views or '-'}")
+            self.stdout.write(f"  {entry['fingerprint']}")
+            if entry["plan"]:
+                for line in entry["plan"].splitlines():
+                    self.stdout.write(f"    {line}")
+            self.stdout.write("")
+        if skipped:
+            self.stderr.write(f"{skipped} malformed line(s) skipped")
@@ -0,0 +1,167 @@
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.http import JsonResponse
+
+from apps.core.metrics import DURATION_BUCKETS, QUERY_BUCKETS, registry
+from apps.core.profiling import is_valid_profile_token, profile_request
+from apps.core.slow_queries import set_current_view
+
+
+class QueryTimer:
+    """``execute_wrapper`` that counts statements and their time."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+
+
+class PerformanceMiddleware:
+    """
+    Time every request and split it into SQL, view and render time.
+
+    The split goes to the ``Server-Timing`` header and into per-view
+    histograms exposed by ``apps.core.views.metrics``. The resolved view is
+    also what the slow-query log reports as the caller.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        timer = QueryTimer()
+        request._render_duration = 0.0
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            stack.callback(set_current_view, None)
+            response = self.get_response(request)
+        total = time.perf_counter() - started
+
+        render = request._render_duration
+        app = max(total - timer.duration - render, 0.0)
+        response["Server-Timing"] = ", ".join(
+            [
+                f'db;dur={timer.duration * 1000:.3f};desc="{timer.count} queries"',
+                f"app;dur={app * 1000:.3f}",
+                f"render;dur={render * 1000:.3f}",
+                f"total;dur={total * 1000:.3f}",
+            ]
+        )
+
+        match = request.resolver_match
+        view = match.view_name if match else "unmatched"
+        if view != "metrics":
+            for name, buckets, value in (
+                ("http_request_duration_seconds", DURATION_BUCKETS, total),
+                ("http_db_duration_seconds", DURATION_BUCKETS, timer.duration),
+                ("http_render_duration_seconds", DURATION_BUCKETS, render),
+                ("http_db_queries", QUERY_BUCKETS, timer.count),
+            ):
+                registry.histogram(name, view, buckets).observe(value)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        set_current_view(request.resolver_match.view_name)
+
+    def process_template_response(self, request, response):
+        # DRF responses render right after this hook; the callback marks the end
+        started = time.perf_counter()
+
+        def rendered(response):
+            request._render_duration = time.perf_counter() - started
+
+        response.add_post_render_callback(rendered)
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Profile single requests on demand.
+
+    A request is profiled when it carries an ``X-Profile`` header with a token
+    from ``manage.py profile_token``, or ``?profile=1`` from a staff session.
+    Other requests cost two dictionary lookups, so it is safe to leave on.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if self.is_triggered(request):
+            return profile_request(request, self.get_response)
+        return self.get_response(request)
+
+    def is_triggered(self, request):
+        token = request.META.get("HTTP_X_PROFILE")
+        if token is not None:
+            return is_valid_profile_token(token)
+        if "profile=" in request.META.get("QUERY_STRING", ""):
+            return request.GET.get("profile") == "1" and request.user.is_staff
+        return False
+
+
+class AdmissionControlMiddleware:
+    """
+    Shed load before it reaches the database.
+
+    A request is answered with 503 and ``Retry-After`` right away when
+    ``ADMISSION_MAX_IN_FLIGHT`` requests are already running in this
+    process, or when it waited longer than ``ADMISSION_MAX_QUEUE_MS`` in
+    front of it according to the proxy's ``X-Request-Start`` header.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, request):
+        if request.path in settings.ADMISSION_EXEMPT_PATHS:
+            return self.get_response(request)
+        if self.queued_too_long(request):
+            return self.reject()
+
+        limit = settings.ADMISSION_MAX_IN_FLIGHT
+        with self._lock:
+            if limit is not None and self.in_flight >= limit:
+                return self.reject()
+            self.in_flight += 1
+        try:
+            return self.get_response(request)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    @staticmethod
+    def queued_too_long(request):
+        limit = settings.ADMISSION_MAX_QUEUE_MS
+        header = request.META.get("HTTP_X_REQUEST_START")
+        if limit is None or not header:
+            return False
+        try:
+            started = float(header.strip().removeprefix("t="))
+        except ValueError:
+            return False
+        # seconds (nginx $msec), milliseconds or microseconds
+        while started > 1e11:
+            started /= 1000
+        return (time.time() - started) * 1000 > limit
+
+    @staticmethod
+    def reject():
+        response = JsonResponse({"detail": "Server is busy, retry later."}, status=503)
+        response["Retry-After"] = str(settings.ADMISSION_RETRY_AFTER)
+        return response
@@ -0,0 +1,77 @@
+import json
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+# Below this many rows an exact COUNT(*) is cheap enough to run.
+EXACT_COUNT_LIMIT = 100_000
+
+
+def _table_estimate(connection, table):
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)",
+                [table],
+            )
+        elif connection.vendor == "sqlite":
+            # filled by ANALYZE; the first number is the row count
+            cursor.execute("SELECT name FROM sqlite_master WHERE name = 'sqlite_stat1'")
+            if cursor.fetchone() is None:
+                return None
+            cursor.execute(
+                "SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1", [table]
+            )
+        else:
+            return None
+        row = cursor.fetchone()
+    if row is None or row[0] is None:
+        return None
+    estimate = int(str(row[0]).split()[0])
+    return estimate if estimate >= 0 else None
+
+
+def _plan_estimate(connection, queryset):
+    if connection.vendor != "postgresql":
+        return None
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def estimate_count(queryset):
+    """
+    Row count of ``queryset`` from table statistics or the query planner.
+
+    Unfiltered querysets use the table statistics (``pg_class.reltuples``,
+    ``sqlite_stat1``); filtered ones use the planner's row estimate where
+    the database exposes it. Returns ``None`` when no estimate is available.
+    """
+    connection = connections[queryset.db]
+    if not queryset.query.where:
+        return _table_estimate(connection, queryset.model._meta.db_table)
+    return _plan_estimate(connection, queryset)
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that trusts estimated counts of large querysets.
+
+    Small results, or results without an estimate, are counted exactly.
+    Page numbers past the real end simply come back empty.
+    """
+
+    exact_count_limit = EXACT_COUNT_LIMIT
+
+    @cached_property
+    def count(self):
+        if hasattr(self.object_list, "query"):
+            estimate = estimate_count(self.object_list)
+            if estimate is not None and estimate >= self.exact_count_limit:
+                return estimate
+        return super().count
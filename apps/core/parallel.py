@@ -0,0 +1,57 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.db import connections
+
+
+def setup_worker():
+    """
+    Process pool initializer.
+
+    Spawned workers start without Django configured; forked workers inherit
+    the parent's database connections, which must never be reused.
+    """
+    from django.apps import apps
+
+    if not apps.ready:
+        import configurations
+
+        configurations.setup()
+
+    for conn in connections.all():
+        conn.connection = None
+
+
+def _local_map(func, iterable, chunksize=1):
+    return map(func, iterable)
+
+
+@contextmanager
+def process_pool(workers=None):
+    """
+    Yield a ``map(func, iterable)`` callable backed by a process pool.
+
+    With ``workers`` <= 1 the work runs in the current process, which keeps
+    tests and small jobs free of the pool start-up cost.
+    """
+    workers = os.cpu_count() if workers is None else workers
+    if workers <= 1:
+        yield _local_map
+        return
+
+    # a forked child must not share (or close) the parent's sockets
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=workers, initializer=setup_worker) as pool:
+        yield pool.map
+
+
+@contextmanager
+def thread_pool(workers):
+    """``process_pool`` counterpart for I/O-bound work; threads own connections."""
+    if workers <= 1:
+        yield _local_map
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        yield pool.map
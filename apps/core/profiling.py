@@ -0,0 +1,138 @@
+import cProfile
+import io
+import marshal
+import pstats
+import threading
+import time
+import uuid
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core import signing
+from django.core.files.base import ContentFile
+from django.db import connections
+
+from apps.core.utils import private_storage
+
+PROFILE_SALT = "apps.core.profiling"
+PROFILE_DIR = "profiles"
+
+# cProfile cannot profile two requests of one process at once
+_profiling = threading.Lock()
+
+
+def make_profile_token():
+    """Signed value for the profiling header; valid for PROFILING_TOKEN_MAX_AGE."""
+    return signing.TimestampSigner(salt=PROFILE_SALT).sign(uuid.uuid4().hex)
+
+
+def is_valid_profile_token(value):
+    try:
+        signing.TimestampSigner(salt=PROFILE_SALT).unsign(
+            value, max_age=settings.PROFILING_TOKEN_MAX_AGE
+        )
+    except signing.BadSignature:
+        return False
+    return True
+
+
+class QueryRecorder:
+    """``execute_wrapper`` keeping each statement, its params and duration."""
+
+    def __init__(self, alias):
+        self.alias = alias
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, params, many, time.perf_counter() - started))
+
+
+def explain(alias, sql, params):
+    connection = connections[alias]
+    prefix = connection.ops.explain_query_prefix()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f"{prefix} {sql}", params)
+            return "\n".join(" ".join(map(str, row)) for row in cursor.fetchall())
+    except Exception as e:  # the plan is best effort
+        return f"EXPLAIN failed: {e}"
+
+
+def describe_params(params, many):
+    """The parameter types of a statement; the values may hold secrets or PII."""
+    if many:
+        return "executemany, redacted"
+    if isinstance(params, dict):
+        return repr({name: type(value).__name__ for name, value in params.items()})
+    return repr([type(value).__name__ for value in params or ()])
+
+
+def build_report(request, response, profiler, recorders, elapsed):
+    stats = io.StringIO()
+    pstats.Stats(profiler, stream=stats).sort_stats("cumulative").print_stats(60)
+
+    lines = [
+        f"{request.method} {request.get_full_path()} -> {response.status_code}",
+        f"total {elapsed * 1000:.3f}ms",
+        "",
+    ]
+    for recorder in recorders:
+        for index, (sql, params, many, duration) in enumerate(recorder.queries, 1):
+            lines += [
+                f"-- [{recorder.alias}] query {index}: {duration * 1000:.3f}ms",
+                sql,
+                f"-- params: {describe_params(params, many)}",
+            ]
+            if not many and sql.lstrip().upper().startswith("SELECT"):
+                lines += ["-- plan:", explain(recorder.alias, sql, params)]
+            lines.append("")
+    lines += ["", stats.getvalue()]
+    return "\n".join(lines)
+
+
+def profile_request(request, get_response):
+    """
+    Run ``get_response`` under cProfile with every SQL statement recorded.
+
+    Stores ``<id>.prof`` (pstats) and ``<id>.txt`` (SQL with the parameter
+    values left out, EXPLAIN plans and the top of the profile) under
+    ``PRIVATE_ROOT/profiles``, served by ``profile_download``, and returns the
+    response tagged with an ``X-Profile-Id`` header. When another request of
+    this process is being profiled the request runs unprofiled.
+    """
+    if not _profiling.acquire(blocking=False):
+        return get_response(request)
+
+    try:
+        recorders = [QueryRecorder(alias) for alias in connections]
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for recorder in recorders:
+                stack.enter_context(
+                    connections[recorder.alias].execute_wrapper(recorder)
+                )
+            stack.callback(profiler.disable)
+            profiler.enable()
+            response = get_response(request)
+        elapsed = time.perf_counter() - started
+
+        profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        profiler.create_stats()
+        storage = private_storage()
+        storage.save(
+            f"{PROFILE_DIR}/{profile_id}.prof",
+            ContentFile(marshal.dumps(profiler.stats)),
+        )
+        report = build_report(request, response, profiler, recorders, elapsed)
+        storage.save(
+            f"{PROFILE_DIR}/{profile_id}.txt", ContentFile(report.encode("utf-8"))
+        )
+        response["X-Profile-Id"] = profile_id
+        return response
+    finally:
+        _profiling.release()
@@ -0,0 +1,149 @@
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+
+from django.conf import settings
+
+from apps.core.profiling import explain
+
+logger = logging.getLogger("apps.slow_queries")
+
+_local = threading.local()
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*(?:%s|\?)\s*,?)+\)", re.IGNORECASE)
+_SPACE = re.compile(r"\s+")
+_EXPLAINABLE = ("SELECT", "UPDATE", "DELETE")
+
+
+def fingerprint(sql):
+    """Normalize ``sql`` so statements differing only in literals group together."""
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = sql.replace("%s", "?")
+    sql = _IN_LIST.sub("IN (...)", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+def fingerprint_id(normalized):
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:12]
+
+
+def set_current_view(name):
+    _local.view = name
+
+
+def current_view():
+    return getattr(_local, "view", None)
+
+
+class SlowQueryLog:
+    """
+    Aggregate of slow statements by fingerprint.
+
+    Holds at most ``max_entries`` fingerprints; when full, the one with the
+    least total time is evicted, so the top offenders always stay.
+    """
+
+    def __init__(self, max_entries=500):
+        self.max_entries = max_entries
+        self.entries = {}
+        self._lock = threading.Lock()
+
+    def record(self, normalized, duration, view=None, sql=None, plan=None):
+        key = fingerprint_id(normalized)
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                if len(self.entries) >= self.max_entries:
+                    del self.entries[
+                        min(self.entries, key=lambda k: self.entries[k]["total"])
+                    ]
+                entry = self.entries[key] = {
+                    "fingerprint": normalized,
+                    "count": 0,
+                    "total": 0.0,
+                    "max": 0.0,
+                    "views": {},
+                    "sample": sql,
+                    "plan": None,
+                }
+            entry["count"] += 1
+            entry["total"] += duration
+            if duration >= entry["max"]:
+                entry["max"] = duration
+                entry["sample"] = sql or entry["sample"]
+            if view and (view in entry["views"] or len(entry["views"]) < 20):
+                entry["views"][view] = entry["views"].get(view, 0) + 1
+            if plan:
+                entry["plan"] = plan
+        return key
+
+    def has_plan(self, normalized):
+        entry = self.entries.get(fingerprint_id(normalized))
+        return entry is not None and entry["plan"] is not None
+
+    def top(self, limit=20, order="total"):
+        with self._lock:
+            entries = [dict(entry, id=key) for key, entry in self.entries.items()]
+        return sorted(entries, key=lambda entry: entry[order], reverse=True)[:limit]
+
+
+slow_query_log = SlowQueryLog()
+
+
+def _explain(connection, sql, params):
+    # the EXPLAIN goes through this wrapper too; don't time or explain it
+    _local.explaining = True
+    try:
+        return explain(connection.alias, sql, params)
+    finally:
+        _local.explaining = False
+
+
+def slow_query_wrapper(execute, sql, params, many, context):
+    """
+    ``execute_wrapper`` logging statements slower than
+    ``SLOW_QUERY_THRESHOLD_MS`` with an EXPLAIN plan per new fingerprint.
+    """
+    if getattr(_local, "explaining", False):
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    result = execute(sql, params, many, context)
+    duration = time.perf_counter() - started
+    if duration * 1000 < settings.SLOW_QUERY_THRESHOLD_MS:
+        return result
+
+    normalized = fingerprint(sql)
+    plan = None
+    explainable = sql.lstrip()[:6].upper() in _EXPLAINABLE
+    if not many and explainable and not slow_query_log.has_plan(normalized):
+        plan = _explain(context["connection"], sql, params)
+    view = current_view()
+    key = slow_query_log.record(normalized, duration, view=view, sql=sql, plan=plan)
+    logger.warning(
+        json.dumps(
+            {
+                "id": key,
+                "fingerprint": normalized,
+                "duration_ms": round(duration * 1000, 3),
+                "view": view,
+                "sql": sql,
+                "plan": plan,
+            },
+            ensure_ascii=False,
+        )
+    )
+    return result
+
+
+def install_slow_query_wrapper(sender, connection, **kwargs):
+    """``connection_created`` receiver adding ``slow_query_wrapper`` once."""
+    if slow_query_wrapper not in connection.execute_wrappers:
+        # first in line: execute_wrapper() context managers pop from the end
+        connection.execute_wrappers.insert(0, slow_query_wrapper)
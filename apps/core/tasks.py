@@ -0,0 +1,200 @@
+import traceback
+import uuid
+from datetime import timedelta
+from itertools import groupby
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.core.models import IdempotencyKey, Task
+from apps.core.utils import batched
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 9
+
+registry = {}
+
+
+class TaskFunction:
+    """
+    A function that can run later, in a ``run_tasks`` worker.
+
+    ``enqueue`` writes a ``Task`` row in the caller's transaction, so the
+    job exists exactly when the caller's changes are committed. Batch tasks
+    (``batch_size`` > 1) are called with a list of kwargs of up to
+    ``batch_size`` queued calls at once.
+    """
+
+    def __init__(self, func, name, priority, max_attempts, batch_size):
+        self.func = func
+        self.name = name
+        self.priority = priority
+        self.max_attempts = max_attempts
+        self.batch_size = batch_size
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def __repr__(self):
+        return f"<TaskFunction {self.name}>"
+
+    def _task(self, kwargs, priority, run_at):
+        return Task(
+            name=self.name,
+            kwargs=kwargs,
+            priority=self.priority if priority is None else priority,
+            run_at=run_at or timezone.now(),
+            max_attempts=self.max_attempts,
+        )
+
+    def run(self, payloads):
+        if self.batch_size > 1:
+            return self.func(payloads)
+        for kwargs in payloads:
+            self.func(**kwargs)
+
+    def enqueue(self, kwargs=None, priority=None, run_at=None):
+        """Queue one call; runs it right away when TASKS_ALWAYS_EAGER is set."""
+        kwargs = kwargs or {}
+        if settings.TASKS_ALWAYS_EAGER:
+            self.run([kwargs])
+            return None
+        task = self._task(kwargs, priority, run_at)
+        task.save()
+        return task
+
+    def enqueue_many(self, kwargs_list, priority=None, run_at=None):
+        kwargs_list = list(kwargs_list)
+        if settings.TASKS_ALWAYS_EAGER:
+            for batch in batched(kwargs_list, self.batch_size):
+                self.run(batch)
+            return []
+        return Task.objects.bulk_create(
+            self._task(kwargs, priority, run_at) for kwargs in kwargs_list
+        )
+
+    def delay(self, **kwargs):
+        return self.enqueue(kwargs)
+
+
+def task(name=None, priority=PRIORITY_NORMAL, max_attempts=3, batch_size=1):
+    """Register the decorated function as a task."""
+
+    def decorator(func):
+        task_name = name or f"{func.__module__}.{func.__name__}"
+        registry[task_name] = TaskFunction(
+            func, task_name, priority, max_attempts, batch_size
+        )
+        return registry[task_name]
+
+    return decorator
+
+
+def claim_tasks(limit):
+    """
+    Mark up to ``limit`` due tasks as running for this worker and return
+    them, most urgent first.
+
+    Tasks left running past ``TASKS_LEASE_SECONDS`` by a dead worker are
+    put back first, so a task runs at least once, not exactly once; those
+    that used up ``max_attempts`` are failed instead. Where
+    the database supports ``SKIP LOCKED`` concurrent workers pass over each
+    other's rows; elsewhere the conditional update settles races and a loser
+    simply claims fewer tasks.
+    """
+    now = timezone.now()
+    claim = uuid.uuid4().hex
+    expired = Task.objects.filter(
+        status=Task.Status.RUNNING,
+        claimed_at__lt=now - timedelta(seconds=settings.TASKS_LEASE_SECONDS),
+    )
+    expired.filter(attempts__gte=F("max_attempts")).update(
+        status=Task.Status.FAILED,
+        claimed_by="",
+        last_error="The lease of the last attempt expired.",
+    )
+    expired.update(status=Task.Status.QUEUED, claimed_by="")
+
+    with transaction.atomic():
+        ready = Task.objects.filter(
+            status=Task.Status.QUEUED, run_at__lte=now
+        ).order_by("priority", "run_at", "id")
+        if connection.features.has_select_for_update_skip_locked:
+            ready = ready.select_for_update(skip_locked=True)
+        ids = list(ready.values_list("id", flat=True)[:limit])
+        if not ids:
+            return []
+        Task.objects.filter(id__in=ids, status=Task.Status.QUEUED).update(
+            status=Task.Status.RUNNING,
+            claimed_by=claim,
+            claimed_at=now,
+            attempts=F("attempts") + 1,
+        )
+    return list(
+        Task.objects.filter(id__in=ids, claimed_by=claim).order_by(
+            "priority", "run_at", "id"
+        )
+    )
+
+
+def group_tasks(tasks):
+    """Split claimed tasks into ``(name, [(id, kwargs), ...])`` units of work."""
+    units = []
+    for name, group in groupby(sorted(tasks, key=lambda t: t.name), lambda t: t.name):
+        size = registry[name].batch_size if name in registry else 1
+        for batch in batched(group, size):
+            units.append((name, [(t.id, t.kwargs) for t in batch]))
+    return units
+
+
+def execute_unit(unit):
+    """Run one unit of work; return ``(ids, error)`` with ``error`` or ``None``."""
+    name, items = unit
+    ids = [task_id for task_id, _ in items]
+    if name not in registry:
+        return ids, f"Unknown task {name!r}."
+    try:
+        registry[name].run([kwargs for _, kwargs in items])
+    except Exception:
+        return ids, traceback.format_exc()
+    return ids, None
+
+
+def record_outcome(ids, error):
+    """
+    Delete finished tasks. Failed ones are retried with exponential backoff
+    until ``max_attempts`` and then kept with ``status="failed"``.
+    """
+    if error is None:
+        Task.objects.filter(id__in=ids).delete()
+        return
+    now = timezone.now()
+    for failed in Task.objects.filter(id__in=ids):
+        failed.last_error = error
+        failed.claimed_by = ""
+        if failed.attempts >= failed.max_attempts:
+            failed.status = Task.Status.FAILED
+        else:
+            failed.status = Task.Status.QUEUED
+            failed.run_at = now + timedelta(
+                seconds=settings.TASKS_RETRY_DELAY * 2 ** (failed.attempts - 1)
+            )
+        failed.save(update_fields=["last_error", "claimed_by", "status", "run_at"])
+
+
+@task(priority=PRIORITY_LOW)
+def prune_idempotency_keys(batch_size=10000):
+    """Delete expired idempotency keys ``batch_size`` at a time; return the count."""
+    deleted = 0
+    while True:
+        ids = list(
+            IdempotencyKey.objects.filter(expires_at__lte=timezone.now()).values_list(
+                "id", flat=True
+            )[:batch_size]
+        )
+        if not ids:
+            return deleted
+        deleted += IdempotencyKey.objects.filter(id__in=ids).delete()[0]
@@ -0,0 +1,48 @@
+import pytest
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from apps.core.metrics import Histogram, registry
+
+pytestmark = pytest.mark.django_db
+
+
+def test_histogram_buckets():
+    histogram = Histogram((1, 5))
+    for value in (0.5, 1, 3, 10):
+        histogram.observe(value)
+    assert histogram.snapshot() == ([2, 1, 1], 14.5, 4)
+
+
+class TestPerformanceMiddleware:
+    def test_server_timing_header(self, token_client, user):
+        resp = token_client.get(reverse("users:user-detail", args=[user.id]))
+        assert resp.status_code == status.HTTP_200_OK
+        timing = resp["Server-Timing"]
+        for metric in ("db;", "app;", "render;", "total;"):
+            assert metric in timing
+
+    def test_metrics_endpoint(self, token_client, user, settings):
+        settings.METRICS_TOKEN = "secret"
+        registry.clear()
+        token_client.get(reverse("users:user-detail", args=[user.id]))
+
+        token_client.credentials(HTTP_AUTHORIZATION="Bearer secret")
+        resp = token_client.get(reverse("metrics"))
+        assert resp.status_code == status.HTTP_200_OK
+        body = resp.content.decode()
+        assert 'http_request_duration_seconds_count{view="users:user-detail"} 1' in body
+        assert 'http_db_queries_bucket{view="users:user-detail",le="+Inf"} 1' in body
+        assert 'view="metrics"' not in body
+
+    def test_metrics_token(self, no_auth_client, settings):
+        settings.METRICS_TOKEN = "secret"
+        assert no_auth_client.get(reverse("metrics")).status_code == 403
+        no_auth_client.credentials(HTTP_AUTHORIZATION="Bearer secret")
+        assert no_auth_client.get(reverse("metrics")).status_code == 200
+
+    def test_metrics_without_token_are_hidden(self, no_auth_client, settings):
+        settings.METRICS_TOKEN = None
+        assert no_auth_client.get(reverse("metrics")).status_code == 404
+        settings.DEBUG = True
+        assert no_auth_client.get(reverse("metrics")).status_code == 200
@@ -0,0 +1,54 @@
+import pytest
+from rest_framework.reverse import reverse
+
+from apps.core.profiling import make_profile_token
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def private_root(settings, tmp_path):
+    settings.PRIVATE_ROOT = tmp_path
+    return tmp_path
+
+
+class TestProfilingMiddleware:
+    def test_signed_header_profiles_request(self, token_client, user, private_root):
+        token_client.credentials(
+            HTTP_AUTHORIZATION=f"Token {user.auth_token.key}",
+            HTTP_X_PROFILE=make_profile_token(),
+        )
+        resp = token_client.get(reverse("users:user-detail", args=[user.id]))
+
+        profile_id = resp["X-Profile-Id"]
+        assert (private_root / "profiles" / f"{profile_id}.prof").exists()
+        report = (private_root / "profiles" / f"{profile_id}.txt").read_text()
+        assert "users_user" in report
+        assert "-- plan:" in report
+        # the parameter values are left out of the report
+        assert "-- params: ['str']" in report
+        assert user.auth_token.key not in report
+
+    def test_invalid_header_is_ignored(self, token_client, user, private_root):
+        token_client.credentials(
+            HTTP_AUTHORIZATION=f"Token {user.auth_token.key}",
+            HTTP_X_PROFILE="forged",
+        )
+        resp = token_client.get(reverse("users:user-detail", args=[user.id]))
+        assert "X-Profile-Id" not in resp
+        assert not (private_root / "profiles").exists()
+
+    def test_query_flag_needs_staff(self, no_auth_client, user):
+        url = reverse("users:user-detail", args=[user.id]) + "?profile=1"
+        no_auth_client.force_login(user)
+        assert "X-Profile-Id" not in no_auth_client.get(url)
+
+        user.is_staff = True
+        user.save()
+        resp = no_auth_client.get(url)
+        assert "X-Profile-Id" in resp
+
+        download = no_auth_client.get(
+            reverse("profile-download", args=[f"{resp['X-Profile-Id']}.txt"])
+        )
+        assert download.status_code == 200
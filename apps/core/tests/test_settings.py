@@ -0,0 +1,18 @@
+from apps.config import Local, Production, Test
+from apps.config.common import Common
+
+
+def test_configurations_keep_the_posting_throttles():
+    # Test turns them off in its own copy of REST_FRAMEWORK
+    assert Test.REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]["posting"] is None
+    for configuration in (Common, Local, Production):
+        rates = configuration.REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]
+        assert rates["posting"] == "20/second"
+        assert rates["posting_global"] == "2000/second"
+
+
+def test_production_authenticates_tokens_and_jwt():
+    assert Production.REST_FRAMEWORK["DEFAULT_AUTHENTICATION_CLASSES"] == (
+        "apps.core.authentications.CachedTokenAuthentication",
+        "apps.core.authentications.CachedJWTCookieAuthentication",
+    )
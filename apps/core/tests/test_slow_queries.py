@@ -0,0 +1,75 @@
+import json
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+
+import pytest
+from rest_framework.reverse import reverse
+
+from apps.core import slow_queries
+from apps.core.slow_queries import SlowQueryLog, fingerprint, slow_query_log
+
+pytestmark = pytest.mark.django_db
+
+
+def test_fingerprint():
+    assert fingerprint(
+        "SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = 'kim'  LIMIT 21"
+    ) == fingerprint("SELECT * FROM t WHERE id IN (%s) AND name = 'lee' LIMIT 1")
+
+
+def test_log_is_bounded():
+    log = SlowQueryLog(max_entries=2)
+    log.record("a", 3)
+    log.record("b", 1)
+    log.record("c", 2)
+    assert [entry["fingerprint"] for entry in log.top()] == ["a", "c"]
+
+
+def test_wrapper_installed():
+    connection.ensure_connection()
+    assert slow_queries.slow_query_wrapper in connection.execute_wrappers
+
+
+def test_slow_request_logged(token_client, user, settings):
+    settings.SLOW_QUERY_THRESHOLD_MS = 0
+    slow_query_log.entries.clear()
+    with mock.patch.object(slow_queries, "logger") as logger:
+        token_client.get(reverse("users:user-detail", args=[user.id]))
+
+    entries = [json.loads(call.args[0]) for call in logger.warning.call_args_list]
+    selects = [entry for entry in entries if entry["view"] == "users:user-detail"]
+    assert selects
+    assert all(entry["plan"] for entry in selects if entry["sql"].startswith("SELECT"))
+    top = slow_query_log.top()
+    assert any("users:user-detail" in entry["views"] for entry in top)
+
+
+def test_fast_queries_not_logged(token_client, user, settings):
+    settings.SLOW_QUERY_THRESHOLD_MS = 10_000
+    with mock.patch.object(slow_queries, "logger") as logger:
+        token_client.get(reverse("users:user-detail", args=[user.id]))
+    logger.warning.assert_not_called()
+
+
+def test_report_command(tmp_path):
+    log_file = tmp_path / "slow.log"
+    lines = [
+        {"fingerprint": "SELECT ?", "duration_ms": 300, "view": "a", "plan": "SCAN t"},
+        {"fingerprint": "SELECT ?", "duration_ms": 500, "view": "b", "plan": None},
+        {"fingerprint": "UPDATE t", "duration_ms": 250, "view": None, "plan": None},
+    ]
+    log_file.write_text("\n".join(json.dumps(line) for line in lines) + "\nnot json\n")
+
+    out = StringIO()
+    call_command(
+        "slow_queries", file=str(log_file), json=True, stdout=out, stderr=StringIO()
+    )
+    report = json.loads(out.getvalue())
+    assert report[0]["fingerprint"] == "SELECT ?"
+    assert report[0]["count"] == 2
+    assert report[0]["views"] == {"a": 1, "b": 1}
+    assert report[0]["plan"] == "SCAN t"
+    assert report[1]["fingerprint"] == "UPDATE t"
@@ -0,0 +1,117 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.utils import timezone
+
+import pytest
+
+from apps.core.models import Task
+from apps.core.tasks import claim_tasks, execute_unit, group_tasks, record_outcome, task
+
+pytestmark = pytest.mark.django_db
+
+calls = []
+
+
+@task(name="tests.record")
+def record(value):
+    calls.append(value)
+
+
+@task(name="tests.record_batch", batch_size=2)
+def record_batch(payloads):
+    calls.append(sorted(payload["value"] for payload in payloads))
+
+
+@task(name="tests.fail", max_attempts=2)
+def fail():
+    raise ValueError("boom")
+
+
+@pytest.fixture(autouse=True)
+def queue(settings):
+    settings.TASKS_ALWAYS_EAGER = False
+    settings.TASKS_RETRY_DELAY = 10
+    calls.clear()
+
+
+def run_once():
+    for ids, error in map(execute_unit, group_tasks(claim_tasks(100))):
+        record_outcome(ids, error)
+
+
+def test_eager(settings):
+    settings.TASKS_ALWAYS_EAGER = True
+    record.enqueue({"value": 1})
+    record_batch.enqueue_many([{"value": 2}, {"value": 3}, {"value": 4}])
+    assert calls == [1, [2, 3], [4]]
+    assert not Task.objects.exists()
+
+
+def test_claim_by_priority():
+    record.enqueue({"value": "low"}, priority=9)
+    record.enqueue({"value": "high"}, priority=0)
+    record.enqueue({"value": "later"}, run_at=timezone.now() + timedelta(hours=1))
+
+    claimed = claim_tasks(1)
+    assert [t.kwargs["value"] for t in claimed] == ["high"]
+    assert claimed[0].status == Task.Status.RUNNING
+    assert claimed[0].attempts == 1
+    assert [t.kwargs["value"] for t in claim_tasks(10)] == ["low"]
+    assert claim_tasks(10) == []
+
+
+def test_run_and_batch():
+    record.enqueue({"value": 1})
+    record_batch.enqueue_many({"value": value} for value in (3, 2, 1))
+    run_once()
+    assert sorted(calls, key=str) == [1, [1], [2, 3]]
+    assert Task.objects.filter(name__startswith="tests.").count() == 0
+
+
+def test_retry_then_fail():
+    fail.enqueue()
+    run_once()
+    queued = Task.objects.get(name="tests.fail")
+    assert queued.status == Task.Status.QUEUED
+    assert queued.run_at > timezone.now()
+    assert "ValueError: boom" in queued.last_error
+
+    Task.objects.filter(pk=queued.pk).update(run_at=timezone.now())
+    run_once()
+    assert Task.objects.get(pk=queued.pk).status == Task.Status.FAILED
+
+
+def test_expired_lease_is_reclaimed(settings):
+    record.enqueue({"value": 1})
+    assert claim_tasks(1)
+    assert claim_tasks(1) == []
+    Task.objects.update(claimed_at=timezone.now() - timedelta(hours=1))
+    assert claim_tasks(1)[0].attempts == 2
+
+
+def test_expired_last_attempt_fails():
+    fail.enqueue()
+    assert claim_tasks(1)
+    Task.objects.update(claimed_at=timezone.now() - timedelta(hours=1))
+    assert claim_tasks(1)[0].attempts == 2
+    Task.objects.update(claimed_at=timezone.now() - timedelta(hours=1))
+    assert claim_tasks(1) == []
+    failed = Task.objects.get()
+    assert failed.status == Task.Status.FAILED
+    assert failed.last_error == "The lease of the last attempt expired."
+
+
+def test_unknown_task():
+    Task.objects.create(name="tests.missing", max_attempts=1)
+    run_once()
+    assert Task.objects.get().last_error == "Unknown task 'tests.missing'."
+
+
+def test_run_tasks_command():
+    record.enqueue({"value": 1})
+    out = StringIO()
+    call_command("run_tasks", once=True, workers=2, stdout=out)
+    assert calls == [1]
+    assert "Ran 1 task(s), 0 failed" in out.getvalue()
@@ -0,0 +1,65 @@
+import time
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+import pytest
+
+from apps.core.middleware import AdmissionControlMiddleware
+from apps.core.throttling import LeasedBucket
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+def test_bucket_limit_is_shared_between_processes():
+    # two buckets with one cache stand for two processes
+    first = LeasedBucket("test", limit=10, period=60, lease=4)
+    second = LeasedBucket("test", limit=10, period=60, lease=4)
+    assert [first.consume("a") for _ in range(6)] == [0] * 6
+    # two tokens are left of the shared budget; first holds two more
+    assert [second.consume("a") == 0 for _ in range(3)] == [True, True, False]
+    assert [first.consume("a") == 0 for _ in range(3)] == [True, True, False]
+    assert 0 < second.consume("a") <= 60
+    # other identities have budgets of their own
+    assert first.consume("b") == 0
+
+
+def test_bucket_spends_leases_locally():
+    bucket = LeasedBucket("test", limit=100, period=60, lease=10)
+    bucket.consume("a")
+    cache.delete("throttle:test:a:{}".format(int(time.time() // 60)))
+    # the rest of the lease needs no cache
+    assert all(bucket.consume("a") == 0 for _ in range(9))
+
+
+class TestAdmissionControl:
+    def middleware(self, response=None):
+        return AdmissionControlMiddleware(lambda request: response or HttpResponse())
+
+    def test_in_flight_limit(self, settings, rf: RequestFactory):
+        settings.ADMISSION_MAX_IN_FLIGHT = 1
+        middleware = self.middleware()
+        middleware.in_flight = 1
+        resp = middleware(rf.get("/api/v1/eightpercent/account/"))
+        assert resp.status_code == 503
+        assert resp["Retry-After"] == "1"
+        assert middleware(rf.get("/metrics")).status_code == 200
+        # bounded by LEDGER_FEED_MAX_WAITERS instead
+        events = rf.get("/api/v1/eightpercent/transactions/events")
+        assert middleware(events).status_code == 200
+
+        middleware.in_flight = 0
+        assert middleware(rf.get("/")).status_code == 200
+        assert middleware.in_flight == 0
+
+    def test_queue_time(self, settings, rf: RequestFactory):
+        settings.ADMISSION_MAX_QUEUE_MS = 500
+        middleware = self.middleware()
+        stale = f"t={time.time() - 2:.3f}"
+        fresh = f"t={int(time.time() * 1_000_000)}"
+        assert middleware(rf.get("/", HTTP_X_REQUEST_START=stale)).status_code == 503
+        assert middleware(rf.get("/", HTTP_X_REQUEST_START=fresh)).status_code == 200
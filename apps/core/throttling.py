@@ -0,0 +1,119 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache
+
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+# Identities whose leased tokens a process remembers
+MAX_LOCAL_IDENTS = 10000
+
+
+class LeasedBucket:
+    """
+    Budget of ``limit`` requests per ``period`` seconds per identity, shared
+    by every process through the cache.
+
+    A process leases up to ``lease`` tokens at a time with one ``incr`` on
+    the identity's counter for the current window, then spends them
+    locally under a lock, so most requests cost a dictionary lookup. Unused
+    tokens lapse with the window, and a lease is never larger than what is
+    left of the shared budget.
+    """
+
+    def __init__(self, scope, limit, period, lease=None):
+        self.scope = scope
+        self.limit = limit
+        self.period = period
+        self.lease = lease or max(1, limit // 10)
+        self.local = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _lease(self, ident, window):
+        key = f"throttle:{self.scope}:{ident}:{window}"
+        cache.add(key, 0, timeout=self.period * 2)
+        try:
+            used = cache.incr(key, self.lease)
+        except ValueError:  # expired in between
+            cache.set(key, self.lease, timeout=self.period * 2)
+            used = self.lease
+        return max(0, min(self.lease, self.limit - (used - self.lease)))
+
+    def consume(self, ident):
+        """Take a token; return 0 or the seconds until the next window."""
+        now = time.time()
+        window = int(now // self.period)
+        with self._lock:
+            entry = self.local.get(ident)
+            if entry is not None and entry[0] == window and entry[1] > 0:
+                entry[1] -= 1
+                self.local.move_to_end(ident)
+                return 0
+            if entry is not None and entry[0] == window and entry[2]:
+                # the shared budget ran out in this window already
+                return (window + 1) * self.period - now
+
+        granted = self._lease(ident, window)
+        with self._lock:
+            self.local[ident] = [window, max(granted - 1, 0), granted == 0]
+            self.local.move_to_end(ident)
+            while len(self.local) > MAX_LOCAL_IDENTS:
+                self.local.popitem(last=False)
+        return 0 if granted else (window + 1) * self.period - now
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def parse_rate(rate):
+    """``"20/second"`` -> ``(20, 1)``, like DRF's ``SimpleRateThrottle``."""
+    count, period = rate.split("/")
+    return int(count), {"s": 1, "m": 60, "h": 3600, "d": 86400}[period[0]]
+
+
+def get_bucket(scope, rate):
+    limit, period = parse_rate(rate)
+    key = (scope, limit, period)
+    bucket = _buckets.get(key)
+    if bucket is None:
+        with _buckets_lock:
+            bucket = _buckets.setdefault(key, LeasedBucket(scope, limit, period))
+    return bucket
+
+
+class OrderedThrottlesMixin:
+    """
+    View mixin asking ``throttle_classes`` in order and stopping at the
+    first that refuses. DRF asks every throttle, so a client refused by its
+    own limit would still spend tokens of the wider budgets after it.
+    """
+
+    def check_throttles(self, request):
+        for throttle in self.get_throttles():
+            if not throttle.allow_request(request, self):
+                self.throttled(request, throttle.wait())
+
+
+class LeasedRateThrottle(BaseThrottle):
+    """
+    Throttle backed by ``LeasedBucket``, rated by
+    ``DEFAULT_THROTTLE_RATES[scope]``; a ``None`` rate disables it.
+    """
+
+    scope = None
+
+    def get_ident(self, request):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+        if rate is None:
+            return True
+        self.retry_after = get_bucket(self.scope, rate).consume(self.get_ident(request))
+        return self.retry_after == 0
+
+    def wait(self):
+        return self.retry_after
@@ -0,0 +1,49 @@
+import threading
+from collections import OrderedDict
+from itertools import islice
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+
+
+def private_storage():
+    """Storage under ``PRIVATE_ROOT``; its files are only served by views."""
+    return FileSystemStorage(location=settings.PRIVATE_ROOT)
+
+
+def batched(iterable, size):
+    """Yield lists of at most ``size`` items from ``iterable``."""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class LRUCache:
+    """Thread-safe mapping that keeps the ``maxsize`` most recently used items."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self.items:
+                return default
+            self.items.move_to_end(key)
+            return self.items[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self.items[key] = value
+            self.items.move_to_end(key)
+            if len(self.items) > self.maxsize:
+                self.items.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            return self.items.pop(key, default)
+
+    def clear(self):
+        with self._lock:
+            self.items.clear()
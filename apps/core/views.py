@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+from apps.core.metrics import registry
+from apps.core.profiling import PROFILE_DIR
+from apps.core.utils import private_storage
+
+
+def metrics(request):
+    """
+    Per-view request histograms in the Prometheus text format. Without a
+    ``METRICS_TOKEN`` the endpoint only exists in DEBUG.
+    """
+    if not settings.METRICS_TOKEN:
+        if not settings.DEBUG:
+            raise Http404
+    elif not constant_time_compare(
+        request.headers.get("Authorization", ""), f"Bearer {settings.METRICS_TOKEN}"
+    ):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@staff_member_required
+def profile_download(request, name):
+    """Download a profile or report stored by ``ProfilingMiddleware``."""
+    path = f"{PROFILE_DIR}/{name}"
+    storage = private_storage()
+    if not storage.exists(path):
+        raise Http404
+    return FileResponse(storage.open(path), as_attachment=True, filename=name)
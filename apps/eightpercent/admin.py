@@ -1,10 +1,11 @@
 from django.contrib import admin
 
+from apps.core.admin import LargeTableAdminMixin
 from apps.eightpercent.models import Account, Transaction
 
 
 @admin.register(Account)
-class AccountAdmin(admin.ModelAdmin):
+class AccountAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     """Accont Model Admin"""
 
     list_display = (
@@ -12,10 +13,14 @@ class AccountAdmin(admin.ModelAdmin):
         "balance",
         "customer",
     )
+    list_select_related = ("customer",)
+    raw_id_fields = ("customer",)
+    # exact matches only, so the search stays on the unique indexes
+    search_fields = ("=account_number", "=customer__username")
 
 
 @admin.register(Transaction)
-class TransactionAdmin(admin.ModelAdmin):
+class TransactionAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     """Transaction Model Admin"""
 
     list_display = (
@@ -25,3 +30,8 @@ class TransactionAdmin(admin.ModelAdmin):
         "description",
         "account",
     )
+    list_select_related = ("account",)
+    raw_id_fields = ("account",)
+    search_fields = ("=account__account_number",)
+    date_hierarchy = "transaction_date"
+    ordering = ("-transaction_date", "-id")
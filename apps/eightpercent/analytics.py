@@ -0,0 +1,130 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+import numpy as np
+
+from apps.eightpercent.feed import current_version, version_key
+from apps.eightpercent.models import Transaction
+
+WEEKDAYS = ("MON", "TUE", "WED", "THU", "FRI", "SAT", "SUN")
+PERCENTILES = (10, 25, 50, 75, 90)
+# Upper bounds of the withdrawal histogram buckets, in won
+WITHDRAW_BUCKETS = (10_000, 50_000, 100_000, 500_000, 1_000_000, 5_000_000)
+
+
+def analytics_key(account_pk):
+    return f"analytics:{account_pk}"
+
+
+def _columns(account_pk):
+    """The type, amount and local time of every posting as arrays."""
+    rows = Transaction.objects.filter(account_id=account_pk).values_list(
+        "transaction_type", "transaction_amount", "transaction_date"
+    )
+    types, amounts, dates = zip(*rows) if rows else ((), (), ())
+    deposit = np.array(types, dtype=object) == Transaction.TransactionTypes.DEPOSIT
+    amounts = np.fromiter(amounts, dtype=np.int64, count=len(amounts))
+    # the offset of the current time zone, as there is no DST in KST or UTC
+    offset = int(timezone.localtime().utcoffset().total_seconds())
+    seconds = np.fromiter(
+        (int(date.timestamp()) for date in dates), dtype=np.int64, count=len(dates)
+    )
+    return deposit, amounts, (seconds + offset).astype("datetime64[s]")
+
+
+def _summary(amounts):
+    if not len(amounts):
+        return {"count": 0, "total": 0, "average": None, "median": None}
+    return {
+        "count": len(amounts),
+        "total": int(amounts.sum()),
+        "average": int(round(amounts.mean())),
+        "median": int(np.median(amounts)),
+    }
+
+
+def _by(keys, size, deposit, amounts):
+    """Count and sum deposits and withdrawals per key in ``range(size)``."""
+    columns = {}
+    for name, mask in (("deposits", deposit), ("withdrawals", ~deposit)):
+        # summed in int64; bincount weights would round large totals
+        columns[name] = np.zeros(size, dtype=np.int64)
+        np.add.at(columns[name], keys[mask], amounts[mask])
+        columns[f"{name}_count"] = np.bincount(keys[mask], minlength=size)
+    return [
+        {name: int(values[index]) for name, values in columns.items()}
+        for index in range(size)
+    ]
+
+
+def compute_analytics(account_pk):
+    """
+    Spending metrics of an account from one read of its postings.
+
+    Every metric is computed over the whole columns at once: summaries of
+    deposits and withdrawals, withdrawal percentiles and histogram, and
+    totals per weekday and per month.
+    """
+    deposit, amounts, moments = _columns(account_pk)
+    withdrawals = amounts[~deposit]
+
+    days = moments.astype("datetime64[D]").astype(np.int64)
+    weekdays = (days + 3) % 7  # 1970-01-01 was a Thursday
+    months = moments.astype("datetime64[M]")
+    labels, month_index = np.unique(months, return_inverse=True)
+
+    histogram = np.bincount(
+        np.searchsorted(WITHDRAW_BUCKETS, withdrawals, side="right"),
+        minlength=len(WITHDRAW_BUCKETS) + 1,
+    )
+    return {
+        "deposits": _summary(amounts[deposit]),
+        "withdrawals": {
+            **_summary(withdrawals),
+            "percentiles": {
+                f"p{p}": int(value)
+                for p, value in zip(
+                    PERCENTILES,
+                    np.percentile(withdrawals, PERCENTILES)
+                    if len(withdrawals)
+                    else [0] * len(PERCENTILES),
+                )
+            },
+            "histogram": [
+                {"up_to": bound, "count": int(count)}
+                for bound, count in zip((*WITHDRAW_BUCKETS, None), histogram)
+            ],
+        },
+        "by_weekday": [
+            {"weekday": name, **totals}
+            for name, totals in zip(WEEKDAYS, _by(weekdays, 7, deposit, amounts))
+        ],
+        "by_month": [
+            {"month": str(label), **totals}
+            for label, totals in zip(
+                labels, _by(month_index.reshape(-1), len(labels), deposit, amounts)
+            )
+        ],
+    }
+
+
+def account_analytics(account_pk):
+    """
+    Return ``compute_analytics`` of an account, cached under its feed
+    version: repeat views read one ``get_many`` until something is posted.
+    """
+    values = cache.get_many([version_key(account_pk), analytics_key(account_pk)])
+    version = current_version(account_pk, values)
+    entry = values.get(analytics_key(account_pk))
+    if entry is not None and entry[0] == version:
+        return entry[1]
+
+    # the version is read before the query, see ``recent_activity``
+    analytics = compute_analytics(account_pk)
+    cache.set(
+        analytics_key(account_pk),
+        (version, analytics),
+        timeout=settings.ACCOUNT_ANALYTICS_TTL,
+    )
+    return analytics
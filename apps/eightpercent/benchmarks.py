@@ -0,0 +1,147 @@
+import statistics
+import time
+import uuid
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from apps.eightpercent.generators import generate_ledger
+from apps.eightpercent.models import Account
+
+BENCHMARK_PASSWORD = "1234"
+
+
+def _endpoints():
+    """``name -> (method, url, payload, expected status)`` of the benchmarked calls."""
+    return {
+        "account": ("get", reverse("eightpercent:account"), None, 200),
+        "history": (
+            "get",
+            reverse("eightpercent:transactions") + "?ordering=true",
+            None,
+            200,
+        ),
+        "deposit": (
+            "post",
+            reverse("eightpercent:deposits"),
+            {"transaction_amount": 10000, "description": "benchmark"},
+            200,
+        ),
+        "withdraw": (
+            "post",
+            reverse("eightpercent:withdraw"),
+            {"transaction_amount": 100, "description": "benchmark"},
+            200,
+        ),
+        "login": ("post", reverse("rest_login"), None, 200),
+    }
+
+
+def summarize(durations, queries, errors, elapsed):
+    """Percentiles in milliseconds, mean queries and throughput of one endpoint."""
+    cuts = statistics.quantiles(durations, n=100, method="inclusive")
+    return {
+        "requests": len(durations),
+        "errors": errors,
+        "p50_ms": round(cuts[49] * 1000, 3),
+        "p95_ms": round(cuts[94] * 1000, 3),
+        "p99_ms": round(cuts[98] * 1000, 3),
+        "mean_ms": round(statistics.fmean(durations) * 1000, 3),
+        "queries_per_request": round(statistics.fmean(queries), 2),
+        "requests_per_second": round(len(durations) / elapsed, 1) if elapsed else None,
+    }
+
+
+def _clients(accounts):
+    clients = []
+    for account in accounts:
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f"Token {account.customer.auth_token.key}"
+        )
+        clients.append((client, account.customer))
+    return clients
+
+
+def run_benchmark(users, transactions, requests, warmup=10, sample=20, seed=None):
+    """
+    Seed a ledger of ``users`` accounts and ``transactions`` postings, then call
+    every endpoint ``requests`` times in-process, rotating over ``sample``
+    customers. Returns a JSON-serializable report.
+    """
+    prefix = f"bench-{uuid.uuid4().hex[:8]}-"
+    for _ in generate_ledger(
+        users, transactions, seed=seed, prefix=prefix, password=BENCHMARK_PASSWORD
+    ):
+        pass
+
+    accounts = (
+        Account.objects.filter(customer__username__startswith=prefix)
+        .select_related("customer__auth_token")
+        .order_by("-balance")[:sample]
+    )
+    clients = _clients(accounts)
+
+    report = {}
+    for name, (method, url, payload, expected) in _endpoints().items():
+        durations, queries, errors = [], [], 0
+        started = time.perf_counter()
+        for index in range(warmup + requests):
+            client, customer = clients[index % len(clients)]
+            data = payload
+            if name == "login":
+                client = APIClient()
+                data = {"email": customer.email, "password": BENCHMARK_PASSWORD}
+
+            with CaptureQueriesContext(connection) as context:
+                begin = time.perf_counter()
+                response = getattr(client, method)(url, data=data, format="json")
+                duration = time.perf_counter() - begin
+
+            if index < warmup:
+                started = time.perf_counter()
+                continue
+            durations.append(duration)
+            queries.append(len(context.captured_queries))
+            errors += response.status_code != expected
+        report[name] = summarize(
+            durations, queries, errors, time.perf_counter() - started
+        )
+
+    return {
+        "meta": {
+            "users": users,
+            "transactions": transactions,
+            "requests": requests,
+            "vendor": connection.vendor,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "endpoints": report,
+    }
+
+
+def find_regressions(result, baseline, threshold):
+    """
+    List endpoints whose p95 grew by more than ``threshold`` percent, or that
+    issue more queries per request than in ``baseline``.
+    """
+    regressions = []
+    for name, current in result["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(name)
+        if previous is None:
+            continue
+        limit = previous["p95_ms"] * (1 + threshold / 100)
+        if current["p95_ms"] > limit:
+            regressions.append(
+                f"{name}: p95 {current['p95_ms']}ms > {limit:.3f}ms "
+                f"(baseline {previous['p95_ms']}ms)"
+            )
+        if current["queries_per_request"] > previous["queries_per_request"]:
+            regressions.append(
+                f"{name}: {current['queries_per_request']} queries per request "
+                f"(baseline {previous['queries_per_request']})"
+            )
+    return regressions
@@ -0,0 +1,229 @@
+import hashlib
+import os
+import shutil
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from apps.eightpercent.models import Account, ExportWatermark, Transaction
+
+TRANSACTIONS = "transactions"
+ACCOUNTS = "accounts"
+# Rows fetched by one keyset read and written as one row group
+ROWS_PER_READ = 50000
+
+TRANSACTION_SCHEMA = pa.schema(
+    [
+        ("id", pa.string()),
+        ("account_id", pa.string()),
+        ("transaction_type", pa.dictionary(pa.int32(), pa.string())),
+        ("transaction_amount", pa.int64()),
+        ("transaction_date", pa.timestamp("us", tz="UTC")),
+        ("description", pa.string()),
+    ]
+)
+ACCOUNT_SCHEMA = pa.schema(
+    [
+        ("account_number", pa.string()),
+        ("customer_id", pa.string()),
+        ("balance", pa.int64()),
+        # accounts have no timestamp of their own; the owner's signup
+        ("customer_joined_at", pa.timestamp("us", tz="UTC")),
+    ]
+)
+
+
+def _strings(values):
+    return pa.array([str(value) for value in values], type=pa.string())
+
+
+def _integers(values):
+    return pa.array(np.fromiter(values, dtype=np.int64, count=len(values)))
+
+
+def _timestamps(values):
+    return pa.array(values, type=pa.timestamp("us", tz="UTC"))
+
+
+def transaction_table(rows):
+    """Build the columns of ``rows`` of ``(id, account, type, amount, date, description)``."""
+    ids, accounts, types, amounts, dates, descriptions = zip(*rows)
+    return pa.Table.from_arrays(
+        [
+            _strings(ids),
+            _strings(accounts),
+            pa.array(types, type=pa.string()).dictionary_encode(),
+            _integers(amounts),
+            _timestamps(dates),
+            pa.array(descriptions, type=pa.string()),
+        ],
+        schema=TRANSACTION_SCHEMA,
+    )
+
+
+def month_slices(table):
+    """
+    Split a table sorted by ``transaction_date`` into ``(month, table)``
+    runs, comparing the months of the whole column at once.
+    """
+    dates = table.column("transaction_date").to_numpy().astype("datetime64[us]")
+    months = dates.astype("datetime64[M]")
+    bounds = [0, *(np.flatnonzero(months[1:] != months[:-1]) + 1), len(months)]
+    for start, stop in zip(bounds, bounds[1:]):
+        yield str(months[start]), table.slice(start, stop - start)
+
+
+def keyset_reads(queryset, size, after_date, after_id):
+    """
+    Yield lists of ``size`` rows of ``queryset`` in ``(transaction_date,
+    id)`` order after the given key, each read one range scan of the
+    ``transactions_date`` index.
+    """
+    while True:
+        page = queryset
+        if after_date is not None:
+            after = Q(transaction_date__gt=after_date)
+            if after_id is None:
+                after |= Q(transaction_date=after_date)
+            else:
+                after |= Q(transaction_date=after_date, id__gt=after_id)
+            page = page.filter(after)
+        rows = list(page.order_by("transaction_date", "id")[:size])
+        if not rows:
+            return
+        yield rows
+        after_date, after_id = rows[-1][4], rows[-1][0]
+
+
+def _export_dir(root):
+    return root or settings.LEDGER_EXPORT_DIR
+
+
+def _finish(paths):
+    for path in paths:
+        os.replace(path + ".tmp", path)
+
+
+def export_transactions(root=None, size=ROWS_PER_READ, now=None):
+    """
+    Append the transactions after the watermark to
+    ``transactions/month=YYYY-MM/`` Parquet files and advance it.
+
+    Only rows older than ``LEDGER_EXPORT_LAG`` are exported, so a posting
+    dated a little before a concurrent one that committed first is not
+    skipped. Months marked dirty (by a ledger import behind the watermark)
+    are removed and exported again. A run that fails before saving the
+    watermark is repeated by the next one under the same file names.
+    Returns ``(rows, files)``.
+    """
+    root = os.path.join(_export_dir(root), TRANSACTIONS)
+    watermark, _ = ExportWatermark.objects.get_or_create(name=TRANSACTIONS)
+    after_date, after_id = watermark.exported_through, watermark.last_id
+    if watermark.dirty_from is not None:
+        dirty = timezone.make_aware(
+            datetime.combine(watermark.dirty_from, datetime.min.time())
+        )
+        if after_date is not None and dirty <= after_date:
+            for month in os.listdir(root) if os.path.isdir(root) else ():
+                if month >= f"month={watermark.dirty_from:%Y-%m}":
+                    shutil.rmtree(os.path.join(root, month))
+            after_date, after_id = dirty, None
+
+    until = (now or timezone.now()) - timedelta(seconds=settings.LEDGER_EXPORT_LAG)
+    queryset = Transaction.objects.filter(transaction_date__lt=until).values_list(
+        "id",
+        "account_id",
+        "transaction_type",
+        "transaction_amount",
+        "transaction_date",
+        "description",
+    )
+    # named after where the run starts, so a retry replaces its files
+    part = hashlib.sha256(f"{after_date}:{after_id}".encode()).hexdigest()[:16]
+    rows, paths = 0, []
+    writer = month = None
+    last_date, last_id = after_date, after_id
+    try:
+        for page in keyset_reads(queryset, size, after_date, after_id):
+            for page_month, table in month_slices(transaction_table(page)):
+                if page_month != month:
+                    if writer is not None:
+                        writer.close()
+                    month = page_month
+                    os.makedirs(os.path.join(root, f"month={month}"), exist_ok=True)
+                    paths.append(
+                        os.path.join(root, f"month={month}", f"part-{part}.parquet")
+                    )
+                    writer = pq.ParquetWriter(paths[-1] + ".tmp", TRANSACTION_SCHEMA)
+                writer.write_table(table)
+            rows += len(page)
+            last_date, last_id = page[-1][4], page[-1][0]
+    finally:
+        if writer is not None:
+            writer.close()
+    _finish(paths)
+
+    ExportWatermark.objects.filter(pk=watermark.pk).update(
+        exported_through=last_date,
+        last_id=last_id,
+        dirty_from=None,
+        exported_at=timezone.now(),
+    )
+    return rows, len(paths)
+
+
+def export_accounts(root=None, size=ROWS_PER_READ):
+    """
+    Write a snapshot of every account to ``accounts.parquet``, read in
+    keyset pages by primary key. Balances change in place and accounts keep
+    no modification time, so every run exports all of them rather than a
+    delta after the watermark. Returns the number of rows.
+    """
+    root = _export_dir(root)
+    os.makedirs(root, exist_ok=True)
+    path = os.path.join(root, f"{ACCOUNTS}.parquet")
+    queryset = Account.objects.order_by("pk").values_list(
+        "pk", "customer_id", "balance", "customer__date_joined"
+    )
+    rows, after = 0, None
+    with pq.ParquetWriter(path + ".tmp", ACCOUNT_SCHEMA) as writer:
+        while True:
+            page = queryset if after is None else queryset.filter(pk__gt=after)
+            page = list(page[:size])
+            if not page:
+                break
+            pks, customers, balances, joined = zip(*page)
+            writer.write_table(
+                pa.Table.from_arrays(
+                    [
+                        _strings(pks),
+                        _strings(customers),
+                        _integers(balances),
+                        _timestamps(joined),
+                    ],
+                    schema=ACCOUNT_SCHEMA,
+                )
+            )
+            rows += len(page)
+            after = pks[-1]
+    _finish([path])
+    ExportWatermark.objects.update_or_create(
+        name=ACCOUNTS, defaults={"exported_at": timezone.now()}
+    )
+    return rows
+
+
+def mark_dirty(month):
+    """Export ``month`` and later again; call when rows behind the watermark change."""
+    start = timezone.make_aware(datetime.combine(month, datetime.min.time()))
+    ExportWatermark.objects.filter(
+        Q(dirty_from__isnull=True) | Q(dirty_from__gt=month),
+        name=TRANSACTIONS,
+        exported_through__gte=start,
+    ).update(dirty_from=month)
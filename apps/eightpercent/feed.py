@@ -0,0 +1,177 @@
+import json
+import secrets
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+
+from apps.eightpercent.models import LedgerEvent
+
+# Wakes the waiters of this process as soon as a posting commits
+_posted = threading.Condition()
+
+# Feed requests waiting in this process
+_waiters = 0
+_waiters_lock = threading.Lock()
+
+
+def enter_waiter():
+    """
+    Count a waiting feed request in this process, or return False when
+    ``LEDGER_FEED_MAX_WAITERS`` are waiting already.
+    """
+    global _waiters
+    with _waiters_lock:
+        if _waiters >= settings.LEDGER_FEED_MAX_WAITERS:
+            return False
+        _waiters += 1
+    return True
+
+
+def leave_waiter():
+    global _waiters
+    with _waiters_lock:
+        _waiters -= 1
+
+
+class WaiterStream:
+    """
+    Iterates ``stream`` and leaves the waiter when the response is closed,
+    whether or not the stream was started.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.closed = False
+
+    def __iter__(self):
+        return iter(self.stream)
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.stream.close()
+            leave_waiter()
+
+
+def version_key(account_pk):
+    return f"ledger:version:{account_pk}"
+
+
+def _generation():
+    # A version counter starts from a random value, so one evicted and
+    # created again does not repeat the versions entries were stamped with;
+    # 48 bits leave room for increments within memcached's 64.
+    return secrets.randbits(48)
+
+
+def current_version(account_pk, values=None):
+    """
+    The account's feed version, from ``values`` of a ``get_many`` when
+    given. Without one a new generation is started, so whatever was stamped
+    before an eviction does not match.
+    """
+    key = version_key(account_pk)
+    version = values.get(key) if values is not None else cache.get(key)
+    if version is None:
+        cache.add(key, _generation(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def notify_posted(account_pk):
+    """
+    Bump the account's feed version and return it; call after the posting
+    committed.
+    """
+    key = version_key(account_pk)
+    cache.add(key, _generation(), timeout=None)
+    try:
+        version = cache.incr(key)
+    except ValueError:  # evicted in between
+        version = _generation()
+        cache.set(key, version, timeout=None)
+    with _posted:
+        _posted.notify_all()
+    return version
+
+
+def serialize_event(event):
+    return {
+        "id": event.id,
+        "type": event.event_type,
+        "account": event.account_id,
+        "created_at": event.created_at,
+        "data": event.payload,
+    }
+
+
+def fetch_events(account, after, limit):
+    return list(
+        LedgerEvent.objects.filter(account=account, id__gt=after).order_by("id")[:limit]
+    )
+
+
+def wait_for_events(account, after, timeout, limit=100):
+    """
+    Return the events of ``account`` after the ``after`` cursor, waiting up
+    to ``timeout`` seconds for one to be posted.
+
+    While nothing changes a waiter only reads the account's version from the
+    cache every ``LEDGER_FEED_POLL_INTERVAL`` seconds, and is woken at once
+    by postings of its own process. The database is queried when the
+    version moves, and every ``LEDGER_FEED_DB_INTERVAL`` seconds in case the
+    cache is not shared between processes.
+    """
+    deadline = time.monotonic() + timeout
+    key = version_key(account.pk)
+    while True:
+        # read the version before the query so no commit slips in between
+        version = cache.get(key)
+        events = fetch_events(account, after, limit)
+        remaining = deadline - time.monotonic()
+        if events or remaining <= 0:
+            return events
+
+        recheck = time.monotonic() + settings.LEDGER_FEED_DB_INTERVAL
+        while cache.get(key) == version:
+            now = time.monotonic()
+            if now >= deadline:
+                return []
+            if now >= recheck:
+                break
+            with _posted:
+                _posted.wait(
+                    min(
+                        deadline - now,
+                        recheck - now,
+                        settings.LEDGER_FEED_POLL_INTERVAL,
+                    )
+                )
+
+
+def event_stream(account, after, duration, limit=100):
+    """
+    Server-Sent Events for ``account`` after ``after`` for ``duration``
+    seconds; clients reconnect with ``Last-Event-ID`` to resume.
+    """
+    deadline = time.monotonic() + duration
+    # reconnect right away when the stream ends
+    yield "retry: 1000\n\n"
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        events = wait_for_events(
+            account, after, min(remaining, settings.LEDGER_FEED_HEARTBEAT), limit
+        )
+        if not events:
+            # keeps proxies from closing an idle connection
+            yield ": heartbeat\n\n"
+            continue
+        for event in events:
+            data = json.dumps(serialize_event(event), cls=DjangoJSONEncoder)
+            yield f"id: {event.id}\nevent: {event.event_type}\ndata: {data}\n\n"
+        after = events[-1].id
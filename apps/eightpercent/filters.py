@@ -0,0 +1,138 @@
+from datetime import datetime, time, timedelta
+
+from django import forms
+from django.utils import timezone
+
+import django_filters
+
+from apps.eightpercent.models import Transaction
+from apps.eightpercent.search import search_transactions
+from apps.eightpercent.utils import get_user_account
+
+# Amount filters and amount ordering read every row of the date range, so
+# the range they run on must be bounded.
+MAX_AMOUNT_SCAN_DAYS = 366
+
+LEGACY_ORDERING = {"true": "-transaction_date", "false": None}
+
+
+class TransactionTypeInFilter(django_filters.BaseInFilter, django_filters.CharFilter):
+    pass
+
+
+class TransactionFilterForm(forms.Form):
+    def clean_transaction_type(self):
+        types = self.cleaned_data.get("transaction_type")
+        if not types:
+            return None
+        types = {value.strip().upper() for value in types}
+        unknown = types - set(Transaction.TransactionTypes.values)
+        if unknown:
+            raise forms.ValidationError(
+                "Unknown transaction type: {}.".format(", ".join(sorted(unknown)))
+            )
+        return sorted(types)
+
+    def clean(self):
+        data = super().clean()
+        legacy = data.get("start_day") or data.get("end_day")
+        if legacy and (data.get("date_from") or data.get("date_to")):
+            raise forms.ValidationError(
+                "Use either date_from/date_to or start_day/end_day."
+            )
+        # whole days, end day included
+        if data.get("start_day"):
+            data["date_from"] = self._start_of(data["start_day"])
+        if data.get("end_day"):
+            data["date_to"] = self._start_of(data["end_day"] + timedelta(days=1))
+
+        date_from, date_to = data.get("date_from"), data.get("date_to")
+        if date_from and date_to and date_from >= date_to:
+            self.add_error("date_to", "Must be later than date_from.")
+        amount_min, amount_max = data.get("amount_min"), data.get("amount_max")
+        if amount_min is not None and amount_max is not None:
+            if amount_min > amount_max:
+                self.add_error("amount_max", "Must not be less than amount_min.")
+
+        ordering = data.get("ordering") or []
+        by_amount = amount_min is not None or amount_max is not None
+        by_amount |= any(
+            field.lstrip("-") == "transaction_amount" for field in ordering
+        )
+        if by_amount and not self.errors:
+            if not (date_from and date_to):
+                raise forms.ValidationError(
+                    "Amount filters and ordering need date_from and date_to."
+                )
+            if date_to - date_from > timedelta(days=MAX_AMOUNT_SCAN_DAYS):
+                raise forms.ValidationError(
+                    "Amount filters and ordering need a date range of at most "
+                    f"{MAX_AMOUNT_SCAN_DAYS} days."
+                )
+        return data
+
+    @staticmethod
+    def _start_of(day):
+        return timezone.make_aware(datetime.combine(day, time.min))
+
+
+class TransactionFilter(django_filters.FilterSet):
+    """
+    Filters of the transaction history.
+
+    Every filter is normalized into one predicate on the ``(account,
+    transaction_date)`` index: dates become a half-open ``[date_from,
+    date_to)`` range, the legacy ``start_day``/``end_day`` whole days
+    included. Combinations that would read an unbounded part of the history
+    are rejected with a 400 instead.
+    """
+
+    date_from = django_filters.DateTimeFilter()
+    date_to = django_filters.DateTimeFilter()
+    start_day = django_filters.DateFilter()
+    end_day = django_filters.DateFilter()
+    amount_min = django_filters.NumberFilter(min_value=0)
+    amount_max = django_filters.NumberFilter(min_value=0)
+    transaction_type = TransactionTypeInFilter()
+    q = django_filters.CharFilter(max_length=100)
+    ordering = django_filters.OrderingFilter(
+        fields=("transaction_date", "transaction_amount")
+    )
+
+    class Meta:
+        model = Transaction
+        fields = ()
+        form = TransactionFilterForm
+
+    def __init__(self, data=None, *args, **kwargs):
+        if data is not None and "ordering" in data:
+            legacy = data["ordering"].lower()
+            if legacy in LEGACY_ORDERING:
+                data = data.copy()
+                data["ordering"] = LEGACY_ORDERING[legacy] or ""
+        super().__init__(data, *args, **kwargs)
+
+    def filter_queryset(self, queryset):
+        data = self.form.cleaned_data
+        lookups = {}
+        if data.get("date_from"):
+            lookups["transaction_date__gte"] = data["date_from"]
+        if data.get("date_to"):
+            lookups["transaction_date__lt"] = data["date_to"]
+        if data.get("amount_min") is not None:
+            lookups["transaction_amount__gte"] = data["amount_min"]
+        if data.get("amount_max") is not None:
+            lookups["transaction_amount__lte"] = data["amount_max"]
+        if data.get("transaction_type"):
+            if len(data["transaction_type"]) == 1:
+                lookups["transaction_type"] = data["transaction_type"][0]
+            else:
+                lookups["transaction_type__in"] = data["transaction_type"]
+        queryset = queryset.filter(**lookups)
+
+        account = get_user_account(self.request.user)
+        if data.get("q") and account is not None:
+            queryset = search_transactions(queryset, data["q"], account)
+        if data.get("ordering"):
+            queryset = self.filters["ordering"].filter(queryset, data["ordering"])
+        return queryset
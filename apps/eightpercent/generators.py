@@ -0,0 +1,171 @@
+import random
+import uuid
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.core.parallel import process_pool
+from apps.core.utils import batched
+from apps.eightpercent.ledger import bulk_insert_transactions
+from apps.eightpercent.models import Account, Transaction
+from apps.users.models import User
+from apps.users.provisioning import bulk_create_users
+
+DEPOSIT_DESCRIPTIONS = ("급여", "이자", "용돈", "환불", "계좌이체 입금", "투자 원금상환")
+WITHDRAW_DESCRIPTIONS = ("카드대금", "월세", "공과금", "ATM 출금", "계좌이체 출금", "투자")
+
+# Accounts handed to one worker task. Small enough to keep memory flat and
+# the write transaction of a task short.
+ACCOUNTS_PER_TASK = 500
+
+
+def _uuid(rng):
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def _round_amount(amount):
+    return max(100, int(amount) // 100 * 100)
+
+
+def activity_counts(accounts, transactions, alpha, rng):
+    """
+    Split ``transactions`` over ``accounts`` with Pareto distributed weights,
+    so a few accounts are very busy and most see little activity.
+    """
+    weights = [rng.paretovariate(alpha) for _ in range(accounts)]
+    total = sum(weights)
+    counts = [int(transactions * weight / total) for weight in weights]
+    for index in rng.choices(range(accounts), k=transactions - sum(counts)):
+        counts[index] += 1
+    return counts
+
+
+def account_postings(account_id, count, start, span, withdraw_ratio, rng):
+    """
+    Yield ``count`` transaction rows for ``account_id`` in date order.
+
+    Gaps between postings are exponential, which spreads them over ``span``
+    without sorting. Withdrawals never exceed the running balance; the final
+    balance is returned once the generator is exhausted.
+    """
+    balance = 0
+    moment = start
+    rate = count / span.total_seconds() if count else 0
+    for _ in range(count):
+        moment = min(moment + timedelta(seconds=rng.expovariate(rate)), start + span)
+        if balance >= 100 and rng.random() < withdraw_ratio:
+            amount = min(balance, _round_amount(balance * rng.uniform(0.05, 0.6)))
+            balance -= amount
+            transaction_type = Transaction.TransactionTypes.WITHDRAW
+            description = rng.choice(WITHDRAW_DESCRIPTIONS)
+        else:
+            amount = _round_amount(rng.lognormvariate(11, 1))
+            balance += amount
+            transaction_type = Transaction.TransactionTypes.DEPOSIT
+            description = rng.choice(DEPOSIT_DESCRIPTIONS)
+        yield (_uuid(rng), transaction_type, amount, moment, description, account_id)
+    return balance
+
+
+def generate_task(task):
+    """
+    Create the users, tokens, accounts and transactions of one task.
+
+    Runs inside a pool worker, so it only takes picklable arguments and
+    rebuilds its random generator from the task seed.
+    """
+    (
+        seed,
+        prefix,
+        first,
+        counts,
+        password,
+        start,
+        span,
+        withdraw_ratio,
+        batch_size,
+    ) = task
+    rng = random.Random(seed)
+
+    if connection.vendor == "sqlite" and not connection.in_atomic_block:
+        # generated data can be rebuilt, so skip the fsync on every commit
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA synchronous = OFF")
+
+    users = [
+        User(
+            id=_uuid(rng),
+            username=f"{prefix}{first + offset}",
+            email=f"{prefix}{first + offset}@example.com",
+            password=password,
+        )
+        for offset in range(len(counts))
+    ]
+    accounts = [Account(account_number=_uuid(rng), customer=user) for user in users]
+    balances = {}
+
+    def rows():
+        for account, count in zip(accounts, counts):
+            postings = account_postings(
+                account.account_number, count, start, span, withdraw_ratio, rng
+            )
+            balances[account.account_number] = yield from postings
+
+    with transaction.atomic():
+        bulk_create_users(users, create_accounts=False)
+        Account.objects.bulk_create(accounts)
+        inserted = bulk_insert_transactions(rows(), batch_size=batch_size)
+        for account in accounts:
+            account.balance = balances[account.account_number]
+        Account.objects.bulk_update(accounts, ["balance"], batch_size=batch_size)
+    return len(users), inserted
+
+
+def generate_ledger(
+    users,
+    transactions,
+    days=365,
+    withdraw_ratio=0.45,
+    alpha=1.16,
+    workers=1,
+    batch_size=1000,
+    seed=None,
+    prefix=None,
+    password="1234",
+):
+    """
+    Generate a synthetic ledger of ``users`` customers, each with one account,
+    and ``transactions`` postings in total.
+
+    Account balances always equal the sum of their postings. Work is split
+    into tasks of ``ACCOUNTS_PER_TASK`` accounts and fanned out over
+    ``workers`` processes; yields ``(users, transactions)`` per finished task.
+    """
+    rng = random.Random(seed)
+    prefix = prefix or f"gen-{rng.getrandbits(24):06x}-"
+    # a single hash for every synthetic user keeps hashing out of the picture
+    password = make_password(password)
+    end = timezone.now()
+    span = timedelta(days=days)
+    counts = activity_counts(users, transactions, alpha, rng)
+
+    tasks = [
+        (
+            rng.getrandbits(64),
+            prefix,
+            first,
+            task_counts,
+            password,
+            end - span,
+            span,
+            withdraw_ratio,
+            batch_size,
+        )
+        for first, task_counts in zip(
+            range(0, users, ACCOUNTS_PER_TASK), batched(counts, ACCOUNTS_PER_TASK)
+        )
+    ]
+    with process_pool(workers) as pool_map:
+        yield from pool_map(generate_task, tasks)
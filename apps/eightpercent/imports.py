@@ -0,0 +1,254 @@
+import csv
+import hashlib
+import os
+import uuid
+from collections import defaultdict
+from decimal import Decimal, InvalidOperation
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.eightpercent.exports import mark_dirty
+from apps.eightpercent.feed import notify_posted
+from apps.eightpercent.ledger import bulk_insert_transactions
+from apps.eightpercent.limits import built_key
+from apps.eightpercent.models import (
+    Account,
+    LedgerImport,
+    ReconciliationCheckpoint,
+    Statement,
+    Transaction,
+)
+
+REQUIRED_COLUMNS = (
+    "account_number",
+    "transaction_type",
+    "transaction_amount",
+    "transaction_date",
+    "description",
+)
+# Rows validated and inserted in one transaction
+CHUNK_SIZE = 10000
+FINGERPRINT_BYTES = 1 << 20
+
+DESCRIPTION_LENGTH = Transaction._meta.get_field("description").max_length
+AMOUNT_DIGITS = Transaction._meta.get_field("transaction_amount").max_digits
+
+
+class InvalidLedgerFile(Exception):
+    pass
+
+
+def fingerprint(path):
+    digest = hashlib.sha256(str(os.path.getsize(path)).encode())
+    with open(path, "rb") as file:
+        digest.update(file.read(FINGERPRINT_BYTES))
+    return digest.hexdigest()
+
+
+def _parse_line(raw):
+    # one row per line: with strict, a quoted newline is an error
+    return next(csv.reader([raw.decode("utf-8")], strict=True))
+
+
+def read_header(file):
+    """Return the column positions of the header on the first line."""
+    header = [
+        name.strip() for name in _parse_line(file.readline().lstrip(b"\xef\xbb\xbf"))
+    ]
+    missing = [name for name in REQUIRED_COLUMNS if name not in header]
+    if missing:
+        raise InvalidLedgerFile(f"Missing columns: {', '.join(missing)}.")
+    return {
+        name: header.index(name) for name in (*REQUIRED_COLUMNS, "id") if name in header
+    }
+
+
+def parse_row(raw, columns):
+    """
+    Return the row of ``raw`` ordered like ``TRANSACTION_COLUMNS``; raises
+    ``ValueError`` with the reason it is rejected.
+    """
+    try:
+        fields = _parse_line(raw)
+    except (UnicodeDecodeError, csv.Error, StopIteration):
+        raise ValueError("malformed line")
+    if len(fields) < len(columns):
+        raise ValueError("missing fields")
+    value = {name: fields[index].strip() for name, index in columns.items()}
+
+    transaction_type = value["transaction_type"].upper()
+    if transaction_type not in Transaction.TransactionTypes.values:
+        raise ValueError(f"unknown transaction_type {value['transaction_type']!r}")
+    try:
+        amount = Decimal(value["transaction_amount"])
+    except InvalidOperation:
+        raise ValueError("transaction_amount is not a number")
+    if amount <= 0 or amount != amount.to_integral_value():
+        raise ValueError("transaction_amount must be a positive whole number")
+    if len(str(int(amount))) > AMOUNT_DIGITS:
+        raise ValueError("transaction_amount is too large")
+    try:
+        moment = parse_datetime(value["transaction_date"])
+    except ValueError:
+        moment = None
+    if moment is None:
+        raise ValueError("transaction_date is not an ISO 8601 date and time")
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    if len(value["description"]) > DESCRIPTION_LENGTH:
+        raise ValueError(f"description is longer than {DESCRIPTION_LENGTH}")
+    try:
+        account = uuid.UUID(value["account_number"])
+        pk = uuid.UUID(value["id"]) if value.get("id") else uuid.uuid4()
+    except ValueError:
+        raise ValueError("account_number and id must be UUIDs")
+    return (pk, transaction_type, int(amount), moment, value["description"], account)
+
+
+def read_chunks(file, size):
+    """Yield lists of up to ``size`` lines with the offset after them."""
+    while True:
+        lines = []
+        for raw in file:
+            lines.append(raw)
+            if len(lines) == size:
+                break
+        if not lines:
+            return
+        yield lines, file.tell()
+
+
+def _forget(accounts, months):
+    """
+    Drop what was derived from the ledger of ``accounts`` before the import:
+    their reconciliation checkpoints, the statements and the exported
+    months from the earliest imported month on, the withdrawal-limit
+    windows and, through the feed version, the recent activity.
+    """
+    ReconciliationCheckpoint.objects.filter(account_id__in=accounts).delete()
+    by_month = defaultdict(list)
+    for account, moment in months.items():
+        by_month[moment.date().replace(day=1)].append(account)
+    for month, pks in by_month.items():
+        Statement.objects.filter(account_id__in=pks, month__gte=month).delete()
+    if by_month:
+        mark_dirty(min(by_month))
+
+    def invalidate():
+        cache.delete_many([built_key(pk) for pk in accounts])
+        for pk in accounts:
+            notify_posted(pk)
+
+    transaction.on_commit(invalidate)
+
+
+def _add_to_balances(deltas):
+    """
+    Add ``{account: delta}`` to the balances with one ``executemany``; the
+    relative update needs no read and keeps concurrent postings.
+    """
+    field = Account._meta.get_field("balance")
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            "UPDATE {table} SET {balance} = {balance} + %s WHERE {pk} = %s".format(
+                table=qn(Account._meta.db_table),
+                balance=qn(field.column),
+                pk=qn(Account._meta.pk.column),
+            ),
+            [
+                (
+                    field.get_db_prep_save(delta, connection),
+                    Account._meta.pk.get_db_prep_value(pk, connection),
+                )
+                for pk, delta in deltas.items()
+            ],
+        )
+
+
+def import_chunk(ledger_import, lines, position, columns):
+    """
+    Validate and insert one chunk, add the imported totals to the account
+    balances and advance the checkpoint, all in one transaction. Returns
+    ``(imported, rejects)`` with ``rejects`` as ``(line number, reason)``.
+    """
+    first_line = ledger_import.rows + 2  # after the header, 1-based
+    parsed, rejects = [], []
+    for number, raw in enumerate(lines, first_line):
+        if not raw.strip():
+            continue
+        try:
+            parsed.append((number, parse_row(raw, columns)))
+        except ValueError as error:
+            rejects.append((number, str(error)))
+
+    known = set(
+        Account.objects.filter(pk__in={row[5] for _, row in parsed}).values_list(
+            "pk", flat=True
+        )
+    )
+    existing = set()
+    if "id" in columns:
+        existing = set(
+            Transaction.objects.filter(
+                pk__in=[row[0] for _, row in parsed]
+            ).values_list("pk", flat=True)
+        )
+    rows, seen = [], set()
+    for number, row in parsed:
+        if row[5] not in known:
+            rejects.append((number, f"account {row[5]} does not exist"))
+        elif row[0] in existing or row[0] in seen:
+            rejects.append((number, f"transaction {row[0]} is already imported"))
+        else:
+            seen.add(row[0])
+            rows.append(row)
+    rejects.sort()
+
+    deltas, earliest = defaultdict(int), {}
+    for _, transaction_type, amount, moment, _, account in rows:
+        deposit = transaction_type == Transaction.TransactionTypes.DEPOSIT
+        deltas[account] += amount if deposit else -amount
+        earliest[account] = min(moment, earliest.get(account, moment))
+
+    with transaction.atomic():
+        bulk_insert_transactions(rows)
+        _add_to_balances(deltas)
+        _forget(list(deltas), earliest)
+        LedgerImport.objects.filter(pk=ledger_import.pk).update(
+            position=position,
+            rows=ledger_import.rows + len(lines),
+            imported=ledger_import.imported + len(rows),
+            rejected=ledger_import.rejected + len(rejects),
+        )
+    ledger_import.refresh_from_db()
+    return len(rows), rejects
+
+
+def import_ledger(path, chunk_size=CHUNK_SIZE):
+    """
+    Import the transactions of a CSV file, ``chunk_size`` rows at a time.
+
+    The file needs a header with ``REQUIRED_COLUMNS`` and may have an ``id``
+    column; rows whose ``id`` is already in the ledger are rejected, so
+    overlapping extracts can be loaded. Memory stays bounded by the chunk.
+    Progress is checkpointed per chunk, so running it again on the same
+    file resumes after the last committed chunk. Yields ``(imported,
+    rejects)`` per chunk. No ledger events are written: imported history
+    is not part of the change feed.
+    """
+    ledger_import, _ = LedgerImport.objects.get_or_create(
+        fingerprint=fingerprint(path), defaults={"source": os.path.abspath(path)}
+    )
+    if ledger_import.finished_at is not None:
+        return
+    with open(path, "rb") as file:
+        columns = read_header(file)
+        if ledger_import.position:
+            file.seek(ledger_import.position)
+        for lines, position in read_chunks(file, chunk_size):
+            yield import_chunk(ledger_import, lines, position, columns)
+    LedgerImport.objects.filter(pk=ledger_import.pk).update(finished_at=timezone.now())
@@ -0,0 +1,161 @@
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+import numpy as np
+
+from apps.core.parallel import process_pool
+from apps.eightpercent.feed import notify_posted
+from apps.eightpercent.models import (
+    Account,
+    InterestChunk,
+    InterestRun,
+    LedgerEvent,
+    Transaction,
+)
+from apps.eightpercent.reconciliation import account_ranges
+
+# Accounts posted by one worker task, in one database transaction
+ACCOUNTS_PER_TASK = 1000
+
+DAYS_PER_YEAR = 365
+DESCRIPTION = "이자"
+
+
+class RateMismatch(Exception):
+    pass
+
+
+def daily_interest(balances, annual_rate):
+    """
+    Interest of one day on each of ``balances``, rounded down to whole won.
+
+    ``annual_rate / 365`` is applied as an exact integer fraction, so the
+    result never depends on float rounding and cannot overflow int64 for
+    any balance that fits in it.
+    """
+    numerator, denominator = Decimal(annual_rate).as_integer_ratio()
+    denominator *= DAYS_PER_YEAR
+    balances = np.asarray(balances, dtype=np.int64)
+    return balances // denominator * numerator + (
+        balances % denominator * numerator // denominator
+    )
+
+
+def accrue_chunk(chunk_pk):
+    """
+    Post the interest of one chunk and return ``(accounts, interest)``.
+
+    The chunk is claimed, its accounts locked, and the postings, events and
+    balances written in one transaction, so a crashed worker leaves nothing
+    behind and a chunk that is already posted is skipped.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        if not InterestChunk.objects.filter(pk=chunk_pk, posted_at__isnull=True).update(
+            posted_at=now
+        ):
+            return 0, 0
+        chunk = InterestChunk.objects.select_related("run").get(pk=chunk_pk)
+        rows = list(
+            Account.objects.select_for_update()
+            .filter(pk__gte=chunk.first_account, pk__lte=chunk.last_account)
+            .values_list("pk", "balance")
+        )
+        balances = np.fromiter(
+            (int(balance) for _, balance in rows), dtype=np.int64, count=len(rows)
+        )
+        interest = daily_interest(balances, chunk.run.annual_rate)
+        paid = np.flatnonzero(interest > 0)
+
+        postings = Transaction.objects.bulk_create(
+            [
+                Transaction(
+                    account_id=rows[index][0],
+                    transaction_type=Transaction.TransactionTypes.DEPOSIT,
+                    transaction_amount=int(interest[index]),
+                    description=DESCRIPTION,
+                )
+                for index in paid
+            ]
+        )
+        new_balances = balances[paid] + interest[paid]
+        LedgerEvent.objects.bulk_create(
+            [
+                LedgerEvent(
+                    account_id=posted.account_id,
+                    event_type=LedgerEvent.EventTypes.POSTED,
+                    payload={
+                        "transaction": posted.id,
+                        "transaction_type": posted.transaction_type,
+                        "transaction_amount": posted.transaction_amount,
+                        "balance": int(balance),
+                        "description": DESCRIPTION,
+                        "transaction_date": posted.transaction_date,
+                    },
+                )
+                for posted, balance in zip(postings, new_balances)
+            ]
+        )
+        Account.objects.bulk_update(
+            [
+                Account(account_number=rows[index][0], balance=int(balance))
+                for index, balance in zip(paid, new_balances)
+            ],
+            ["balance"],
+            batch_size=500,
+        )
+        chunk.accounts = len(paid)
+        chunk.interest = int(interest.sum())
+        chunk.save(update_fields=["accounts", "interest"])
+
+        paid_accounts = [rows[index][0] for index in paid]
+        transaction.on_commit(
+            lambda: [notify_posted(account_pk) for account_pk in paid_accounts]
+        )
+    return chunk.accounts, chunk.interest
+
+
+def plan_run(accrual_date, annual_rate, size=ACCOUNTS_PER_TASK):
+    """
+    Return the ``InterestRun`` of ``accrual_date``, splitting the accounts
+    into chunks when it is new. Resuming a run with another rate raises
+    ``RateMismatch``.
+    """
+    annual_rate = Decimal(annual_rate)
+    with transaction.atomic():
+        run, created = InterestRun.objects.get_or_create(
+            accrual_date=accrual_date, defaults={"annual_rate": annual_rate}
+        )
+        if created:
+            InterestChunk.objects.bulk_create(
+                InterestChunk(run=run, first_account=first, last_account=last)
+                for first, last in account_ranges(size)
+            )
+    if run.annual_rate != annual_rate:
+        raise RateMismatch(
+            f"Interest of {accrual_date} was started at {run.annual_rate}."
+        )
+    return run
+
+
+def accrue_interest(accrual_date, annual_rate, workers=1, size=ACCOUNTS_PER_TASK):
+    """
+    Credit one day of interest at ``annual_rate`` to every account.
+
+    The chunks of the run are fanned out over ``workers`` processes; yields
+    ``(accounts, interest)`` per posted chunk. Running it again for the same
+    date only posts the chunks a crashed run left unposted.
+    """
+    run = plan_run(accrual_date, annual_rate, size)
+    pending = list(
+        run.interestchunk_set.filter(posted_at__isnull=True)
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+    with process_pool(workers) as pool_map:
+        yield from pool_map(accrue_chunk, pending)
+    InterestRun.objects.filter(pk=run.pk, finished_at__isnull=True).update(
+        finished_at=timezone.now()
+    )
@@ -0,0 +1,156 @@
+import sqlite3
+
+from django.db import connections, transaction
+from django.db.models import F
+
+from apps.core.utils import batched
+from apps.eightpercent.feed import notify_posted
+from apps.eightpercent.limits import record_withdrawal
+from apps.eightpercent.models import Account, LedgerEvent, Transaction
+from apps.eightpercent.recent import record_posting
+
+TRANSACTION_COLUMNS = (
+    "id",
+    "transaction_type",
+    "transaction_amount",
+    "transaction_date",
+    "description",
+    "account",
+)
+
+
+def bulk_insert_transactions(rows, using="default", batch_size=1000):
+    """
+    Insert ``rows`` into ``transactions`` with multi-row ``INSERT`` statements.
+
+    Each row is a tuple ordered like ``TRANSACTION_COLUMNS``. Unlike
+    ``bulk_create`` this keeps the given ``transaction_date`` instead of
+    letting ``auto_now_add`` overwrite it, which historical data needs.
+    Returns the number of inserted rows.
+    """
+    connection = connections[using]
+    fields = [Transaction._meta.get_field(name) for name in TRANSACTION_COLUMNS]
+    qn = connection.ops.quote_name
+    sql = "INSERT INTO {} ({}) VALUES ".format(
+        qn(Transaction._meta.db_table), ", ".join(qn(f.column) for f in fields)
+    )
+    placeholder = "({})".format(", ".join(["%s"] * len(fields)))
+    batch_size = min(
+        batch_size, connection.ops.bulk_batch_size(fields, [None] * batch_size)
+    )
+
+    inserted = 0
+    with connection.cursor() as cursor:
+        for batch in batched(rows, batch_size):
+            params = [
+                field.get_db_prep_save(value, connection)
+                for row in batch
+                for field, value in zip(fields, row)
+            ]
+            cursor.execute(sql + ", ".join([placeholder] * len(batch)), params)
+            inserted += len(batch)
+    return inserted
+
+
+class InsufficientBalance(Exception):
+    pass
+
+
+def _can_return_from_update(connection):
+    if connection.vendor == "sqlite":
+        return sqlite3.sqlite_version_info >= (3, 35)
+    return connection.vendor == "postgresql"
+
+
+def _move_balance(account, delta, minimum, using):
+    """
+    Add ``delta`` to the balance of ``account`` unless it is below ``minimum``
+    and return the new balance, or ``None`` when the guard rejected it.
+
+    The check and the write are one ``UPDATE`` so concurrent postings can
+    neither lose an update nor overdraw the account.
+    """
+    connection = connections[using]
+    if not _can_return_from_update(connection):
+        updated = (
+            Account.objects.using(using)
+            .filter(pk=account.pk, balance__gte=minimum)
+            .update(balance=F("balance") + delta)
+        )
+        if not updated:
+            return None
+        return (
+            Account.objects.using(using)
+            .values_list("balance", flat=True)
+            .get(pk=account.pk)
+        )
+
+    field = Account._meta.get_field("balance")
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "UPDATE {table} SET {balance} = {balance} + %s "
+            "WHERE {pk} = %s AND {balance} >= %s RETURNING {balance}".format(
+                table=qn(Account._meta.db_table),
+                balance=qn(field.column),
+                pk=qn(Account._meta.pk.column),
+            ),
+            [
+                field.get_db_prep_save(delta, connection),
+                Account._meta.pk.get_db_prep_value(account.pk, connection),
+                field.get_db_prep_save(minimum, connection),
+            ],
+        )
+        row = cursor.fetchone()
+    return None if row is None else field.to_python(row[0])
+
+
+def post_transaction(
+    account, transaction_type, transaction_amount, description, using="default"
+):
+    """
+    Post a deposit or withdrawal on ``account`` and return the ``Transaction``.
+
+    The balance update, the ledger row and its ``LedgerEvent`` are written
+    in one atomic block and ``account.balance`` is refreshed with the stored
+    value. Withdrawals are counted towards the withdrawal limits, and feed
+    waiters are woken and the recent activity extended once the block
+    commits. Raises
+    ``InsufficientBalance`` when a withdrawal would overdraw the account.
+    """
+    if transaction_type == Transaction.TransactionTypes.WITHDRAW:
+        delta, minimum = -transaction_amount, transaction_amount
+    else:
+        delta, minimum = transaction_amount, 0
+
+    with transaction.atomic(using=using, savepoint=False):
+        balance = _move_balance(account, delta, minimum, using)
+        if balance is None:
+            raise InsufficientBalance(account.pk)
+        account.balance = balance
+        posted = Transaction.objects.using(using).create(
+            account=account,
+            transaction_type=transaction_type,
+            transaction_amount=transaction_amount,
+            description=description,
+        )
+        LedgerEvent.objects.using(using).create(
+            account=account,
+            event_type=LedgerEvent.EventTypes.POSTED,
+            payload={
+                "transaction": posted.id,
+                "transaction_type": transaction_type,
+                "transaction_amount": int(transaction_amount),
+                "balance": int(balance),
+                "description": description,
+                "transaction_date": posted.transaction_date,
+            },
+        )
+        if transaction_type == Transaction.TransactionTypes.WITHDRAW:
+            # counted before the commit, so a rollback errs on the strict side
+            record_withdrawal(account.pk, transaction_amount, posted.transaction_date)
+        transaction.on_commit(
+            lambda: record_posting(account.pk, notify_posted(account.pk), posted),
+            using=using,
+        )
+        return posted
@@ -0,0 +1,180 @@
+from collections import namedtuple
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from apps.core.caches import is_shared
+from apps.core.utils import LRUCache
+from apps.eightpercent.models import Transaction
+
+# Buckets a window is split into; windows slide one bucket at a time
+BUCKETS = 24
+# A bucket counter packs the amount above the count of its withdrawals,
+# so one cache ``incr`` records both
+COUNT_BITS = 20
+
+# Accounts whose closed buckets a process remembers
+MAX_LOCAL_ACCOUNTS = 10000
+
+
+class WithdrawalLimitExceeded(Exception):
+    pass
+
+
+Limit = namedtuple("Limit", "seconds max_count max_amount")
+
+
+def get_limits():
+    """``WITHDRAW_LIMITS`` as ``Limit`` tuples of (seconds, count, amount)."""
+    return [Limit(*limit) for limit in settings.WITHDRAW_LIMITS]
+
+
+def bucket_seconds(limit):
+    return max(1, limit.seconds // BUCKETS)
+
+
+def pack(count, amount):
+    return (int(amount) << COUNT_BITS) | count
+
+
+def unpack(value):
+    return value & ((1 << COUNT_BITS) - 1), value >> COUNT_BITS
+
+
+def built_key(account_pk):
+    return f"limits:{account_pk}:built"
+
+
+def bucket_key(limit, account_pk, bucket):
+    return f"limits:{limit.seconds}:{account_pk}:{bucket}"
+
+
+# account pk -> {limit: (last closed bucket, {bucket: packed})}
+_local = LRUCache(MAX_LOCAL_ACCOUNTS)
+
+
+def _count(account_pk, limits, now):
+    """Count the windows of an account from its withdrawals in the ledger."""
+    # start of the oldest bucket still in a window
+    since = min(
+        (int(now.timestamp() // bucket_seconds(limit)) - BUCKETS + 1)
+        * bucket_seconds(limit)
+        for limit in limits
+    )
+    withdrawals = Transaction.objects.filter(
+        account_id=account_pk,
+        transaction_type=Transaction.TransactionTypes.WITHDRAW,
+        transaction_date__gte=datetime.fromtimestamp(since, timezone.utc),
+    ).values_list("transaction_date", "transaction_amount")
+    windows = {limit: {} for limit in limits}
+    for moment, amount in withdrawals:
+        for limit, buckets in windows.items():
+            bucket = int(moment.timestamp() // bucket_seconds(limit))
+            buckets[bucket] = buckets.get(bucket, 0) + pack(1, amount)
+    return windows
+
+
+def _rebuild(account_pk, limits, now):
+    """Recount the windows of an account from the ledger into the cache."""
+    windows = _count(account_pk, limits, now)
+    for limit, buckets in windows.items():
+        cache.set_many(
+            {bucket_key(limit, account_pk, b): v for b, v in buckets.items()},
+            timeout=limit.seconds + bucket_seconds(limit),
+        )
+    cache.set(built_key(account_pk), 1, timeout=max(limit.seconds for limit in limits))
+    return windows
+
+
+def window_totals(account_pk, limits, now):
+    """
+    Return ``{limit: (count, amount)}`` of the withdrawals of an account in
+    each limit's window.
+
+    Buckets that closed are immutable, so a process keeps them in a local
+    LRU and only reads the open buckets from the cache: one ``get_many``
+    and no SQL per check. An account the cache knows nothing about is
+    rebuilt from the ledger with one range scan of the
+    ``(account, transaction_date)`` index. With a process-local cache,
+    which misses the withdrawals of other processes, every check is
+    counted from the ledger that way.
+    """
+    current = {limit: int(now.timestamp() // bucket_seconds(limit)) for limit in limits}
+    if not is_shared():
+        windows = _count(account_pk, limits, now)
+        return {
+            limit: unpack(
+                sum(
+                    v for b, v in windows[limit].items() if b > current[limit] - BUCKETS
+                )
+            )
+            for limit in limits
+        }
+
+    state = _local.get(account_pk) or {}
+    wanted = {}
+    for limit in limits:
+        oldest = current[limit] - BUCKETS
+        through = state[limit][0] if limit in state else oldest
+        for bucket in range(max(through, oldest) + 1, current[limit] + 1):
+            wanted[bucket_key(limit, account_pk, bucket)] = (limit, bucket)
+    values = cache.get_many([built_key(account_pk), *wanted])
+
+    if built_key(account_pk) not in values:
+        windows = _rebuild(account_pk, limits, now)
+    else:
+        windows = {
+            limit: dict(state[limit][1]) if limit in state else {} for limit in limits
+        }
+        for key, (limit, bucket) in wanted.items():
+            windows[limit][bucket] = values.get(key, 0)
+
+    totals, state = {}, {}
+    for limit in limits:
+        oldest = current[limit] - BUCKETS
+        buckets = {b: v for b, v in windows[limit].items() if b > oldest}
+        totals[limit] = unpack(sum(buckets.values()))
+        buckets.pop(current[limit], None)  # still open
+        state[limit] = (current[limit] - 1, buckets)
+    _local.set(account_pk, state)
+    return totals
+
+
+def check_withdrawal(account_pk, amount, now=None):
+    """
+    Raise ``WithdrawalLimitExceeded`` when withdrawing ``amount`` would
+    break one of ``WITHDRAW_LIMITS``.
+
+    The check does not reserve anything, so withdrawals racing on one
+    account can overshoot a limit by the ones in flight.
+    """
+    limits = get_limits()
+    if not limits:
+        return
+    totals = window_totals(account_pk, limits, now or timezone.now())
+    for limit, (count, total) in totals.items():
+        if limit.max_count is not None and count + 1 > limit.max_count:
+            raise WithdrawalLimitExceeded(
+                f"At most {limit.max_count} withdrawals per {limit.seconds}s."
+            )
+        if limit.max_amount is not None and total + amount > limit.max_amount:
+            raise WithdrawalLimitExceeded(
+                f"At most {limit.max_amount} withdrawn per {limit.seconds}s."
+            )
+
+
+def record_withdrawal(account_pk, amount, moment):
+    """Count a posted withdrawal in the windows of its account."""
+    if not is_shared():
+        return
+    for limit in get_limits():
+        key = bucket_key(
+            limit, account_pk, int(moment.timestamp() // bucket_seconds(limit))
+        )
+        cache.add(key, 0, timeout=limit.seconds + bucket_seconds(limit))
+        try:
+            cache.incr(key, pack(1, amount))
+        except ValueError:  # evicted in between; recount from the ledger
+            cache.delete(built_key(account_pk))
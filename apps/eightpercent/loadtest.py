@@ -0,0 +1,143 @@
+import random
+import statistics
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connection
+from django.db.models import Case, DecimalField, F, Q, Sum, When
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from apps.core.parallel import process_pool
+from apps.eightpercent.models import Transaction
+
+# The over-limit amount is far above anything the mix can deposit, so every
+# such withdrawal must be rejected.
+OVER_LIMIT_AMOUNT = 10**15
+
+
+def _operation(rng, mix):
+    roll = rng.random()
+    if roll < mix["deposit"]:
+        return (
+            "deposit",
+            reverse("eightpercent:deposits"),
+            rng.randrange(100, 50000, 100),
+        )
+    if roll < mix["deposit"] + mix["withdraw"]:
+        return (
+            "withdraw",
+            reverse("eightpercent:withdraw"),
+            rng.randrange(100, 50000, 100),
+        )
+    return "over_limit", reverse("eightpercent:withdraw"), OVER_LIMIT_AMOUNT
+
+
+def _run_thread(tokens, requests, mix, seed):
+    """Fire ``requests`` postings at random shared accounts; return samples."""
+    rng = random.Random(seed)
+    clients = {}
+    samples = []
+    try:
+        for _ in range(requests):
+            token = rng.choice(tokens)
+            if token not in clients:
+                clients[token] = APIClient(raise_request_exception=False)
+                clients[token].credentials(HTTP_AUTHORIZATION=f"Token {token}")
+            name, url, amount = _operation(rng, mix)
+            begin = time.perf_counter()
+            response = clients[token].post(
+                url,
+                data={"transaction_amount": amount, "description": "loadtest"},
+                format="json",
+            )
+            samples.append((name, time.perf_counter() - begin, response.status_code))
+    finally:
+        # every thread owns a connection of its own
+        connection.close()
+    return samples
+
+
+def run_process(task):
+    """Run ``threads`` concurrent posting loops in this process."""
+    tokens, threads, requests, mix, seed = task
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        futures = [
+            pool.submit(_run_thread, tokens, requests, mix, seed + index)
+            for index in range(threads)
+        ]
+        return [sample for future in futures for sample in future.result()]
+
+
+def run_load(tokens, processes, threads, requests, mix, seed=0):
+    """
+    Hammer the posting endpoints from ``processes`` x ``threads`` workers,
+    each sending ``requests`` postings, and return the collected samples as
+    ``(operation, seconds, status code)`` tuples plus the wall time.
+    """
+    tasks = [
+        (tokens, threads, requests, mix, seed + index * threads)
+        for index in range(processes)
+    ]
+    started = time.perf_counter()
+    with process_pool(processes) as pool_map:
+        samples = [sample for chunk in pool_map(run_process, tasks) for sample in chunk]
+    return samples, time.perf_counter() - started
+
+
+def _percentiles(values):
+    if len(values) < 2:
+        return values * 99
+    return statistics.quantiles(values, n=100, method="inclusive")
+
+
+def summarize(samples, elapsed):
+    """Status counts and latency percentiles (ms) per operation."""
+    durations = defaultdict(list)
+    statuses = defaultdict(Counter)
+    for name, duration, status_code in samples:
+        durations[name].append(duration)
+        statuses[name][status_code] += 1
+
+    report = {
+        "requests": len(samples),
+        "elapsed": round(elapsed, 3),
+        "requests_per_second": round(len(samples) / elapsed, 1) if elapsed else None,
+        "operations": {},
+    }
+    for name, values in durations.items():
+        cuts = _percentiles(values)
+        report["operations"][name] = {
+            "requests": len(values),
+            "statuses": dict(statuses[name]),
+            "p50_ms": round(cuts[49] * 1000, 3),
+            "p95_ms": round(cuts[94] * 1000, 3),
+            "p99_ms": round(cuts[98] * 1000, 3),
+        }
+    return report
+
+
+def check_ledger_integrity(accounts):
+    """
+    Return the accounts among ``accounts`` whose balance differs from the net
+    sum of their transactions, or is negative.
+    """
+    signed_amount = Case(
+        When(
+            transaction__transaction_type=Transaction.TransactionTypes.WITHDRAW,
+            then=-F("transaction__transaction_amount"),
+        ),
+        default=F("transaction__transaction_amount"),
+        output_field=DecimalField(max_digits=20, decimal_places=0),
+    )
+    return list(
+        accounts.annotate(ledger=Sum(signed_amount))
+        .filter(
+            Q(balance__lt=0)
+            | ~Q(balance=F("ledger"))
+            | Q(ledger__isnull=True, balance__gt=0)
+        )
+        .values("account_number", "balance", "ledger")
+    )
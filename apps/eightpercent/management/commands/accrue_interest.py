@@ -0,0 +1,67 @@
+import time
+from datetime import date, timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.eightpercent.interest import ACCOUNTS_PER_TASK, RateMismatch, accrue_interest
+
+
+class Command(BaseCommand):
+    help = (
+        "Credit one day of interest to every account. Safe to rerun: a "
+        "crashed run resumes without posting any account twice."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--date",
+            type=date.fromisoformat,
+            default=None,
+            help="Day the interest is for, YYYY-MM-DD (default: yesterday)",
+        )
+        parser.add_argument(
+            "--rate",
+            default=None,
+            help="Yearly rate, e.g. 0.02 (default: INTEREST_ANNUAL_RATE)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Worker processes; keep 1 on SQLite, which serializes writers",
+        )
+        parser.add_argument("--accounts-per-task", type=int, default=ACCOUNTS_PER_TASK)
+
+    def handle(self, *args, **kwargs):
+        accrual_date = kwargs["date"] or timezone.localdate() - timedelta(days=1)
+        try:
+            rate = Decimal(kwargs["rate"] or settings.INTEREST_ANNUAL_RATE)
+        except InvalidOperation:
+            raise CommandError("--rate must be a decimal number.")
+        if not 0 <= rate < 1:
+            raise CommandError("--rate must be between 0 and 1.")
+
+        started = time.perf_counter()
+        accounts = interest = 0
+        try:
+            for chunk_accounts, chunk_interest in accrue_interest(
+                accrual_date,
+                rate,
+                workers=kwargs["workers"],
+                size=kwargs["accounts_per_task"],
+            ):
+                accounts += chunk_accounts
+                interest += chunk_interest
+        except RateMismatch as error:
+            raise CommandError(str(error))
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Credited {interest} of interest for {accrual_date} to "
+                f"{accounts} accounts in {elapsed:.1f}s"
+            )
+        )
@@ -0,0 +1,72 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from apps.eightpercent.benchmarks import find_regressions, run_benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the account, history, deposit, withdraw and login endpoints "
+        "in-process against a seeded ledger and report latency percentiles, "
+        "queries per request and throughput"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=200)
+        parser.add_argument("--transactions", type=int, default=20000)
+        parser.add_argument(
+            "--requests", type=int, default=200, help="Measured requests per endpoint"
+        )
+        parser.add_argument("--warmup", type=int, default=10)
+        parser.add_argument("--seed", type=int, default=None)
+        parser.add_argument("--output", help="Write the JSON report to this path")
+        parser.add_argument("--baseline", help="JSON report of a previous run")
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=20.0,
+            help="Allowed p95 growth over the baseline, in percent",
+        )
+        parser.add_argument(
+            "--keep-data",
+            action="store_true",
+            help="Keep the seeded ledger instead of rolling it back",
+        )
+
+    def handle(self, *args, **kwargs):
+        with transaction.atomic():
+            result = run_benchmark(
+                kwargs["users"],
+                kwargs["transactions"],
+                kwargs["requests"],
+                warmup=kwargs["warmup"],
+                seed=kwargs["seed"],
+            )
+            if not kwargs["keep_data"]:
+                transaction.set_rollback(True)
+
+        self.stdout.write(
+            f"{'endpoint':<10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+            f"{'queries':>10}{'req/s':>10}{'errors':>8}"
+        )
+        for name, row in result["endpoints"].items():
+            self.stdout.write(
+                f"{name:<10}{row['p50_ms']:>10}{row['p95_ms']:>10}{row['p99_ms']:>10}"
+                f"{row['queries_per_request']:>10}{row['requests_per_second']:>10}"
+                f"{row['errors']:>8}"
+            )
+
+        if kwargs["output"]:
+            with open(kwargs["output"], "w") as f:
+                json.dump(result, f, indent=2)
+
+        if kwargs["baseline"]:
+            with open(kwargs["baseline"]) as f:
+                regressions = find_regressions(
+                    result, json.load(f), kwargs["threshold"]
+                )
+            if regressions:
+                raise CommandError("Regressions found:\n" + "\n".join(regressions))
+            self.stdout.write(self.style.SUCCESS("No regressions against the baseline"))
@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.eightpercent.exports import (
+    ROWS_PER_READ,
+    export_accounts,
+    export_transactions,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Export the transactions posted since the last run, partitioned by "
+        "month, and a snapshot of the accounts as Parquet files for analytics."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dir", default=None, help="Target directory (default: LEDGER_EXPORT_DIR)"
+        )
+        parser.add_argument("--rows-per-read", type=int, default=ROWS_PER_READ)
+
+    def handle(self, *args, **kwargs):
+        started = time.perf_counter()
+        transactions, files = export_transactions(
+            kwargs["dir"], size=kwargs["rows_per_read"]
+        )
+        accounts = export_accounts(kwargs["dir"], size=kwargs["rows_per_read"])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Exported {transactions} transactions to {files} files and "
+                f"{accounts} accounts in {elapsed:.1f}s"
+            )
+        )
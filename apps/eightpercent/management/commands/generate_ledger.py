@@ -0,0 +1,70 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.eightpercent.generators import generate_ledger
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate synthetic users, accounts and transactions for load and "
+        "scale testing. Balances always match the generated postings."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--transactions", type=int, default=100000)
+        parser.add_argument(
+            "--days", type=int, default=365, help="Spread postings over this many days"
+        )
+        parser.add_argument(
+            "--withdraw-ratio",
+            type=float,
+            default=0.45,
+            help="Share of postings that try to withdraw",
+        )
+        parser.add_argument(
+            "--alpha",
+            type=float,
+            default=1.16,
+            help="Pareto shape of the activity per account (lower is more skewed)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Worker processes; keep 1 on SQLite, which serializes writers",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--seed", type=int, default=None)
+        parser.add_argument(
+            "--prefix", default=None, help="Username prefix of the generated users"
+        )
+        parser.add_argument("--password", default="1234")
+
+    def handle(self, *args, **kwargs):
+        started = time.perf_counter()
+        users = transactions = 0
+        for task_users, task_transactions in generate_ledger(
+            kwargs["users"],
+            kwargs["transactions"],
+            days=kwargs["days"],
+            withdraw_ratio=kwargs["withdraw_ratio"],
+            alpha=kwargs["alpha"],
+            workers=kwargs["workers"],
+            batch_size=kwargs["batch_size"],
+            seed=kwargs["seed"],
+            prefix=kwargs["prefix"],
+            password=kwargs["password"],
+        ):
+            users += task_users
+            transactions += task_transactions
+            self.stdout.write(f"{users} users, {transactions} transactions")
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Generated {users} users and {transactions} transactions in "
+                f"{elapsed:.1f}s ({transactions / elapsed if elapsed else 0:.0f} rows/s)"
+            )
+        )
@@ -0,0 +1,76 @@
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from apps.eightpercent.statements import (
+    ACCOUNTS_PER_TASK,
+    generate_statements,
+    previous_month,
+)
+
+
+def parse_month(value):
+    return datetime.strptime(value, "%Y-%m").date()
+
+
+class Command(BaseCommand):
+    help = (
+        "Render the monthly statements of every account to PRIVATE_ROOT. "
+        "Accounts that already have one are skipped unless --force is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--month",
+            type=parse_month,
+            default=None,
+            help="Month to generate, YYYY-MM (default: last month)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Worker processes; keep 1 on SQLite, which serializes writers",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Regenerate existing statements, e.g. after a correction",
+        )
+        parser.add_argument(
+            "--account",
+            action="append",
+            dest="accounts",
+            default=None,
+            help="Only this account number; may be repeated",
+        )
+        parser.add_argument("--accounts-per-task", type=int, default=ACCOUNTS_PER_TASK)
+
+    def handle(self, *args, **kwargs):
+        if kwargs["workers"] > 1 and connection.vendor == "sqlite":
+            self.stderr.write(
+                self.style.WARNING(
+                    "SQLite serializes writers; more than one worker only "
+                    "adds lock waits."
+                )
+            )
+        month = kwargs["month"] or previous_month(timezone.localdate())
+        started = time.perf_counter()
+        written = sum(
+            generate_statements(
+                month.replace(day=1),
+                workers=kwargs["workers"],
+                force=kwargs["force"],
+                accounts=kwargs["accounts"],
+                size=kwargs["accounts_per_task"],
+            )
+        )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Generated {written} statements for {month:%Y-%m} in {elapsed:.1f}s"
+            )
+        )
@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.eightpercent.imports import CHUNK_SIZE, InvalidLedgerFile, import_ledger
+
+
+class Command(BaseCommand):
+    help = (
+        "Import historical transactions from a CSV file and add them to the "
+        "account balances. An interrupted import resumes when run again."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path",
+            help="CSV with account_number, transaction_type, transaction_amount, "
+            "transaction_date, description and optionally id columns",
+        )
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **kwargs):
+        started = time.perf_counter()
+        imported = rejected = 0
+        try:
+            for chunk_imported, rejects in import_ledger(
+                kwargs["path"], chunk_size=kwargs["chunk_size"]
+            ):
+                imported += chunk_imported
+                rejected += len(rejects)
+                for line, reason in rejects:
+                    self.stderr.write(f"line {line}: {reason}")
+                self.stdout.write(f"{imported} imported, {rejected} rejected")
+        except (OSError, InvalidLedgerFile) as error:
+            raise CommandError(str(error))
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {imported} transactions in {elapsed:.1f}s, "
+                f"{rejected} rows rejected"
+            )
+        )
@@ -0,0 +1,92 @@
+import json
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+
+from rest_framework.authtoken.models import Token
+
+from apps.eightpercent.generators import generate_ledger
+from apps.eightpercent.loadtest import check_ledger_integrity, run_load, summarize
+from apps.eightpercent.models import Account
+
+
+class Command(BaseCommand):
+    help = (
+        "Fire concurrent deposits, withdrawals and over-limit withdrawals at "
+        "shared accounts, then check that every balance equals its ledger. "
+        "Runs against the configured database, e.g. DATABASE_URL=postgres://..."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--accounts", type=int, default=10, help="Shared accounts under contention"
+        )
+        parser.add_argument(
+            "--seed-transactions",
+            type=int,
+            default=1000,
+            help="Postings generated for the accounts before the run",
+        )
+        parser.add_argument("--processes", type=int, default=1)
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument(
+            "--requests", type=int, default=100, help="Postings sent by each thread"
+        )
+        parser.add_argument("--deposit", type=float, default=0.45)
+        parser.add_argument("--withdraw", type=float, default=0.45)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", help="Write the JSON report to this path")
+
+    def handle(self, *args, **kwargs):
+        prefix = f"load-{uuid.uuid4().hex[:8]}-"
+        for _ in generate_ledger(
+            kwargs["accounts"],
+            kwargs["seed_transactions"],
+            seed=kwargs["seed"],
+            prefix=prefix,
+        ):
+            pass
+        tokens = list(
+            Token.objects.filter(user__username__startswith=prefix).values_list(
+                "key", flat=True
+            )
+        )
+
+        samples, elapsed = run_load(
+            tokens,
+            kwargs["processes"],
+            kwargs["threads"],
+            kwargs["requests"],
+            {"deposit": kwargs["deposit"], "withdraw": kwargs["withdraw"]},
+            seed=kwargs["seed"],
+        )
+        report = summarize(samples, elapsed)
+        accounts = Account.objects.filter(customer__username__startswith=prefix)
+        report["mismatches"] = [
+            {key: str(value) for key, value in row.items()}
+            for row in check_ledger_integrity(accounts)
+        ]
+        over_limit = report["operations"].get("over_limit", {}).get("statuses", {})
+        report["overdrafts"] = sum(
+            count for status_code, count in over_limit.items() if status_code < 300
+        )
+
+        self.stdout.write(
+            f"{report['requests']} postings in {report['elapsed']}s "
+            f"({report['requests_per_second']} req/s)"
+        )
+        for name, row in report["operations"].items():
+            self.stdout.write(
+                f"{name:<12} p50 {row['p50_ms']}ms  p95 {row['p95_ms']}ms  "
+                f"p99 {row['p99_ms']}ms  statuses {row['statuses']}"
+            )
+        if kwargs["output"]:
+            with open(kwargs["output"], "w") as f:
+                json.dump(report, f, indent=2)
+
+        if report["mismatches"] or report["overdrafts"]:
+            raise CommandError(
+                f"Ledger integrity broken: {len(report['mismatches'])} mismatched "
+                f"accounts, {report['overdrafts']} accepted over-limit withdrawals"
+            )
+        self.stdout.write(self.style.SUCCESS("Ledger integrity holds"))
@@ -0,0 +1,70 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from apps.eightpercent.reconciliation import ACCOUNTS_PER_TASK, reconcile_ledger
+
+
+class Command(BaseCommand):
+    help = (
+        "Verify that account balances equal the sum of their transactions. "
+        "Only postings after each account's checkpoint are read."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Worker processes; keep 1 on SQLite, which serializes writers",
+        )
+        parser.add_argument("--accounts-per-task", type=int, default=ACCOUNTS_PER_TASK)
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Ignore the checkpoints and recompute every balance",
+        )
+        parser.add_argument(
+            "--repair",
+            action="store_true",
+            help="Reset mismatched balances to the sum of their transactions",
+        )
+
+    def handle(self, *args, **kwargs):
+        if kwargs["workers"] > 1 and connection.vendor == "sqlite":
+            self.stderr.write(
+                self.style.WARNING(
+                    "SQLite serializes writers; more than one worker only "
+                    "adds lock waits."
+                )
+            )
+        started = time.perf_counter()
+        checked = advanced = repaired = 0
+        mismatches = []
+        for result in reconcile_ledger(
+            workers=kwargs["workers"],
+            full=kwargs["full"],
+            repair=kwargs["repair"],
+            size=kwargs["accounts_per_task"],
+        ):
+            checked += result["checked"]
+            advanced += result["advanced"]
+            repaired += result["repaired"]
+            mismatches += result["mismatches"]
+            for account, expected, actual in result["mismatches"]:
+                self.stdout.write(
+                    self.style.ERROR(
+                        f"{account}: balance {actual}, transactions sum to "
+                        f"{expected} ({actual - expected:+d})"
+                    )
+                )
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"Checked {checked} accounts in {elapsed:.1f}s, "
+            f"{advanced} checkpoints advanced, {len(mismatches)} mismatched"
+            + (f", {repaired} repaired" if kwargs["repair"] else "")
+        )
+        if mismatches and not kwargs["repair"]:
+            raise CommandError(f"{len(mismatches)} account balances do not match.")
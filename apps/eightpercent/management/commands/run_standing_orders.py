@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.eightpercent.standing_orders import run_due_orders
+
+
+class Command(BaseCommand):
+    help = "Post due standing orders; several schedulers can run side by side"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch", type=int, default=100, help="Orders posted per transaction"
+        )
+        parser.add_argument(
+            "--sleep", type=float, default=1.0, help="Seconds to wait when idle"
+        )
+        parser.add_argument(
+            "--once", action="store_true", help="Exit when no order is due"
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.perf_counter()
+            posted, failed = run_due_orders(options["batch"])
+            if not posted and not failed:
+                if options["once"]:
+                    return
+                time.sleep(options["sleep"])
+                continue
+            self.stdout.write(
+                f"Posted {posted} standing order(s), {failed} failed, "
+                f"in {time.perf_counter() - started:.3f}s"
+            )
@@ -0,0 +1,86 @@
+from django.db import migrations
+
+
+class RunSQLOn(migrations.RunSQL):
+    """``RunSQL`` applied only on databases of ``vendor``."""
+
+    def __init__(self, vendor, *args, **kwargs):
+        self.vendor = vendor
+        super().__init__(*args, **kwargs)
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == self.vendor:
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == self.vendor:
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ("eightpercent", "0001_initial"),
+    ]
+
+    operations = [
+        RunSQLOn(
+            "sqlite",
+            [
+                """
+                CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5(
+                    description,
+                    account_id,
+                    transaction_id UNINDEXED,
+                    tokenize = 'trigram'
+                )
+                """,
+                """
+                CREATE TRIGGER IF NOT EXISTS transactions_fts_insert
+                AFTER INSERT ON transactions BEGIN
+                    INSERT INTO transactions_fts (description, account_id, transaction_id)
+                    VALUES (new.description, new.account_id, new.id);
+                END
+                """,
+                """
+                CREATE TRIGGER IF NOT EXISTS transactions_fts_update
+                AFTER UPDATE OF description, account_id ON transactions BEGIN
+                    UPDATE transactions_fts
+                    SET description = new.description, account_id = new.account_id
+                    WHERE transaction_id = old.id;
+                END
+                """,
+                """
+                CREATE TRIGGER IF NOT EXISTS transactions_fts_delete
+                AFTER DELETE ON transactions BEGIN
+                    DELETE FROM transactions_fts WHERE transaction_id = old.id;
+                END
+                """,
+                """
+                INSERT INTO transactions_fts (description, account_id, transaction_id)
+                SELECT description, account_id, id FROM transactions
+                """,
+            ],
+            [
+                "DROP TRIGGER IF EXISTS transactions_fts_insert",
+                "DROP TRIGGER IF EXISTS transactions_fts_update",
+                "DROP TRIGGER IF EXISTS transactions_fts_delete",
+                "DROP TABLE IF EXISTS transactions_fts",
+            ],
+        ),
+        RunSQLOn(
+            "postgresql",
+            [
+                "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS "
+                "transactions_description_upper_trgm "
+                "ON transactions USING gin (UPPER(description) gin_trgm_ops)",
+            ],
+            [
+                "DROP INDEX CONCURRENTLY IF EXISTS "
+                "transactions_description_upper_trgm",
+            ],
+        ),
+    ]
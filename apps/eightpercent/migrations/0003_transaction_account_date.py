@@ -0,0 +1,17 @@
+# Generated by Django 3.2.9 on 2026-10-19 05:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eightpercent', '0002_transaction_search'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['account', 'transaction_date'], name='transactions_account_date'),
+        ),
+    ]
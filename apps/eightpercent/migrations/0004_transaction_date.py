@@ -0,0 +1,17 @@
+# Generated by Django 3.2.9 on 2026-10-19 05:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eightpercent', '0003_transaction_account_date'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['transaction_date', 'id'], name='transactions_date'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 3.2.9 on 2026-10-19 05:39
+
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eightpercent', '0004_transaction_date'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LedgerEvent',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('event_type', models.CharField(choices=[('POSTED', 'Posted')], max_length=16)),
+                ('payload', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('account', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.PROTECT, to='eightpercent.account')),
+            ],
+            options={
+                'db_table': 'ledger_events',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='ledgerevent',
+            index=models.Index(fields=['account', 'id'], name='ledger_events_account_id'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 3.2.9 on 2026-10-19 05:46
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eightpercent', '0005_ledger_event'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReconciliationCheckpoint',
+            fields=[
+                ('account', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='reconciliation', serialize=False, to='eightpercent.account')),
+                ('balance', models.DecimalField(decimal_places=0, max_digits=20)),
+                ('verified_through', models.DateTimeField(null=True)),
+                ('checked_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'reconciliation_checkpoints',
+            },
+        ),
+    ]
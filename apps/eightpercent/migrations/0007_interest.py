@@ -0,0 +1,42 @@
+# Generated by Django 3.2.9 on 2026-10-19 05:48
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eightpercent', '0006_reconciliation_checkpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InterestRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('accrual_date', models.DateField(unique=True)),
+                ('annual_rate', models.DecimalField(decimal_places=6, max_digits=7)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(null=True)),
+            ],
+            options={
+                'db_table': 'interest_runs',
+            },
+        ),
+        migrations.CreateModel(
+            name='InterestChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('first_account', models.UUIDField()),
+                ('last_account', models.UUIDField()),
+                ('posted_at', models.DateTimeField(null=True)),
+                ('accounts', models.PositiveIntegerField(default=0)),
+                ('interest', models.DecimalField(decimal_places=0, default=0, max_digits=20)),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='eightpercent.interestrun')),
+            ],
+            options={
+                'db_table': 'interest_chunks',
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 3.2.9 on 2026-10-19 05:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eightpercent', '0007_interest'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StandingOrder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('transaction_type', models.CharField(choices=[('WITHDRAW', 'Withdraw'), ('DEPOSIT', 'Deposit')], max_length=8)),
+                ('transaction_amount', models.DecimalField(decimal_places=0, max_digits=20)),
+                ('description', models.CharField(max_length=20)),
+                ('frequency', models.CharField(choices=[('DAILY', 'Daily'), ('WEEKLY', 'Weekly'), ('MONTHLY', 'Monthly')], max_length=7)),
+                ('starts_at', models.DateTimeField()),
+                ('ends_at', models.DateTimeField(blank=True, null=True)),
+                ('next_run_at', models.DateTimeField(blank=True, null=True)),
+                ('runs', models.PositiveIntegerField(default=0)),
+                ('last_run_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.CharField(blank=True, max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='eightpercent.account')),
+            ],
+            options={
+                'db_table': 'standing_orders',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='standingorder',
+            index=models.Index(fields=['next_run_at'], name='standing_orders_due'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 3.2.9 on 2026-10-19 05:57
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eightpercent', '0008_standing_order'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Statement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('opening_balance', models.DecimalField(decimal_places=0, max_digits=20)),
+                ('closing_balance', models.DecimalField(decimal_places=0, max_digits=20)),
+                ('deposits', models.DecimalField(decimal_places=0, max_digits=20)),
+                ('withdrawals', models.DecimalField(decimal_places=0, max_digits=20)),
+                ('transaction_count', models.PositiveIntegerField()),
+                ('etag', models.CharField(max_length=64)),
+                ('generated_at', models.DateTimeField()),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='eightpercent.account')),
+            ],
+            options={
+                'db_table': 'statements',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='statement',
+            constraint=models.UniqueConstraint(fields=('account', 'month'), name='statements_account_month'),
+        ),
+    ]
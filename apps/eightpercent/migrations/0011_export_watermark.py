@@ -0,0 +1,27 @@
+# Generated by Django 3.2.9 on 2026-10-19 06:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eightpercent', '0010_ledger_import'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=32, unique=True)),
+                ('exported_through', models.DateTimeField(null=True)),
+                ('last_id', models.UUIDField(null=True)),
+                ('dirty_from', models.DateField(null=True)),
+                ('exported_at', models.DateTimeField(null=True)),
+            ],
+            options={
+                'db_table': 'export_watermarks',
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+from django.db import migrations
+
+
+class RunSQLOn(migrations.RunSQL):
+    """``RunSQL`` applied only on databases of ``vendor``."""
+
+    def __init__(self, vendor, *args, **kwargs):
+        self.vendor = vendor
+        super().__init__(*args, **kwargs)
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == self.vendor:
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == self.vendor:
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ("eightpercent", "0011_export_watermark"),
+    ]
+
+    # Databases migrated before 0002 indexed UPPER(description) got a
+    # trigram index on the plain column, which ``icontains`` cannot use.
+    operations = [
+        RunSQLOn(
+            "postgresql",
+            [
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS "
+                "transactions_description_upper_trgm "
+                "ON transactions USING gin (UPPER(description) gin_trgm_ops)",
+                "DROP INDEX CONCURRENTLY IF EXISTS transactions_description_trgm",
+            ],
+            migrations.RunSQL.noop,
+        ),
+    ]
@@ -1,6 +1,7 @@
 import uuid
 
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 
 
@@ -30,3 +31,178 @@ class Transaction(models.Model):
 
     class Meta:
         db_table = "transactions"
+        indexes = [
+            models.Index(
+                fields=["account", "transaction_date"],
+                name="transactions_account_date",
+            ),
+            # date drill-down and ordering across accounts in the admin
+            models.Index(fields=["transaction_date", "id"], name="transactions_date"),
+        ]
+
+
+class LedgerEvent(models.Model):
+    """
+    Outbox row written with every posting, in the same transaction.
+
+    ``id`` is the feed cursor. Postings on one account are serialized by the
+    balance update, so an account's events commit in ``id`` order.
+    """
+
+    EventTypes = models.TextChoices("EventTypes", "POSTED")
+    id = models.BigAutoField(primary_key=True)
+    # covered by the (account, id) index
+    account = models.ForeignKey("Account", on_delete=models.PROTECT, db_index=False)
+    event_type = models.CharField(max_length=16, choices=EventTypes.choices)
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "ledger_events"
+        indexes = [
+            models.Index(fields=["account", "id"], name="ledger_events_account_id"),
+        ]
+
+
+class ReconciliationCheckpoint(models.Model):
+    """
+    How far the balance of an account has been verified against its
+    transactions: ``balance`` was the sum of every posting up to and
+    including ``verified_through``.
+    """
+
+    account = models.OneToOneField(
+        "Account",
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name="reconciliation",
+    )
+    balance = models.DecimalField(max_digits=20, decimal_places=0)
+    verified_through = models.DateTimeField(null=True)
+    checked_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "reconciliation_checkpoints"
+
+
+class InterestRun(models.Model):
+    """One day of interest accrual over every account."""
+
+    accrual_date = models.DateField(unique=True)
+    annual_rate = models.DecimalField(max_digits=7, decimal_places=6)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True)
+
+    class Meta:
+        db_table = "interest_runs"
+
+
+class InterestChunk(models.Model):
+    """
+    A range of accounts of an ``InterestRun``. ``posted_at`` is set in the
+    transaction that posts its interest, so a chunk is posted exactly once.
+    """
+
+    run = models.ForeignKey("InterestRun", on_delete=models.CASCADE)
+    first_account = models.UUIDField()
+    last_account = models.UUIDField()
+    posted_at = models.DateTimeField(null=True)
+    accounts = models.PositiveIntegerField(default=0)
+    interest = models.DecimalField(max_digits=20, decimal_places=0, default=0)
+
+    class Meta:
+        db_table = "interest_chunks"
+
+
+class StandingOrder(models.Model):
+    """
+    A posting repeated on a schedule. ``next_run_at`` is ``None`` once the
+    order ended or was cancelled.
+    """
+
+    Frequencies = models.TextChoices("Frequencies", "DAILY WEEKLY MONTHLY")
+    account = models.ForeignKey("Account", on_delete=models.PROTECT)
+    transaction_type = models.CharField(
+        max_length=8, choices=Transaction.TransactionTypes.choices
+    )
+    transaction_amount = models.DecimalField(max_digits=20, decimal_places=0)
+    description = models.CharField(max_length=20)
+    frequency = models.CharField(max_length=7, choices=Frequencies.choices)
+    starts_at = models.DateTimeField()
+    ends_at = models.DateTimeField(null=True, blank=True)
+    next_run_at = models.DateTimeField(null=True, blank=True)
+    runs = models.PositiveIntegerField(default=0)
+    last_run_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "standing_orders"
+        indexes = [
+            models.Index(fields=["next_run_at"], name="standing_orders_due"),
+        ]
+
+
+class Statement(models.Model):
+    """
+    A monthly statement. The rendered files live under ``PRIVATE_ROOT``,
+    written through ``private_storage()``; the row holds the totals and the
+    ``etag`` of the files.
+    """
+
+    account = models.ForeignKey("Account", on_delete=models.CASCADE)
+    # first day of the month
+    month = models.DateField()
+    opening_balance = models.DecimalField(max_digits=20, decimal_places=0)
+    closing_balance = models.DecimalField(max_digits=20, decimal_places=0)
+    deposits = models.DecimalField(max_digits=20, decimal_places=0)
+    withdrawals = models.DecimalField(max_digits=20, decimal_places=0)
+    transaction_count = models.PositiveIntegerField()
+    etag = models.CharField(max_length=64)
+    generated_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "statements"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["account", "month"], name="statements_account_month"
+            ),
+        ]
+
+
+class LedgerImport(models.Model):
+    """
+    Progress of a CSV ledger import. ``position`` is the byte offset after
+    the last committed chunk and moves in the transaction that inserts it,
+    so an interrupted import resumes there.
+    """
+
+    # sha256 of the file size and first MiB
+    fingerprint = models.CharField(max_length=64, unique=True)
+    source = models.CharField(max_length=255)
+    position = models.BigIntegerField(default=0)
+    rows = models.BigIntegerField(default=0)
+    imported = models.BigIntegerField(default=0)
+    rejected = models.BigIntegerField(default=0)
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True)
+
+    class Meta:
+        db_table = "ledger_imports"
+
+
+class ExportWatermark(models.Model):
+    """
+    How far a dataset was exported: every row up to the keyset
+    ``(exported_through, last_id)``. ``dirty_from`` is the first month
+    that changed behind the watermark and is exported again.
+    """
+
+    name = models.CharField(max_length=32, unique=True)
+    exported_through = models.DateTimeField(null=True)
+    last_id = models.UUIDField(null=True)
+    dirty_from = models.DateField(null=True)
+    exported_at = models.DateTimeField(null=True)
+
+    class Meta:
+        db_table = "export_watermarks"
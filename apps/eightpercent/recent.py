@@ -0,0 +1,82 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.eightpercent.feed import current_version, version_key
+from apps.eightpercent.models import Transaction
+
+RECENT_FIELDS = (
+    "id",
+    "transaction_type",
+    "transaction_amount",
+    "transaction_date",
+    "description",
+    "account_id",
+)
+
+
+def recent_key(account_pk):
+    return f"recent:{account_pk}"
+
+
+def _copy(posted):
+    # without the related account, which would be cached along
+    return Transaction(**{name: getattr(posted, name) for name in RECENT_FIELDS})
+
+
+def _newest_first(postings):
+    return sorted(postings, key=lambda t: t.transaction_date, reverse=True)
+
+
+def record_posting(account_pk, version, posted):
+    """
+    Push ``posted`` into the recent activity of its account; call after it
+    committed, with the feed version ``notify_posted`` moved the account to.
+
+    The entry is only extended when it is stamped with the version right
+    before, i.e. it holds every earlier posting. Otherwise it is left to
+    the next read, which sees the stamp is behind and rebuilds it.
+    """
+    key = recent_key(account_pk)
+    entry = cache.get(key)
+    if entry is None or entry[0] != version - 1:
+        return
+    # a rebuild racing the commit may already have read it
+    postings = [t for t in entry[1] if t.id != posted.id]
+    postings = _newest_first([_copy(posted), *postings])
+    cache.set(
+        key,
+        (version, postings[: settings.RECENT_ACTIVITY_SIZE]),
+        timeout=settings.RECENT_ACTIVITY_TTL,
+    )
+
+
+def recent_activity(account_pk, limit=None):
+    """
+    Return the newest ``limit`` postings of an account, newest first.
+
+    They are kept in one cache entry stamped with the account's feed
+    version (see ``current_version``), so a read is a single ``get_many``
+    of both keys while nothing was posted. A stale or missing entry is
+    rebuilt with one read of the ``(account, transaction_date)`` index.
+    """
+    size = settings.RECENT_ACTIVITY_SIZE
+    limit = size if limit is None else min(limit, size)
+    values = cache.get_many([version_key(account_pk), recent_key(account_pk)])
+    version = current_version(account_pk, values)
+    entry = values.get(recent_key(account_pk))
+    if entry is not None and entry[0] == version:
+        return entry[1][:limit]
+
+    # the version is read before the query, so a posting committing in
+    # between leaves the entry behind rather than stamped past it
+    postings = list(
+        Transaction.objects.filter(account_id=account_pk)
+        .order_by("-transaction_date")
+        .only(*RECENT_FIELDS)[:size]
+    )
+    cache.set(
+        recent_key(account_pk),
+        (version, postings),
+        timeout=settings.RECENT_ACTIVITY_TTL,
+    )
+    return postings[:limit]
@@ -0,0 +1,174 @@
+from datetime import datetime
+
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.core.parallel import process_pool
+from apps.core.utils import batched
+from apps.eightpercent.models import Account, ReconciliationCheckpoint, Transaction
+
+# Accounts verified by one worker task, in one query
+ACCOUNTS_PER_TASK = 1000
+
+EPOCH = timezone.make_aware(datetime(1970, 1, 1))
+
+AMOUNT = DecimalField(max_digits=20, decimal_places=0)
+
+
+def signed_amount():
+    return Case(
+        When(
+            transaction_type=Transaction.TransactionTypes.DEPOSIT,
+            then=F("transaction_amount"),
+        ),
+        default=-F("transaction_amount"),
+        output_field=AMOUNT,
+    )
+
+
+def _postings(full):
+    postings = Transaction.objects.filter(account=OuterRef("pk")).order_by()
+    if not full:
+        postings = postings.filter(
+            transaction_date__gt=Coalesce(
+                OuterRef("reconciliation__verified_through"), Value(EPOCH)
+            )
+        )
+    return postings
+
+
+def account_totals(accounts, full=False):
+    """
+    Annotate ``accounts`` with the ``activity`` (signed sum) and
+    ``last_posted`` date of their postings after the checkpoint, or of all
+    postings with ``full``.
+
+    The balance and both subqueries are read by one statement, so they see
+    the same committed postings even under READ COMMITTED.
+    """
+    postings = _postings(full)
+    return accounts.annotate(
+        activity=Subquery(
+            postings.values("account")
+            .annotate(total=Sum(signed_amount()))
+            .values("total"),
+            output_field=AMOUNT,
+        ),
+        last_posted=Subquery(
+            postings.order_by("-transaction_date").values("transaction_date")[:1]
+        ),
+    ).values_list(
+        "pk",
+        "balance",
+        "reconciliation__balance",
+        "reconciliation__verified_through",
+        "activity",
+        "last_posted",
+    )
+
+
+def ledger_balance(account_pk):
+    """Return ``(sum of every posting, last posting date)`` of an account."""
+    _, _, _, _, activity, last_posted = account_totals(
+        Account.objects.filter(pk=account_pk), full=True
+    ).get()
+    return activity or 0, last_posted
+
+
+def repair_account(account_pk):
+    """
+    Set the balance of an account to the sum of its postings, which the
+    ledger treats as the truth, and checkpoint it. The account row is locked
+    first so no posting lands in between. Returns ``(old, new)`` balances.
+    """
+    with transaction.atomic():
+        old = (
+            Account.objects.select_for_update()
+            .values_list("balance", flat=True)
+            .get(pk=account_pk)
+        )
+        new, last_posted = ledger_balance(account_pk)
+        Account.objects.filter(pk=account_pk).update(balance=new)
+        ReconciliationCheckpoint.objects.update_or_create(
+            account_id=account_pk,
+            defaults={"balance": new, "verified_through": last_posted},
+        )
+    return old, new
+
+
+def reconcile_task(task):
+    """
+    Verify the accounts ``first``..``last`` and advance their checkpoints.
+
+    Only the postings after each checkpoint are read. An account that does
+    not add up is recomputed from all its postings before it is reported,
+    since a posting dated before its checkpoint (a clock skewed app server)
+    would otherwise be missed forever. Returns a summary dict.
+    """
+    first, last, full, repair = task
+    accounts = Account.objects.filter(pk__gte=first, pk__lte=last)
+    created, updated, mismatches = [], [], []
+    checked = 0
+    now = timezone.now()
+    for pk, balance, cp_balance, cp_through, activity, last_posted in account_totals(
+        accounts, full
+    ):
+        checked += 1
+        has_checkpoint = cp_balance is not None
+        base = cp_balance if has_checkpoint and not full else 0
+        through = last_posted or (None if full else cp_through)
+        if base + (activity or 0) != balance and has_checkpoint and not full:
+            activity, through = ledger_balance(pk)
+            base = 0
+        if base + (activity or 0) != balance:
+            mismatches.append((pk, base + (activity or 0), balance))
+            continue
+
+        checkpoint = ReconciliationCheckpoint(
+            account_id=pk, balance=balance, verified_through=through, checked_at=now
+        )
+        if not has_checkpoint:
+            created.append(checkpoint)
+        elif (cp_balance, cp_through) != (balance, through):
+            updated.append(checkpoint)
+
+    with transaction.atomic():
+        ReconciliationCheckpoint.objects.bulk_create(created, ignore_conflicts=True)
+        ReconciliationCheckpoint.objects.bulk_update(
+            updated, ["balance", "verified_through", "checked_at"]
+        )
+
+    repaired = []
+    if repair:
+        repaired = [repair_account(pk) for pk, _, _ in mismatches]
+    return {
+        "checked": checked,
+        "advanced": len(created) + len(updated),
+        "mismatches": [
+            (str(pk), int(expected), int(actual)) for pk, expected, actual in mismatches
+        ],
+        "repaired": len(repaired),
+    }
+
+
+def account_ranges(size=ACCOUNTS_PER_TASK):
+    """Yield ``(first, last)`` primary keys of consecutive runs of accounts."""
+    pks = Account.objects.order_by("pk").values_list("pk", flat=True)
+    for batch in batched(pks.iterator(chunk_size=size * 10), size):
+        yield batch[0], batch[-1]
+
+
+def reconcile_ledger(workers=1, full=False, repair=False, size=ACCOUNTS_PER_TASK):
+    """
+    Check that every account balance equals the sum of its postings.
+
+    Accounts are split into ranges of ``size`` and fanned out over
+    ``workers`` processes; yields the summary of each finished range. With
+    ``full`` the checkpoints are ignored, with ``repair`` mismatched
+    balances are reset to their ledger sum.
+    """
+    tasks = [(first, last, full, repair) for first, last in account_ranges(size)]
+    with process_pool(workers) as pool_map:
+        yield from pool_map(reconcile_task, tasks)
@@ -0,0 +1,36 @@
+import json
+
+from rest_framework.negotiation import BaseContentNegotiation
+from rest_framework.renderers import BaseRenderer
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Lets views negotiate ``text/event-stream``.
+
+    Views answer such requests with a ``StreamingHttpResponse``; only error
+    responses go through ``render``, as JSON.
+    """
+
+    media_type = "text/event-stream"
+    format = "sse"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return json.dumps(data).encode(self.charset)
+
+
+class IgnoreClientContentNegotiation(BaseContentNegotiation):
+    """
+    Always picks the first renderer, for views that answer with a file of
+    their own type whatever the client accepts (``Accept: text/csv`` would
+    be refused as not acceptable otherwise).
+    """
+
+    def select_parser(self, request, parsers):
+        return parsers[0]
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
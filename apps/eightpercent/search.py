@@ -0,0 +1,120 @@
+from django.db import connections
+from django.db.models.expressions import RawSQL
+
+from apps.eightpercent.models import Transaction
+
+# The trigram tokenizer matches any substring of three or more characters,
+# which suits Korean memos where words carry particles (월급이, 월급을).
+MIN_TOKEN_LENGTH = 3
+
+SQLITE_INSTALL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5(
+        description,
+        account_id,
+        transaction_id UNINDEXED,
+        tokenize = 'trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS transactions_fts_insert
+    AFTER INSERT ON transactions BEGIN
+        INSERT INTO transactions_fts (description, account_id, transaction_id)
+        VALUES (new.description, new.account_id, new.id);
+    END
+    """,
+    # The ledger is append-only; updates and deletes only come from repairs,
+    # so these triggers may look rows up without an index.
+    """
+    CREATE TRIGGER IF NOT EXISTS transactions_fts_update
+    AFTER UPDATE OF description, account_id ON transactions BEGIN
+        UPDATE transactions_fts
+        SET description = new.description, account_id = new.account_id
+        WHERE transaction_id = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS transactions_fts_delete
+    AFTER DELETE ON transactions BEGIN
+        DELETE FROM transactions_fts WHERE transaction_id = old.id;
+    END
+    """,
+)
+SQLITE_BACKFILL = """
+    INSERT INTO transactions_fts (description, account_id, transaction_id)
+    SELECT description, account_id, id FROM transactions
+"""
+
+POSTGRES_INSTALL = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    # on UPPER(), as ``icontains`` compiles to UPPER(description) LIKE UPPER(%s)
+    "CREATE INDEX IF NOT EXISTS transactions_description_upper_trgm "
+    "ON transactions USING gin (UPPER(description) gin_trgm_ops)",
+)
+
+
+def install_search_index(connection, backfill=True):
+    """
+    Create the description search index on ``connection``, for databases
+    built without migrations (the tests); migrations 0002 and 0012 carry
+    their own copy of this DDL.
+
+    SQLite gets an FTS5 table fed by triggers, so ORM saves and the raw
+    inserts of ``bulk_insert_transactions`` are indexed alike. PostgreSQL
+    gets a trigram GIN index on ``UPPER(description)``, which serves the
+    ``LIKE '%...%'`` of ``icontains`` directly.
+    """
+    if connection.vendor == "sqlite":
+        statements = SQLITE_INSTALL + ((SQLITE_BACKFILL,) if backfill else ())
+    elif connection.vendor == "postgresql":
+        statements = POSTGRES_INSTALL
+    else:
+        return
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def _phrase(token):
+    return '"{}"'.format(token.replace('"', '""'))
+
+
+def search_transactions(queryset, q, account):
+    """
+    Narrow ``queryset`` to transactions of ``account`` whose description
+    contains every whitespace-separated term of ``q``.
+
+    On SQLite, terms of ``MIN_TOKEN_LENGTH`` characters or more are matched
+    through ``transactions_fts``. The account id is indexed there too, so a
+    term common to every account costs as much as its matches in this one.
+    Shorter terms, which trigrams cannot index, fall back to ``LIKE`` over
+    the rows left.
+    """
+    terms = q.split()
+    if not terms:
+        return queryset
+
+    connection = connections[queryset.db]
+    if connection.vendor == "sqlite":
+        indexed = [term for term in terms if len(term) >= MIN_TOKEN_LENGTH]
+        if indexed:
+            account_id = Transaction._meta.get_field("account").get_db_prep_value(
+                account.pk, connection
+            )
+            queryset = queryset.filter(
+                id__in=RawSQL(
+                    "SELECT transaction_id FROM transactions_fts "
+                    "WHERE transactions_fts MATCH %s",
+                    (
+                        " AND ".join(
+                            [f"account_id : {_phrase(account_id)}"]
+                            + [f"description : {_phrase(term)}" for term in indexed]
+                        ),
+                    ),
+                )
+            )
+        terms = [term for term in terms if len(term) < MIN_TOKEN_LENGTH]
+
+    for term in terms:
+        queryset = queryset.filter(description__icontains=term)
+    return queryset
@@ -1,3 +1,5 @@
+from django.utils import timezone
+
 from rest_framework import serializers
 from rest_framework.serializers import (
     ModelSerializer,
@@ -6,7 +8,11 @@ from rest_framework.serializers import (
     ValidationError,
 )
 
-from apps.eightpercent.models import Account, Transaction
+from apps.eightpercent.ledger import InsufficientBalance, post_transaction
+from apps.eightpercent.limits import WithdrawalLimitExceeded, check_withdrawal
+from apps.eightpercent.models import Account, StandingOrder, Statement, Transaction
+from apps.eightpercent.standing_orders import next_run
+from apps.eightpercent.utils import get_user_account
 
 
 class TransactionSerializer(ModelSerializer):
@@ -42,14 +48,16 @@ class DepositSerializer(serializers.ModelSerializer):
         )
 
     def get_account_balance(self, obj):
-        account_balance = int(obj.account.balance + obj.transaction_amount)
-        obj.account.balance = account_balance
-        obj.account.save()
-        return account_balance
+        return int(obj.account.balance)
+
+    def create(self, validated_data):
+        return post_transaction(**validated_data)
 
     def validate(self, attrs):
         if attrs.get("transaction_amount") < 0:
             raise ValidationError("Amount cannot be negative value.")
+        if get_user_account(self.context.get("request").user) is None:
+            raise ValidationError("Account does not exist.")
         return super().validate(attrs)
 
 
@@ -70,15 +78,27 @@ class WithdrawSerializer(ModelSerializer):
     def get_account_balance(self, obj):
         return int(obj.account.balance)
 
+    def create(self, validated_data):
+        try:
+            return post_transaction(**validated_data)
+        except InsufficientBalance:
+            raise ValidationError("Balance is not enough.")
+
     def validate(self, attrs):
-        account_number = self.context.get("request").user.account
+        account_number = get_user_account(self.context.get("request").user)
         amount = attrs.get("transaction_amount")
+        if account_number is None:
+            raise ValidationError("Account does not exist.")
         if amount < 0:
             raise ValidationError("Amount cannot be negative value.")
+        # fail fast on the loaded balance; post_transaction() re-checks it
+        # atomically against concurrent postings
         if amount > account_number.balance:
             raise ValidationError("Balance is not enough.")
-        account_number.balance = account_number.balance - amount
-        account_number.save()
+        try:
+            check_withdrawal(account_number.pk, amount)
+        except WithdrawalLimitExceeded as error:
+            raise ValidationError(str(error))
         return attrs
 
 
@@ -97,3 +117,55 @@ class ReadAccountSerializer(ModelSerializer):
             "balance",
             "customer_name",
         )
+
+
+class StandingOrderSerializer(ModelSerializer):
+    class Meta:
+        model = StandingOrder
+        fields = (
+            "id",
+            "transaction_type",
+            "transaction_amount",
+            "description",
+            "frequency",
+            "starts_at",
+            "ends_at",
+            "next_run_at",
+            "runs",
+            "last_run_at",
+            "last_error",
+        )
+        read_only_fields = ("next_run_at", "runs", "last_run_at", "last_error")
+        extra_kwargs = {"starts_at": {"required": False}}
+
+    def validate(self, attrs):
+        if get_user_account(self.context.get("request").user) is None:
+            raise ValidationError("Account does not exist.")
+        if attrs["transaction_amount"] <= 0:
+            raise ValidationError("Amount must be positive.")
+        attrs.setdefault("starts_at", timezone.now())
+        if attrs.get("ends_at") and attrs["ends_at"] < attrs["starts_at"]:
+            raise ValidationError("ends_at must not be before starts_at.")
+        return attrs
+
+    def create(self, validated_data):
+        order = StandingOrder(**validated_data)
+        order.next_run_at = next_run(order, 0)
+        order.save()
+        return order
+
+
+class StatementSerializer(ModelSerializer):
+    month = serializers.DateField(format="%Y-%m")
+
+    class Meta:
+        model = Statement
+        fields = (
+            "month",
+            "opening_balance",
+            "closing_balance",
+            "deposits",
+            "withdrawals",
+            "transaction_count",
+            "generated_at",
+        )
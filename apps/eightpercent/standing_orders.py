@@ -0,0 +1,140 @@
+import calendar
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.eightpercent.ledger import InsufficientBalance, post_transaction
+from apps.eightpercent.limits import WithdrawalLimitExceeded, check_withdrawal
+from apps.eightpercent.models import Account, StandingOrder, Transaction
+
+logger = logging.getLogger(__name__)
+
+INTERVALS = {
+    StandingOrder.Frequencies.DAILY: timedelta(days=1),
+    StandingOrder.Frequencies.WEEKLY: timedelta(days=7),
+}
+
+
+def occurrence(order, index):
+    """
+    The ``index``-th run of ``order``, counted from ``starts_at``.
+
+    Runs are computed from the start instead of the previous run so they
+    never drift; a monthly order started on the 31st runs on the last day
+    of shorter months and on the 31st again after them.
+    """
+    start = timezone.make_naive(order.starts_at)
+    if order.frequency == StandingOrder.Frequencies.MONTHLY:
+        year, month = divmod(start.month - 1 + index, 12)
+        year, month = start.year + year, month + 1
+        day = min(start.day, calendar.monthrange(year, month)[1])
+        moment = start.replace(year=year, month=month, day=day)
+    else:
+        moment = start + INTERVALS[order.frequency] * index
+    return timezone.make_aware(moment)
+
+
+def next_run(order, runs):
+    """When ``order`` runs after ``runs`` runs, or ``None`` once it ended."""
+    moment = occurrence(order, runs)
+    if order.ends_at is not None and moment > order.ends_at:
+        return None
+    return moment
+
+
+def execute_order(order, now):
+    """
+    Post one due run of ``order`` and schedule the next one.
+
+    The schedule is advanced first, conditionally on the ``next_run_at``
+    that was read, so when two schedulers picked the same order only one of
+    them posts. Both happen in one transaction, so a crash in between
+    leaves the run due instead of posted and not rescheduled. Returns ``None`` when the run was taken, else whether the
+    posting succeeded; a withdrawal the balance cannot cover, or that would
+    exceed ``WITHDRAW_LIMITS``, is skipped and recorded in ``last_error``.
+    """
+    with transaction.atomic():
+        advanced = StandingOrder.objects.filter(
+            pk=order.pk, next_run_at=order.next_run_at
+        ).update(
+            next_run_at=next_run(order, order.runs + 1),
+            runs=F("runs") + 1,
+            last_run_at=now,
+            last_error="",
+        )
+        if not advanced:
+            return None
+        try:
+            if order.transaction_type == Transaction.TransactionTypes.WITHDRAW:
+                check_withdrawal(order.account_id, order.transaction_amount, now)
+            with transaction.atomic():
+                post_transaction(
+                    Account(account_number=order.account_id),
+                    order.transaction_type,
+                    order.transaction_amount,
+                    order.description,
+                )
+        except InsufficientBalance:
+            StandingOrder.objects.filter(pk=order.pk).update(
+                last_error="Balance is not enough."
+            )
+            return False
+        except WithdrawalLimitExceeded as error:
+            StandingOrder.objects.filter(pk=order.pk).update(last_error=str(error))
+            return False
+    return True
+
+
+def claim_due_orders(limit, now):
+    """
+    Claim up to ``limit`` due standing orders, oldest first, in one short
+    transaction and return them.
+
+    A claimed order's ``next_run_at`` is moved to the end of a lease of
+    ``STANDING_ORDERS_LEASE_SECONDS``, so other schedulers pass it over
+    until then; if this one dies before running it, it is due again
+    afterwards. Runs are counted by ``runs``, so the schedule is kept. Due
+    orders are read through the ``next_run_at`` index and, where the
+    database supports it, locked with ``SKIP LOCKED`` so concurrent claims
+    do not wait on each other.
+    """
+    lease = now + timedelta(seconds=settings.STANDING_ORDERS_LEASE_SECONDS)
+    claimed = []
+    with transaction.atomic():
+        due = StandingOrder.objects.filter(next_run_at__lte=now).order_by("next_run_at")
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        for order in due[:limit]:
+            # without SKIP LOCKED, another scheduler may have read it too
+            if StandingOrder.objects.filter(
+                pk=order.pk, next_run_at=order.next_run_at
+            ).update(next_run_at=lease):
+                order.next_run_at = lease
+                claimed.append(order)
+    return claimed
+
+
+def run_due_orders(limit=100, now=None):
+    """
+    Execute up to ``limit`` due standing orders, oldest first, and return
+    ``(posted, failed)``.
+
+    The orders are claimed by ``claim_due_orders``, then each is posted in
+    its own transaction, so no lock is held across the batch and an error
+    only affects its order, which runs again once its lease ends.
+    """
+    now = now or timezone.now()
+    posted = failed = 0
+    for order in claim_due_orders(limit, now):
+        try:
+            outcome = execute_order(order, now)
+        except Exception:
+            logger.exception("Standing order %s failed", order.pk)
+            outcome = False
+        posted += outcome is True
+        failed += outcome is False
+    return posted, failed
@@ -0,0 +1,215 @@
+import csv
+import hashlib
+import io
+import os
+import uuid
+from datetime import date, datetime, time
+from itertools import groupby
+
+from django.db import transaction
+from django.db.models import Sum
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from apps.core.parallel import process_pool
+from apps.core.utils import batched, private_storage
+from apps.eightpercent.models import Account, Statement, Transaction
+from apps.eightpercent.reconciliation import account_ranges, signed_amount
+
+STATEMENT_DIR = "statements"
+FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "html": "text/html; charset=utf-8",
+}
+# Accounts rendered by one worker task
+ACCOUNTS_PER_TASK = 500
+
+CSV_HEADER = (
+    "transaction_date",
+    "transaction_type",
+    "transaction_amount",
+    "balance",
+    "description",
+)
+
+
+def month_start(month):
+    return timezone.make_aware(datetime.combine(month, time.min))
+
+
+def next_month(month):
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def previous_month(month):
+    return date(month.year - (month.month == 1), (month.month - 2) % 12 + 1, 1)
+
+
+def statement_path(account_pk, month, fmt):
+    return f"{STATEMENT_DIR}/{month:%Y-%m}/{account_pk}.{fmt}"
+
+
+def render_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_HEADER)
+    for row in rows:
+        writer.writerow(
+            (
+                row["transaction_date"].isoformat(),
+                row["transaction_type"],
+                row["transaction_amount"],
+                row["balance"],
+                row["description"],
+            )
+        )
+    # the BOM lets spreadsheet apps detect UTF-8 (Korean descriptions)
+    return buffer.getvalue().encode("utf-8-sig")
+
+
+def render_html(statement, rows):
+    return render_to_string(
+        "eightpercent/statement.html", {"statement": statement, "rows": rows}
+    ).encode()
+
+
+def _store(path, content):
+    """
+    Write a statement under ``PRIVATE_ROOT``. The file is written under a
+    temporary name and renamed over the old one, so a download running
+    meanwhile reads either statement whole.
+    """
+    target = private_storage().path(path)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    temporary = f"{target}.{uuid.uuid4().hex}.tmp"
+    with open(temporary, "wb") as file:
+        file.write(content)
+    os.replace(temporary, target)
+
+
+def _opening_balances(pks, month):
+    """
+    Balance of each account at the start of ``month``: the closing balance
+    of its previous statement, or the sum of its earlier postings.
+    """
+    openings = dict(
+        Statement.objects.filter(
+            account_id__in=pks, month=previous_month(month)
+        ).values_list("account_id", "closing_balance")
+    )
+    missing = [pk for pk in pks if pk not in openings]
+    if missing:
+        openings.update(
+            Transaction.objects.filter(
+                account_id__in=missing, transaction_date__lt=month_start(month)
+            )
+            .order_by()
+            .values("account_id")
+            .annotate(total=Sum(signed_amount()))
+            .values_list("account_id", "total")
+        )
+    return {pk: openings.get(pk) or 0 for pk in pks}
+
+
+def generate_task(task):
+    """
+    Render and store the statements of ``month`` for the accounts
+    ``first``..``last`` (only those in ``only`` unless it is ``None``) and
+    return how many were written.
+
+    The postings of the month are read with one query per batch of
+    accounts, in ``(account, transaction_date)`` index order. Accounts that
+    already have a statement are skipped unless ``force`` is set.
+    """
+    first, last, month, force, only = task
+    accounts = Account.objects.filter(pk__gte=first, pk__lte=last)
+    if only is not None:
+        accounts = accounts.filter(pk__in=only)
+    pks = list(accounts.order_by("pk").values_list("pk", flat=True))
+    if not force:
+        done = set(
+            Statement.objects.filter(account_id__in=pks, month=month).values_list(
+                "account_id", flat=True
+            )
+        )
+        pks = [pk for pk in pks if pk not in done]
+    if not pks:
+        return 0
+
+    openings = _opening_balances(pks, month)
+    postings = (
+        Transaction.objects.filter(
+            account_id__in=pks,
+            transaction_date__gte=month_start(month),
+            transaction_date__lt=month_start(next_month(month)),
+        )
+        .order_by("account_id", "transaction_date", "id")
+        .values(
+            "account_id",
+            "transaction_date",
+            "transaction_type",
+            "transaction_amount",
+            "description",
+        )
+    )
+    by_account = {
+        pk: list(rows) for pk, rows in groupby(postings, lambda row: row["account_id"])
+    }
+
+    now = timezone.now()
+    statements = []
+    for pk in pks:
+        rows = by_account.get(pk, [])
+        balance, deposits, withdrawals = openings[pk], 0, 0
+        for row in rows:
+            if row["transaction_type"] == Transaction.TransactionTypes.DEPOSIT:
+                balance += row["transaction_amount"]
+                deposits += row["transaction_amount"]
+            else:
+                balance -= row["transaction_amount"]
+                withdrawals += row["transaction_amount"]
+            row["balance"] = balance
+        statement = Statement(
+            account_id=pk,
+            month=month,
+            opening_balance=openings[pk],
+            closing_balance=balance,
+            deposits=deposits,
+            withdrawals=withdrawals,
+            transaction_count=len(rows),
+            generated_at=now,
+        )
+        files = {"csv": render_csv(rows), "html": render_html(statement, rows)}
+        digest = hashlib.sha256()
+        for fmt, content in files.items():
+            _store(statement_path(pk, month, fmt), content)
+            digest.update(content)
+        statement.etag = digest.hexdigest()
+        statements.append(statement)
+
+    with transaction.atomic():
+        Statement.objects.filter(account_id__in=pks, month=month).delete()
+        Statement.objects.bulk_create(statements)
+    return len(statements)
+
+
+def generate_statements(
+    month, workers=1, force=False, accounts=None, size=ACCOUNTS_PER_TASK
+):
+    """
+    Generate the statements of ``month`` for every account, or the
+    ``accounts`` given, fanned out over ``workers`` processes. Yields the
+    number written per task; rerunning only renders what is missing unless
+    ``force`` regenerates it, e.g. after a correction.
+    """
+    if accounts is None:
+        tasks = [
+            (first, last, month, force, None) for first, last in account_ranges(size)
+        ]
+    else:
+        tasks = [
+            (batch[0], batch[-1], month, force, batch)
+            for batch in batched(sorted(accounts), size)
+        ]
+    with process_pool(workers) as pool_map:
+        yield from pool_map(generate_task, tasks)
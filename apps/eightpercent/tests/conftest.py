@@ -0,0 +1,9 @@
+import pytest
+
+from apps.eightpercent.models import Account
+
+
+@pytest.fixture
+def account(user):
+    """An empty account of ``user``; modules that need postings extend it."""
+    return Account.objects.create(customer=user, balance=0)
@@ -0,0 +1,79 @@
+import uuid
+from datetime import datetime, timezone
+
+from django.db import connection
+from django.urls import reverse
+
+import pytest
+
+from apps.core.admin import DateRangeQuerySet
+from apps.core.paginator import EstimatedCountPaginator
+from apps.eightpercent.ledger import bulk_insert_transactions
+from apps.eightpercent.models import Account, Transaction
+from test.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def transactions():
+    for index in range(5):
+        account = Account.objects.create(customer=UserFactory(), balance=0)
+        bulk_insert_transactions(
+            (uuid.uuid4(), "DEPOSIT", 1000, day, "입금", account.pk)
+            for day in (
+                datetime(2020, 12, 31 - index, tzinfo=timezone.utc),
+                datetime(2021, 2, 1 + index, tzinfo=timezone.utc),
+            )
+        )
+
+
+def test_transaction_changelist(admin_client, transactions, django_assert_num_queries):
+    url = reverse("admin:eightpercent_transaction_changelist")
+    # session, user, stats, count, page with accounts joined, min and max dates
+    with django_assert_num_queries(7) as queries:
+        resp = admin_client.get(url)
+    assert resp.status_code == 200
+    assert not any("DISTINCT" in query["sql"] for query in queries.captured_queries)
+    assert b"transaction_date__year=2020" in resp.content
+    assert b"transaction_date__year=2021" in resp.content
+
+
+def test_account_changelist(admin_client, transactions, django_assert_num_queries):
+    # session, user, stats, count, page with customers joined
+    with django_assert_num_queries(5):
+        resp = admin_client.get(reverse("admin:eightpercent_account_changelist"))
+    assert resp.status_code == 200
+
+
+def test_date_range_periods(transactions):
+    queryset = DateRangeQuerySet(Transaction)
+    months = queryset.datetimes("transaction_date", "month")
+    assert [(value.year, value.month) for value in months] == [
+        (2020, 12),
+        (2021, 1),
+        (2021, 2),
+    ]
+    days = queryset.filter(transaction_date__year=2021).dates(
+        "transaction_date", "day", order="DESC"
+    )
+    assert [value.day for value in days] == [5, 4, 3, 2, 1]
+
+
+def test_estimated_count(transactions):
+    queryset = Transaction.objects.order_by("pk")
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE transactions")
+
+    paginator = EstimatedCountPaginator(queryset, 4)
+    paginator.exact_count_limit = 1
+    assert paginator.count == 10
+    connection.cursor().execute(
+        "UPDATE sqlite_stat1 SET stat = '1000000 1' WHERE tbl = 'transactions'"
+    )
+    del paginator.count
+    assert paginator.count == 1000000
+    # filtered querysets have no estimate on SQLite and are counted
+    assert (
+        EstimatedCountPaginator(queryset.filter(transaction_amount=1000), 4).count == 10
+    )
@@ -0,0 +1,118 @@
+import uuid
+from datetime import datetime
+
+from django.core.cache import cache
+from django.utils import timezone
+
+import pytest
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from apps.eightpercent.analytics import account_analytics, compute_analytics
+from apps.eightpercent.feed import notify_posted, version_key
+from apps.eightpercent.ledger import bulk_insert_transactions
+from apps.eightpercent.models import Account
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.fixture
+def account(account):
+    bulk_insert_transactions(
+        (
+            uuid.uuid4(),
+            transaction_type,
+            amount,
+            timezone.make_aware(moment),
+            "",
+            account.pk,
+        )
+        for transaction_type, amount, moment in (
+            ("DEPOSIT", 100_000, datetime(2021, 10, 4, 9)),  # Monday
+            ("DEPOSIT", 300_000, datetime(2021, 11, 1, 9)),  # Monday
+            ("WITHDRAW", 5_000, datetime(2021, 11, 6, 12)),  # Saturday
+            ("WITHDRAW", 20_000, datetime(2021, 11, 7, 12)),  # Sunday
+            ("WITHDRAW", 2_000_000, datetime(2021, 11, 7, 18)),
+        )
+    )
+    return account
+
+
+def test_compute_analytics(account):
+    analytics = compute_analytics(account.pk)
+    assert analytics["deposits"] == {
+        "count": 2,
+        "total": 400_000,
+        "average": 200_000,
+        "median": 200_000,
+    }
+    withdrawals = analytics["withdrawals"]
+    assert (withdrawals["count"], withdrawals["median"]) == (3, 20_000)
+    assert withdrawals["percentiles"]["p50"] == 20_000
+    assert [bucket["count"] for bucket in withdrawals["histogram"]] == [
+        1,
+        1,
+        0,
+        0,
+        0,
+        1,
+        0,
+    ]
+
+    by_weekday = {row["weekday"]: row for row in analytics["by_weekday"]}
+    assert by_weekday["MON"]["deposits"] == 400_000
+    assert by_weekday["MON"]["deposits_count"] == 2
+    assert by_weekday["SUN"]["withdrawals"] == 2_020_000
+    assert by_weekday["TUE"]["withdrawals_count"] == 0
+    assert [
+        (row["month"], row["deposits"], row["withdrawals"])
+        for row in analytics["by_month"]
+    ] == [
+        ("2021-10", 100_000, 0),
+        ("2021-11", 300_000, 2_025_000),
+    ]
+
+
+def test_analytics_without_postings(user):
+    account = Account.objects.create(customer=user, balance=0)
+    analytics = compute_analytics(account.pk)
+    assert analytics["withdrawals"]["average"] is None
+    assert analytics["by_month"] == []
+
+
+def test_analytics_are_cached_under_the_posting_version(
+    account, django_assert_num_queries
+):
+    with django_assert_num_queries(1):
+        first = account_analytics(account.pk)
+    with django_assert_num_queries(0):
+        assert account_analytics(account.pk) == first
+
+    bulk_insert_transactions(
+        [(uuid.uuid4(), "DEPOSIT", 1, timezone.now(), "", account.pk)]
+    )
+    notify_posted(account.pk)
+    assert account_analytics(account.pk)["deposits"]["count"] == 3
+
+
+def test_evicted_version_does_not_match_cached_analytics(account):
+    account_analytics(account.pk)
+    bulk_insert_transactions(
+        [(uuid.uuid4(), "DEPOSIT", 1, timezone.now(), "", account.pk)]
+    )
+    notify_posted(account.pk)
+    # evicted: a reader must not fall back to the stamp of the first read
+    cache.delete(version_key(account.pk))
+    assert account_analytics(account.pk)["deposits"]["count"] == 3
+
+
+def test_analytics_view(token_client, account):
+    resp = token_client.get(reverse("eightpercent:account-analytics"))
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.data["withdrawals"]["total"] == 2_025_000
+    assert len(resp.data["by_weekday"]) == 7
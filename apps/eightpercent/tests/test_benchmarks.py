@@ -0,0 +1,25 @@
+import pytest
+
+from apps.eightpercent.benchmarks import find_regressions, run_benchmark
+
+pytestmark = pytest.mark.django_db
+
+
+def test_run_benchmark_reports_every_endpoint():
+    result = run_benchmark(users=10, transactions=200, requests=5, warmup=1, seed=1)
+
+    endpoints = result["endpoints"]
+    assert set(endpoints) == {"account", "history", "deposit", "withdraw", "login"}
+    for row in endpoints.values():
+        assert row["requests"] == 5
+        assert row["errors"] == 0
+        assert row["p50_ms"] <= row["p95_ms"] <= row["p99_ms"]
+
+
+def test_find_regressions():
+    baseline = {"endpoints": {"account": {"p95_ms": 10.0, "queries_per_request": 2}}}
+    faster = {"endpoints": {"account": {"p95_ms": 11.0, "queries_per_request": 2}}}
+    slower = {"endpoints": {"account": {"p95_ms": 13.0, "queries_per_request": 3}}}
+
+    assert find_regressions(faster, baseline, threshold=20) == []
+    assert len(find_regressions(slower, baseline, threshold=20)) == 2
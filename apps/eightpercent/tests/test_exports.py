@@ -0,0 +1,99 @@
+import os
+import uuid
+from datetime import datetime, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.utils import timezone
+
+import pyarrow.parquet as pq
+import pytest
+
+from apps.eightpercent.exports import export_accounts, export_transactions
+from apps.eightpercent.imports import import_ledger
+from apps.eightpercent.ledger import bulk_insert_transactions
+from apps.eightpercent.models import ExportWatermark
+
+pytestmark = pytest.mark.django_db
+
+
+def insert(account, *days):
+    bulk_insert_transactions(
+        (
+            uuid.uuid4(),
+            "DEPOSIT",
+            100,
+            timezone.make_aware(datetime(2021, 10, 1) + timedelta(days=day)),
+            "입금",
+            account.pk,
+        )
+        for day in days
+    )
+
+
+def read(root):
+    table = pq.read_table(os.path.join(root, "transactions"))
+    return sorted(
+        zip(table.column("month").to_pylist(), table.column("id").to_pylist())
+    )
+
+
+def test_export_is_incremental(tmp_path, account):
+    root = str(tmp_path)
+    insert(account, 0, 1, 40)
+    assert export_transactions(root, size=2) == (3, 2)
+    assert sorted(os.listdir(tmp_path / "transactions")) == [
+        "month=2021-10",
+        "month=2021-11",
+    ]
+    assert export_transactions(root) == (0, 0)
+
+    insert(account, 41, 45)
+    assert export_transactions(root, size=2) == (2, 1)
+    exported = read(root)
+    assert len(exported) == len(set(exported)) == 5
+    assert [month for month, _ in exported].count("2021-11") == 3
+
+    table = pq.read_table(os.path.join(root, "transactions"))
+    assert table.column("transaction_amount").to_pylist() == [100] * 5
+    assert str(table.schema.field("transaction_date").type) == "timestamp[us, tz=UTC]"
+
+
+def test_recent_postings_wait_for_the_lag(tmp_path, account, settings):
+    settings.LEDGER_EXPORT_LAG = 60
+    now = timezone.make_aware(datetime(2021, 10, 2))
+    insert(account, 0, 1)
+    assert export_transactions(str(tmp_path), now=now) == (1, 1)
+    assert export_transactions(str(tmp_path), now=now + timedelta(minutes=2)) == (1, 1)
+
+
+def test_import_behind_the_watermark_reexports(tmp_path, account):
+    root = str(tmp_path)
+    insert(account, 0, 40)
+    export_transactions(root)
+
+    csv = tmp_path / "ledger.csv"
+    csv.write_text(
+        "account_number,transaction_type,transaction_amount,transaction_date,description\n"
+        f"{account.pk},DEPOSIT,500,2021-11-05T10:00:00,이관\n",
+        encoding="utf-8",
+    )
+    list(import_ledger(str(csv)))
+    assert ExportWatermark.objects.get(name="transactions").dirty_from.month == 11
+
+    assert export_transactions(root) == (2, 1)
+    exported = read(root)
+    assert len(exported) == len(set(exported)) == 3
+
+
+def test_export_accounts(tmp_path, account):
+    assert export_accounts(str(tmp_path), size=1) == 1
+    table = pq.read_table(tmp_path / "accounts.parquet")
+    assert table.column("account_number").to_pylist() == [str(account.pk)]
+    assert table.column("customer_joined_at").to_pylist() == [
+        account.customer.date_joined
+    ]
+
+    out = StringIO()
+    call_command("export_ledger", "--dir", str(tmp_path), stdout=out)
+    assert "1 accounts" in out.getvalue()
@@ -0,0 +1,106 @@
+import threading
+import time
+
+from django.db import connection
+
+import pytest
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from apps.eightpercent import feed
+from apps.eightpercent.ledger import post_transaction
+from apps.eightpercent.models import Account, LedgerEvent
+
+pytestmark = pytest.mark.django_db
+
+
+def deposit(account, amount=1000):
+    return post_transaction(account, "DEPOSIT", amount, "입금")
+
+
+class TestLedgerEvents:
+    def test_posting_writes_event(self, account):
+        posted = deposit(account, 3000)
+        event = LedgerEvent.objects.get()
+        assert event.account_id == account.pk
+        assert event.payload["transaction"] == str(posted.id)
+        assert event.payload["balance"] == 3000
+
+    def test_events_after_cursor(self, token_client, account):
+        deposit(account)
+        deposit(account)
+        first = LedgerEvent.objects.order_by("id").first()
+        url = reverse("eightpercent:events")
+
+        resp = token_client.get(url)
+        assert resp.status_code == status.HTTP_200_OK
+        assert len(resp.data["events"]) == 2
+
+        resp = token_client.get(url, {"after": first.id})
+        assert [event["data"]["balance"] for event in resp.data["events"]] == [2000]
+        assert resp.data["cursor"] == resp.data["events"][-1]["id"]
+
+        resp = token_client.get(url, {"after": resp.data["cursor"], "timeout": 0})
+        assert resp.data["events"] == []
+
+    def test_bad_cursor(self, token_client, account):
+        resp = token_client.get(reverse("eightpercent:events"), {"after": "x"})
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.parametrize("timeout", ["nan", "inf", "-inf"])
+    def test_timeout_must_be_finite(self, token_client, account, timeout):
+        resp = token_client.get(reverse("eightpercent:events"), {"timeout": timeout})
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_event_stream(self, token_client, account, settings):
+        settings.LEDGER_FEED_STREAM_SECONDS = 0.2
+        deposit(account)
+        resp = token_client.get(
+            reverse("eightpercent:events"), HTTP_ACCEPT="text/event-stream"
+        )
+        assert resp.status_code == status.HTTP_200_OK
+        assert resp["Content-Type"] == "text/event-stream"
+        body = b"".join(resp.streaming_content).decode()
+        event_id = LedgerEvent.objects.get().id
+        assert f"id: {event_id}\nevent: POSTED\n" in body
+        resp.close()
+        assert feed._waiters == 0
+
+    def test_waiters_are_capped(self, token_client, account, settings):
+        settings.LEDGER_FEED_MAX_WAITERS = 1
+        url = reverse("eightpercent:events")
+        assert feed.enter_waiter()
+        try:
+            resp = token_client.get(url, {"timeout": 1})
+            assert resp.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+            assert resp["Retry-After"] == str(settings.LEDGER_FEED_RETRY_AFTER)
+            resp = token_client.get(url, HTTP_ACCEPT="text/event-stream")
+            assert resp.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+            # a poll that does not wait is not counted
+            assert token_client.get(url).status_code == status.HTTP_200_OK
+        finally:
+            feed.leave_waiter()
+
+        resp = token_client.get(url, {"timeout": 0.1})
+        assert resp.status_code == status.HTTP_200_OK
+        assert feed._waiters == 0
+
+
+@pytest.mark.django_db(transaction=True)
+def test_long_poll_wakes_on_posting(user, token_client):
+    account = Account.objects.create(customer=user, balance=0)
+
+    def post_later():
+        time.sleep(0.3)
+        try:
+            deposit(account)
+        finally:
+            connection.close()
+
+    poster = threading.Thread(target=post_later)
+    started = time.monotonic()
+    poster.start()
+    resp = token_client.get(reverse("eightpercent:events"), {"timeout": 10})
+    poster.join()
+    assert len(resp.data["events"]) == 1
+    assert time.monotonic() - started < 2
@@ -0,0 +1,86 @@
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from apps.eightpercent.ledger import bulk_insert_transactions
+
+pytestmark = pytest.mark.django_db
+
+
+def _at(day, hour=0):
+    return datetime(2021, 11, day, hour, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def account(account):
+    bulk_insert_transactions(
+        [
+            (uuid.uuid4(), "DEPOSIT", 10000, _at(1, 9), "월급", account.pk),
+            (uuid.uuid4(), "WITHDRAW", 3000, _at(1, 23), "월세", account.pk),
+            (uuid.uuid4(), "WITHDRAW", 500, _at(2, 0), "커피", account.pk),
+            (uuid.uuid4(), "DEPOSIT", 2000, _at(3, 12), "용돈", account.pk),
+        ]
+    )
+    return account
+
+
+def descriptions(client, expected_status=status.HTTP_200_OK, **params):
+    resp = client.get(reverse("eightpercent:transactions"), params)
+    assert resp.status_code == expected_status, resp.data
+    if expected_status != status.HTTP_200_OK:
+        return resp.data
+    return [row["description"] for row in resp.data["results"]]
+
+
+class TestTransactionFilter:
+    def test_half_open_datetime_range(self, token_client, account):
+        result = descriptions(
+            token_client,
+            date_from="2021-11-01T09:00:00Z",
+            date_to="2021-11-02T00:00:00Z",
+            ordering="transaction_date",
+        )
+        assert result == ["월급", "월세"]
+
+    def test_legacy_days_include_end_day(self, token_client, account):
+        result = descriptions(
+            token_client, start_day="2021-11-01", end_day="2021-11-01", ordering="true"
+        )
+        assert result == ["월세", "월급"]
+
+    def test_type_set(self, token_client, account):
+        result = descriptions(
+            token_client, transaction_type="withdraw", ordering="-transaction_date"
+        )
+        assert result == ["커피", "월세"]
+        assert len(descriptions(token_client, transaction_type="DEPOSIT,WITHDRAW")) == 4
+
+    def test_amount_range_with_combined_ordering(self, token_client, account):
+        result = descriptions(
+            token_client,
+            date_from="2021-11-01",
+            date_to="2021-11-04",
+            amount_min=1000,
+            amount_max=10000,
+            ordering="-transaction_amount,transaction_date",
+        )
+        assert result == ["월급", "월세", "용돈"]
+
+    @pytest.mark.parametrize(
+        "params",
+        [
+            {"date_from": "yesterday"},
+            {"transaction_type": "TRANSFER"},
+            {"ordering": "description"},
+            {"date_from": "2021-11-02", "date_to": "2021-11-01"},
+            {"start_day": "2021-11-01", "date_to": "2021-11-02"},
+            {"amount_min": 1000},
+            {"ordering": "transaction_amount", "date_from": "2021-11-01"},
+            {"amount_max": 10, "date_from": "2020-01-01", "date_to": "2021-11-02"},
+        ],
+    )
+    def test_rejected(self, token_client, account, params):
+        descriptions(token_client, status.HTTP_400_BAD_REQUEST, **params)
@@ -0,0 +1,30 @@
+from django.db.models import Q, Sum
+
+import pytest
+
+from apps.eightpercent.generators import generate_ledger
+from apps.eightpercent.models import Account, Transaction
+
+pytestmark = pytest.mark.django_db
+
+
+def test_generate_ledger_keeps_balances_consistent():
+    results = list(generate_ledger(users=30, transactions=600, seed=7, prefix="gen-"))
+
+    assert sum(users for users, _ in results) == 30
+    assert sum(transactions for _, transactions in results) == 600
+    accounts = Account.objects.filter(customer__username__startswith="gen-").annotate(
+        deposits=Sum(
+            "transaction__transaction_amount",
+            filter=Q(transaction__transaction_type="DEPOSIT"),
+        ),
+        withdrawals=Sum(
+            "transaction__transaction_amount",
+            filter=Q(transaction__transaction_type="WITHDRAW"),
+        ),
+    )
+    assert accounts.count() == 30
+    for account in accounts:
+        assert account.balance == (account.deposits or 0) - (account.withdrawals or 0)
+        assert account.balance >= 0
+    assert Transaction.objects.filter(transaction_type="WITHDRAW").exists()
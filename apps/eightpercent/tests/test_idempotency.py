@@ -0,0 +1,204 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.utils import timezone
+
+import pytest
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from apps.core import idempotency
+from apps.core.models import IdempotencyKey
+from apps.core.tasks import prune_idempotency_keys
+from apps.eightpercent.models import Transaction
+
+pytestmark = pytest.mark.django_db
+
+PAYLOAD = {"transaction_amount": 1000, "description": "입금"}
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    cache.clear()
+    idempotency._local.clear()
+
+
+def deposit(client, key, payload=PAYLOAD):
+    return client.post(
+        reverse("eightpercent:deposits"),
+        data=payload,
+        format="json",
+        HTTP_IDEMPOTENCY_KEY=key,
+    )
+
+
+def test_retry_replays_first_response(token_client, account):
+    first = deposit(token_client, "k1")
+    assert first.status_code == status.HTTP_200_OK
+    second = deposit(token_client, "k1")
+    assert second.status_code == status.HTTP_200_OK
+    assert second["Idempotent-Replayed"] == "true"
+    assert second.json() == first.json()
+
+    account.refresh_from_db()
+    assert account.balance == 1000
+    assert Transaction.objects.count() == 1
+    assert IdempotencyKey.objects.get().status == IdempotencyKey.Status.DONE
+
+
+def test_replay_does_not_touch_account(
+    token_client, account, django_assert_num_queries
+):
+    deposit(token_client, "k1")
+    with django_assert_num_queries(0):
+        assert deposit(token_client, "k1").status_code == status.HTTP_200_OK
+
+    # from the table once the caches are gone
+    cache.clear()
+    idempotency._local.clear()
+    token_client.get(reverse("eightpercent:events"))  # warm the auth cache again
+    with django_assert_num_queries(1) as ctx:
+        resp = deposit(token_client, "k1")
+    assert resp["Idempotent-Replayed"] == "true"
+    assert not any("accounts" in q["sql"] for q in ctx.captured_queries)
+
+
+def test_withdraw_keys_are_separate_requests(token_client, account):
+    deposit(token_client, "k1")
+    resp = token_client.post(
+        reverse("eightpercent:withdraw"),
+        data=PAYLOAD,
+        format="json",
+        HTTP_IDEMPOTENCY_KEY="k1",
+    )
+    assert resp.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_key_reused_with_other_body(token_client, account):
+    deposit(token_client, "k1")
+    resp = deposit(token_client, "k1", {**PAYLOAD, "transaction_amount": 5})
+    assert resp.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    account.refresh_from_db()
+    assert account.balance == 1000
+
+
+def test_retry_while_in_flight(token_client, account, user, monkeypatch):
+    # the first attempt holds the row lock
+    monkeypatch.setattr(idempotency, "_lock", lambda keys: None)
+    now = timezone.now()
+    IdempotencyKey.objects.create(
+        user=user,
+        key="k1",
+        request_hash=idempotency.request_hash_of(
+            "POST", reverse("eightpercent:deposits"), PAYLOAD
+        ),
+        created_at=now,
+        expires_at=now + timedelta(days=1),
+    )
+    resp = deposit(token_client, "k1")
+    assert resp.status_code == status.HTTP_409_CONFLICT
+    assert resp["Retry-After"] == "1"
+    account.refresh_from_db()
+    assert account.balance == 0
+
+
+@pytest.mark.parametrize("exists", [True, False])
+def test_retry_while_database_is_locked(token_client, account, user, exists):
+    if connection.features.has_select_for_update:
+        pytest.skip("row locks are used instead")
+    now = timezone.now()
+    if exists:
+        IdempotencyKey.objects.create(
+            user=user,
+            key="k1",
+            request_hash=idempotency.request_hash_of(
+                "POST", reverse("eightpercent:deposits"), PAYLOAD
+            ),
+            created_at=now,
+            expires_at=now + timedelta(days=1),
+        )
+
+    def locked(execute, sql, *args):
+        # another attempt holds SQLite's write lock
+        if sql.startswith(('INSERT INTO "idempotency_keys"', "UPDATE")):
+            raise OperationalError("database is locked")
+        return execute(sql, *args)
+
+    with connection.execute_wrapper(locked):
+        resp = deposit(token_client, "k1")
+    assert resp.status_code == status.HTTP_409_CONFLICT
+    account.refresh_from_db()
+    assert account.balance == 0
+
+
+def test_dead_attempt_is_taken_over(token_client, account, user):
+    # its transaction ended, so the row is unlocked, however recent
+    now = timezone.now()
+    IdempotencyKey.objects.create(
+        user=user,
+        key="k1",
+        request_hash="",
+        created_at=now,
+        expires_at=now + timedelta(days=1),
+    )
+    assert deposit(token_client, "k1").status_code == status.HTTP_200_OK
+    account.refresh_from_db()
+    assert account.balance == 1000
+
+
+def test_expired_local_entry_is_not_replayed(token_client, account):
+    deposit(token_client, "k1")
+    IdempotencyKey.objects.update(expires_at=timezone.now())
+    cache.clear()
+    entry = idempotency._local.get(idempotency.cache_key(account.customer_id, "k1"))
+    entry["expires_at"] = timezone.now()
+
+    resp = deposit(token_client, "k1")
+    assert resp.status_code == status.HTTP_200_OK
+    assert "Idempotent-Replayed" not in resp
+    account.refresh_from_db()
+    assert account.balance == 2000
+
+
+def test_abandoned_attempt_is_taken_over(token_client, account, user):
+    then = timezone.now() - timedelta(minutes=5)
+    IdempotencyKey.objects.create(
+        user=user, key="k1", request_hash="", created_at=then, expires_at=then
+    )
+    assert deposit(token_client, "k1").status_code == status.HTTP_200_OK
+    account.refresh_from_db()
+    assert account.balance == 1000
+
+
+def test_failed_attempt_releases_key(token_client, account, monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError("database went away")
+
+    monkeypatch.setattr("apps.eightpercent.views.DepositViewSet.perform_create", fail)
+    with pytest.raises(RuntimeError):
+        deposit(token_client, "k1")
+    assert not IdempotencyKey.objects.exists()
+    monkeypatch.undo()
+    assert deposit(token_client, "k1").status_code == status.HTTP_200_OK
+
+
+def test_bad_key(token_client, account):
+    assert deposit(token_client, "").status_code == status.HTTP_400_BAD_REQUEST
+    assert deposit(token_client, "k" * 256).status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_prune_expired_keys(user):
+    now = timezone.now()
+    for key, expires_at in (
+        ("old", now - timedelta(seconds=1)),
+        ("new", now + timedelta(days=1)),
+    ):
+        IdempotencyKey.objects.create(
+            user=user, key=key, request_hash="", expires_at=expires_at
+        )
+    assert prune_idempotency_keys(batch_size=1) == 1
+    assert list(IdempotencyKey.objects.values_list("key", flat=True)) == ["new"]
+    call_command("prune_idempotency_keys", stdout=StringIO())
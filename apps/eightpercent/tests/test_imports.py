@@ -0,0 +1,135 @@
+import uuid
+from datetime import date
+from io import BytesIO, StringIO
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+
+import pytest
+
+from apps.eightpercent.imports import import_ledger, parse_row, read_header
+from apps.eightpercent.ledger import post_transaction
+from apps.eightpercent.limits import built_key
+from apps.eightpercent.models import (
+    Account,
+    LedgerImport,
+    ReconciliationCheckpoint,
+    Statement,
+    Transaction,
+)
+from apps.eightpercent.reconciliation import reconcile_ledger
+from test.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+HEADER = "id,account_number,transaction_type,transaction_amount,transaction_date,description\n"
+
+
+@pytest.fixture
+def accounts():
+    return [Account.objects.create(customer=UserFactory(), balance=0) for _ in range(2)]
+
+
+def write_csv(path, lines, header=HEADER):
+    path.write_text(header + "".join(line + "\n" for line in lines), encoding="utf-8")
+    return str(path)
+
+
+def row(account, transaction_type="DEPOSIT", amount=1000, day="2020-01-02", pk=None):
+    return ",".join(
+        (
+            str(pk or uuid.uuid4()),
+            str(account.pk),
+            transaction_type,
+            str(amount),
+            f"{day}T09:00:00",
+            "이관",
+        )
+    )
+
+
+def test_parse_row_rejects(accounts):
+    columns = read_header(BytesIO(HEADER.encode()))
+    for line, reason in (
+        (row(accounts[0], "REFUND"), "unknown transaction_type"),
+        (row(accounts[0], amount="-5"), "positive whole number"),
+        (row(accounts[0], amount="1.5"), "positive whole number"),
+        (row(accounts[0], day="2020-13-01"), "ISO 8601"),
+        ('1,"unterminated', "malformed"),
+        ("1,2", "missing fields"),
+    ):
+        with pytest.raises(ValueError, match=reason):
+            parse_row(line.encode(), columns)
+
+
+def test_import_adds_balances_and_resumes(tmp_path, accounts):
+    first, second = accounts
+    lines = [row(first, amount=1000 * (i + 1)) for i in range(5)]
+    lines += [row(second, amount=500), "", row(second, "WITHDRAW", amount=200)]
+    lines.append(row(Account(account_number=uuid.uuid4())))
+    path = write_csv(tmp_path / "ledger.csv", lines)
+
+    results = import_ledger(path, chunk_size=3)
+    assert next(results) == (3, [])
+    # interrupted after the first chunk
+    results.close()
+    assert Transaction.objects.count() == 3
+
+    results = list(import_ledger(path, chunk_size=3))
+    assert [imported for imported, _ in results] == [3, 1]
+    assert results[-1][1][0][0] == 10  # line of the unknown account
+    assert Transaction.objects.count() == 7
+    balances = dict(Account.objects.values_list("pk", "balance"))
+    assert balances[first.pk] == 15000
+    assert balances[second.pk] == 300
+
+    ledger_import = LedgerImport.objects.get()
+    assert (ledger_import.imported, ledger_import.rejected) == (7, 1)
+    assert ledger_import.finished_at is not None
+    assert list(import_ledger(path)) == []
+    assert not any(result["mismatches"] for result in reconcile_ledger(workers=1))
+
+
+def test_import_invalidates_derived_state(
+    tmp_path, accounts, django_capture_on_commit_callbacks
+):
+    account = accounts[0]
+    post_transaction(account, "DEPOSIT", 5000, "입금")
+    list(reconcile_ledger(workers=1))
+    Statement.objects.create(
+        account=account,
+        month=date(2020, 1, 1),
+        opening_balance=0,
+        closing_balance=0,
+        deposits=0,
+        withdrawals=0,
+        transaction_count=0,
+        etag="x",
+        generated_at="2020-02-01T00:00:00Z",
+    )
+    cache.set(built_key(account.pk), 1)
+    existing = Transaction.objects.get()
+    path = write_csv(
+        tmp_path / "ledger.csv",
+        [row(account, pk=existing.pk), row(account, "WITHDRAW", 2000)],
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        results = list(import_ledger(path))
+    assert results[0][0] == 1
+    assert "already imported" in results[0][1][0][1]
+    assert Account.objects.get(pk=account.pk).balance == 3000
+    assert not ReconciliationCheckpoint.objects.filter(account=account).exists()
+    assert not Statement.objects.exists()
+    assert cache.get(built_key(account.pk)) is None
+
+
+def test_import_command(tmp_path, accounts):
+    path = write_csv(tmp_path / "ledger.csv", [row(accounts[0])])
+    out = StringIO()
+    call_command("import_ledger", path, stdout=out)
+    assert "Imported 1 transactions" in out.getvalue()
+
+    path = write_csv(tmp_path / "bad.csv", [], header="account,amount\n")
+    with pytest.raises(CommandError, match="Missing columns"):
+        call_command("import_ledger", path)
@@ -0,0 +1,76 @@
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+
+import pytest
+
+from apps.eightpercent.interest import (
+    accrue_chunk,
+    accrue_interest,
+    daily_interest,
+    plan_run,
+)
+from apps.eightpercent.ledger import post_transaction
+from apps.eightpercent.models import Account, InterestChunk, LedgerEvent, Transaction
+from apps.eightpercent.reconciliation import reconcile_ledger
+from test.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+DAY = date(2021, 11, 1)
+
+
+@pytest.fixture
+def accounts():
+    accounts = []
+    for balance in (7_300_000, 365_000, 100):
+        account = Account.objects.create(customer=UserFactory(), balance=0)
+        post_transaction(account, "DEPOSIT", balance, "입금")
+        accounts.append(account)
+    return accounts
+
+
+def test_daily_interest_is_exact():
+    balances = [0, 7299, 7300, 10**15]
+    assert daily_interest(balances, Decimal("0.05")).tolist() == [
+        0,
+        0,
+        1,
+        136_986_301_369,
+    ]
+
+
+def test_accrual_posts_each_account_once(accounts):
+    results = list(accrue_interest(DAY, "0.05", size=2))
+    assert sum(interest for _, interest in results) == 1000 + 50
+    balances = dict(Account.objects.values_list("pk", "balance"))
+    assert balances[accounts[0].pk] == 7_301_000
+    assert balances[accounts[1].pk] == 365_050
+    assert balances[accounts[2].pk] == 100
+    assert Transaction.objects.filter(description="이자").count() == 2
+    assert LedgerEvent.objects.count() == 3 + 2
+
+    assert list(accrue_interest(DAY, "0.05", size=2)) == []
+    assert Transaction.objects.count() == 3 + 2
+    results = list(reconcile_ledger(workers=1))
+    assert not any(result["mismatches"] for result in results)
+
+
+def test_resume_after_crash(accounts):
+    run = plan_run(DAY, "0.05", size=1)
+    first = run.interestchunk_set.order_by("pk").first()
+    accrue_chunk(first.pk)
+
+    list(accrue_interest(DAY, "0.05", size=1))
+    assert Transaction.objects.filter(description="이자").count() == 2
+    assert not InterestChunk.objects.filter(posted_at__isnull=True).exists()
+    run.refresh_from_db()
+    assert run.finished_at is not None
+
+
+def test_resume_with_other_rate(accounts):
+    call_command("accrue_interest", date=DAY, rate="0.05", stdout=StringIO())
+    with pytest.raises(CommandError, match="started at"):
+        call_command("accrue_interest", date=DAY, rate="0.04")
@@ -0,0 +1,99 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.utils import timezone
+
+import pytest
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from apps.eightpercent import limits
+from apps.eightpercent.ledger import post_transaction
+from apps.eightpercent.limits import (
+    WithdrawalLimitExceeded,
+    check_withdrawal,
+    record_withdrawal,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def withdraw_limits(settings):
+    cache.clear()
+    limits._local.clear()
+    settings.WITHDRAW_LIMITS = ((3600, 3, None), (86400, None, 10000))
+
+
+@pytest.fixture
+def account(account):
+    post_transaction(account, "DEPOSIT", 100000, "입금")
+    return account
+
+
+def withdraw(client, amount):
+    return client.post(
+        reverse("eightpercent:withdraw"),
+        data={"transaction_amount": amount, "description": "출금"},
+        format="json",
+    )
+
+
+def test_count_limit(token_client, account):
+    codes = [withdraw(token_client, 100).status_code for _ in range(4)]
+    assert codes == [status.HTTP_200_OK] * 3 + [status.HTTP_400_BAD_REQUEST]
+
+
+def test_amount_limit(token_client, account):
+    assert withdraw(token_client, 6000).status_code == status.HTTP_200_OK
+    assert withdraw(token_client, 5000).status_code == status.HTTP_400_BAD_REQUEST
+    assert withdraw(token_client, 4000).status_code == status.HTTP_200_OK
+
+
+def test_warm_check_runs_no_sql(account, django_assert_num_queries):
+    check_withdrawal(account.pk, 100)
+    with django_assert_num_queries(0):
+        check_withdrawal(account.pk, 100)
+
+
+def test_rebuilt_from_the_ledger(account):
+    post_transaction(account, "WITHDRAW", 9000, "출금")
+    # a cold cache, e.g. after a restart
+    cache.clear()
+    limits._local.clear()
+    with pytest.raises(WithdrawalLimitExceeded):
+        check_withdrawal(account.pk, 2000)
+    check_withdrawal(account.pk, 1000)
+
+
+def test_window_slides(account):
+    post_transaction(account, "WITHDRAW", 9000, "출금")
+    now = timezone.now()
+    with pytest.raises(WithdrawalLimitExceeded):
+        check_withdrawal(account.pk, 2000, now)
+    check_withdrawal(account.pk, 2000, now + timedelta(days=1, hours=1))
+
+
+def test_other_processes_are_seen(account):
+    now = timezone.now()
+    check_withdrawal(account.pk, 100, now)
+    # recorded by another process: only the shared cache changes
+    record_withdrawal(account.pk, 9500, now)
+    with pytest.raises(WithdrawalLimitExceeded):
+        check_withdrawal(account.pk, 1000, now)
+
+
+def test_process_local_cache_is_not_trusted(
+    account, settings, django_assert_num_queries
+):
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    now = timezone.now()
+    check_withdrawal(account.pk, 100, now)
+    # posted by another process, whose cache this one does not see
+    post_transaction(account, "WITHDRAW", 9500, "출금")
+    cache.clear()
+    with django_assert_num_queries(1):
+        with pytest.raises(WithdrawalLimitExceeded):
+            check_withdrawal(account.pk, 1000, now)
@@ -0,0 +1,46 @@
+import pytest
+from rest_framework.authtoken.models import Token
+
+from apps.eightpercent.generators import generate_ledger
+from apps.eightpercent.loadtest import check_ledger_integrity, run_load, summarize
+from apps.eightpercent.models import Account
+
+
+@pytest.fixture
+def accounts():
+    list(generate_ledger(users=3, transactions=60, seed=3, prefix="load-"))
+    return Account.objects.filter(customer__username__startswith="load-")
+
+
+@pytest.mark.django_db
+def test_check_ledger_integrity_flags_tampered_balance(accounts):
+    assert check_ledger_integrity(accounts) == []
+
+    tampered = accounts.first()
+    Account.objects.filter(pk=tampered.pk).update(balance=tampered.balance + 1)
+    mismatches = check_ledger_integrity(accounts)
+    assert [row["account_number"] for row in mismatches] == [tampered.pk]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_postings_keep_ledger_consistent(accounts):
+    tokens = list(
+        Token.objects.filter(user__username__startswith="load-").values_list(
+            "key", flat=True
+        )
+    )
+    samples, elapsed = run_load(
+        tokens,
+        processes=1,
+        threads=4,
+        requests=15,
+        mix={"deposit": 0.4, "withdraw": 0.4},
+    )
+    report = summarize(samples, elapsed)
+
+    assert report["requests"] == 60
+    # the shared in-memory test database may answer "table is locked" (500),
+    # but an over-limit withdrawal must never succeed
+    over_limit = report["operations"].get("over_limit", {"statuses": {}})
+    assert not [code for code in over_limit["statuses"] if code < 300]
+    assert check_ledger_integrity(accounts) == []
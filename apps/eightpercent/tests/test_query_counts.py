@@ -0,0 +1,135 @@
+from django.utils import timezone
+
+import pytest
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from apps.eightpercent.ledger import post_transaction
+from apps.eightpercent.models import Transaction
+from apps.eightpercent.statements import generate_statements
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def account(account):
+    account.balance = 10000
+    account.save(update_fields=["balance"])
+    return account
+
+
+class TestAccountQueryCount:
+    def test_get_account(self, token_client, account, django_assert_num_queries):
+        # token + user, account
+        with django_assert_num_queries(2):
+            resp = token_client.get(reverse("eightpercent:account"))
+        assert resp.status_code == status.HTTP_200_OK
+
+    def test_create_account(self, token_client, django_assert_num_queries):
+        # token + user, account lookup, insert
+        with django_assert_num_queries(3):
+            resp = token_client.post(reverse("eightpercent:account"), format="json")
+        assert resp.status_code == status.HTTP_201_CREATED
+
+
+class TestTransactionQueryCount:
+    def test_list_transactions(self, token_client, account, django_assert_num_queries):
+        Transaction.objects.create(
+            account=account,
+            transaction_type=Transaction.TransactionTypes.DEPOSIT,
+            transaction_amount=10000,
+            description="test_deposit",
+        )
+        # token + user, account, count, page
+        with django_assert_num_queries(4):
+            resp = token_client.get(reverse("eightpercent:transactions"))
+        assert resp.status_code == status.HTTP_200_OK
+
+    def test_deposit(self, token_client, account, django_assert_num_queries):
+        payload = {"transaction_amount": 400, "description": "test_deposit"}
+        # token + user, account, savepoint, update balance,
+        # insert transaction, insert event, release
+        with django_assert_num_queries(7):
+            resp = token_client.post(
+                reverse("eightpercent:deposits"), data=payload, format="json"
+            )
+        assert resp.status_code == status.HTTP_200_OK
+
+    def test_withdraw(self, token_client, account, django_assert_num_queries):
+        payload = {"transaction_amount": 400, "description": "test_withdraw"}
+        # token + user, account, recent withdrawals for the limits (first
+        # withdrawal only), savepoint, update balance, insert transaction,
+        # insert event, release
+        with django_assert_num_queries(8):
+            resp = token_client.post(
+                reverse("eightpercent:withdraw"), data=payload, format="json"
+            )
+        assert resp.status_code == status.HTTP_200_OK
+        # the token is cached and the limits are counted in the cache now
+        with django_assert_num_queries(6):
+            resp = token_client.post(
+                reverse("eightpercent:withdraw"), data=payload, format="json"
+            )
+        assert resp.status_code == status.HTTP_200_OK
+
+
+class TestEventQueryCount:
+    def test_events(self, token_client, account, django_assert_num_queries):
+        post_transaction(account, "DEPOSIT", 400, "test_deposit")
+        # token + user, account, events
+        with django_assert_num_queries(3):
+            resp = token_client.get(reverse("eightpercent:events"))
+        assert len(resp.data["events"]) == 1
+
+
+class TestStandingOrderQueryCount:
+    payload = {
+        "transaction_type": "DEPOSIT",
+        "transaction_amount": 500,
+        "description": "적금",
+        "frequency": "WEEKLY",
+    }
+
+    def test_create(self, token_client, account, django_assert_num_queries):
+        # token + user, account, insert
+        with django_assert_num_queries(3):
+            resp = token_client.post(
+                reverse("eightpercent:standing-orders"), self.payload, format="json"
+            )
+        assert resp.status_code == status.HTTP_201_CREATED
+
+    def test_list(self, token_client, account, django_assert_num_queries):
+        url = reverse("eightpercent:standing-orders")
+        for _ in range(3):
+            token_client.post(url, self.payload, format="json")
+        # account, count, page; the token is cached by the posts
+        with django_assert_num_queries(3):
+            resp = token_client.get(url)
+        assert len(resp.data["results"]) == 3
+
+
+class TestStatementQueryCount:
+    @pytest.fixture
+    def month(self, settings, tmp_path, account):
+        settings.PRIVATE_ROOT = str(tmp_path)
+        post_transaction(account, "DEPOSIT", 400, "test_deposit")
+        month = timezone.localdate().replace(day=1)
+        assert sum(generate_statements(month, workers=1)) == 1
+        return month
+
+    def test_list(self, token_client, month, django_assert_num_queries):
+        # token + user, account, count, page
+        with django_assert_num_queries(4):
+            resp = token_client.get(reverse("eightpercent:statements"))
+        assert len(resp.data["results"]) == 1
+
+    def test_download(self, token_client, month, django_assert_num_queries):
+        url = reverse(
+            "eightpercent:statement",
+            kwargs={"year": month.year, "month": month.month, "fmt": "csv"},
+        )
+        # token + user, account, statement
+        with django_assert_num_queries(3):
+            resp = token_client.get(url)
+        assert resp.status_code == status.HTTP_200_OK
+        resp.close()
@@ -0,0 +1,88 @@
+from django.core.cache import cache
+
+import pytest
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from apps.eightpercent.feed import notify_posted, version_key
+from apps.eightpercent.ledger import post_transaction
+from apps.eightpercent.recent import recent_activity, recent_key
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def clear_cache(settings):
+    cache.clear()
+    settings.RECENT_ACTIVITY_SIZE = 3
+
+
+def post(account, transaction_type, amount, capture):
+    with capture(execute=True):
+        return post_transaction(account, transaction_type, amount, "입금")
+
+
+def amounts(postings):
+    return [int(t.transaction_amount) for t in postings]
+
+
+def test_postings_extend_the_cached_entry(
+    account, django_capture_on_commit_callbacks, django_assert_num_queries
+):
+    assert recent_activity(account.pk) == []
+    for amount in (100, 200, 300, 400):
+        post(account, "DEPOSIT", amount, django_capture_on_commit_callbacks)
+    with django_assert_num_queries(0):
+        assert amounts(recent_activity(account.pk)) == [400, 300, 200]
+        assert amounts(recent_activity(account.pk, 2)) == [400, 300]
+
+
+def test_stale_entry_is_rebuilt(
+    account, django_capture_on_commit_callbacks, django_assert_num_queries
+):
+    post(account, "DEPOSIT", 100, django_capture_on_commit_callbacks)
+    recent_activity(account.pk)
+    # a posting that did not extend the entry, like the interest batch
+    post_transaction(account, "DEPOSIT", 200, "이자")
+    notify_posted(account.pk)
+    with django_assert_num_queries(1):
+        assert amounts(recent_activity(account.pk)) == [200, 100]
+
+    cache.delete(recent_key(account.pk))
+    post(account, "WITHDRAW", 50, django_capture_on_commit_callbacks)
+    assert amounts(recent_activity(account.pk)) == [50, 200, 100]
+
+
+def test_evicted_version_does_not_match_old_entries(
+    account, django_capture_on_commit_callbacks
+):
+    post(account, "DEPOSIT", 100, django_capture_on_commit_callbacks)
+    recent_activity(account.pk)
+    # the version is evicted, then bumped by a posting the entry missed;
+    # a counter restarting from 0 would be back at the entry's stamp
+    cache.delete(version_key(account.pk))
+    post_transaction(account, "DEPOSIT", 200, "이자")
+    notify_posted(account.pk)
+    assert amounts(recent_activity(account.pk)) == [200, 100]
+
+
+def test_account_with_recent_activity(
+    token_client,
+    account,
+    django_capture_on_commit_callbacks,
+    django_assert_num_queries,
+):
+    post(account, "DEPOSIT", 1000, django_capture_on_commit_callbacks)
+    url = reverse("eightpercent:account")
+    token_client.get(url, {"recent": ""})
+    # account; the token was cached by the first call
+    with django_assert_num_queries(1):
+        resp = token_client.get(url, {"recent": 2})
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.data["balance"] == "1000"
+    assert resp.data["recent"][0]["transaction_amount"] == "1000"
+    assert "recent" not in token_client.get(url).data
+
+    for recent in ("0", "4", "x"):
+        resp = token_client.get(url, {"recent": recent})
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,103 @@
+import uuid
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.utils import timezone
+
+import pytest
+
+from apps.eightpercent.ledger import bulk_insert_transactions, post_transaction
+from apps.eightpercent.management.commands import reconcile as command
+from apps.eightpercent.models import Account, ReconciliationCheckpoint
+from apps.eightpercent.reconciliation import reconcile_ledger
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def account(account):
+    post_transaction(account, "DEPOSIT", 5000, "입금")
+    post_transaction(account, "WITHDRAW", 2000, "출금")
+    return account
+
+
+def reconcile(**kwargs):
+    results = list(reconcile_ledger(workers=1, **kwargs))
+    return {
+        "checked": sum(result["checked"] for result in results),
+        "advanced": sum(result["advanced"] for result in results),
+        "mismatches": [m for result in results for m in result["mismatches"]],
+    }
+
+
+def test_checkpoint_advances_with_new_activity(account):
+    assert reconcile() == {"checked": 1, "advanced": 1, "mismatches": []}
+    checkpoint = ReconciliationCheckpoint.objects.get()
+    assert checkpoint.balance == 3000
+
+    assert reconcile()["advanced"] == 0
+
+    post_transaction(account, "DEPOSIT", 1000, "입금")
+    assert reconcile()["advanced"] == 1
+    checkpoint.refresh_from_db()
+    assert checkpoint.balance == 4000
+    assert (
+        checkpoint.verified_through
+        == account.transaction_set.latest("transaction_date").transaction_date
+    )
+
+
+def test_only_new_activity_is_summed(account):
+    reconcile()
+    # a checkpoint that claims more than the ledger holds is trusted ...
+    ReconciliationCheckpoint.objects.update(balance=10000)
+    Account.objects.update(balance=10000)
+    assert reconcile()["mismatches"] == []
+    # ... until a full run
+    assert reconcile(full=True)["mismatches"] == [(str(account.pk), 3000, 10000)]
+
+
+def test_mismatch_reported_and_repaired(account):
+    reconcile()
+    Account.objects.update(balance=3007)
+    assert reconcile()["mismatches"] == [(str(account.pk), 3000, 3007)]
+
+    with pytest.raises(CommandError):
+        call_command("reconcile", workers=1, stdout=StringIO())
+    call_command("reconcile", workers=1, repair=True, stdout=StringIO())
+    account.refresh_from_db()
+    assert account.balance == 3000
+    assert reconcile()["mismatches"] == []
+
+
+def test_workers_on_sqlite_warn(monkeypatch):
+    if connection.vendor != "sqlite":
+        pytest.skip("SQLite only")
+    monkeypatch.setattr(command, "reconcile_ledger", lambda **kwargs: [])
+    err = StringIO()
+    call_command("reconcile", stdout=StringIO(), stderr=err)
+    assert err.getvalue() == ""
+    call_command("reconcile", workers=4, stdout=StringIO(), stderr=err)
+    assert "SQLite serializes writers" in err.getvalue()
+
+
+def test_posting_dated_before_checkpoint(account):
+    reconcile()
+    # e.g. written by an app server with a late clock
+    bulk_insert_transactions(
+        [
+            (
+                uuid.uuid4(),
+                "DEPOSIT",
+                500,
+                timezone.now() - timedelta(days=1),
+                "입금",
+                account.pk,
+            )
+        ]
+    )
+    Account.objects.update(balance=3500)
+    assert reconcile() == {"checked": 1, "advanced": 1, "mismatches": []}
+    assert ReconciliationCheckpoint.objects.get().balance == 3500
@@ -0,0 +1,76 @@
+from django.db import connection
+
+import pytest
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from apps.eightpercent.models import Account, Transaction
+from apps.eightpercent.search import install_search_index
+from test.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def search_index():
+    # tests run without migrations; the DDL is rolled back with the test
+    install_search_index(connection, backfill=False)
+
+
+@pytest.fixture
+def account(account):
+    for transaction_type, description in (
+        ("DEPOSIT", "3월 월급입니다"),
+        ("DEPOSIT", "용돈"),
+        ("WITHDRAW", "월세 납부"),
+        ("WITHDRAW", "카드대금 결제"),
+    ):
+        Transaction.objects.create(
+            account=account,
+            transaction_type=transaction_type,
+            transaction_amount=1000,
+            description=description,
+        )
+    return account
+
+
+def search(client, **params):
+    resp = client.get(reverse("eightpercent:transactions"), params)
+    assert resp.status_code == status.HTTP_200_OK
+    return sorted(row["description"] for row in resp.data["results"])
+
+
+class TestTransactionSearch:
+    def test_indexed_term(self, token_client, account):
+        assert search(token_client, q="월급입") == ["3월 월급입니다"]
+
+    def test_short_term_falls_back(self, token_client, account):
+        assert search(token_client, q="월") == ["3월 월급입니다", "월세 납부"]
+
+    def test_all_terms_must_match(self, token_client, account):
+        assert search(token_client, q="카드대금 결제") == ["카드대금 결제"]
+        assert search(token_client, q="카드대금 월급") == []
+
+    def test_combines_with_type(self, token_client, account):
+        assert search(token_client, q="월", transaction_type="withdraw") == ["월세 납부"]
+
+    def test_quotes_are_literal(self, token_client, account):
+        assert search(token_client, q='"월급" OR *') == []
+
+    def test_other_accounts_excluded(self, token_client, account):
+        other = Account.objects.create(customer=UserFactory(), balance=0)
+        Transaction.objects.create(
+            account=other,
+            transaction_type="DEPOSIT",
+            transaction_amount=1000,
+            description="3월 월급입니다",
+        )
+        assert search(token_client, q="월급입니다") == ["3월 월급입니다"]
+
+    def test_index_follows_updates(self, token_client, account):
+        Transaction.objects.filter(description="용돈").update(description="생일 선물")
+        assert search(token_client, q="생일 선물") == ["생일 선물"]
+        Transaction.objects.filter(description="생일 선물").delete()
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT count(*) FROM transactions_fts")
+            assert cursor.fetchone()[0] == 3
@@ -0,0 +1,194 @@
+from datetime import datetime, timedelta
+
+from django.core.cache import cache
+from django.utils import timezone
+
+import pytest
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from apps.eightpercent import limits, standing_orders
+from apps.eightpercent.ledger import post_transaction
+from apps.eightpercent.models import StandingOrder, Transaction
+from apps.eightpercent.standing_orders import (
+    execute_order,
+    next_run,
+    occurrence,
+    run_due_orders,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def account(account):
+    post_transaction(account, "DEPOSIT", 10000, "입금")
+    return account
+
+
+def make_order(account, **kwargs):
+    order = StandingOrder(
+        account=account,
+        transaction_type=kwargs.pop("transaction_type", "WITHDRAW"),
+        transaction_amount=kwargs.pop("transaction_amount", 3000),
+        description="월 상환",
+        frequency=kwargs.pop("frequency", "MONTHLY"),
+        starts_at=kwargs.pop("starts_at", timezone.now() - timedelta(minutes=1)),
+        **kwargs,
+    )
+    order.next_run_at = next_run(order, 0)
+    order.save()
+    return order
+
+
+def test_monthly_occurrences_keep_the_day():
+    order = StandingOrder(
+        frequency="MONTHLY", starts_at=timezone.make_aware(datetime(2021, 1, 31, 9))
+    )
+    days = [timezone.make_naive(occurrence(order, i)).date() for i in range(4)]
+    assert [(d.month, d.day) for d in days] == [(1, 31), (2, 28), (3, 31), (4, 30)]
+    assert timezone.make_naive(occurrence(order, 12)).year == 2022
+
+
+def test_due_order_is_posted_and_rescheduled(account):
+    order = make_order(account)
+    assert run_due_orders() == (1, 0)
+    assert run_due_orders() == (0, 0)
+
+    account.refresh_from_db()
+    assert account.balance == 7000
+    order.refresh_from_db()
+    assert order.runs == 1
+    assert order.next_run_at == occurrence(order, 1)
+
+
+def test_order_is_posted_once_by_concurrent_schedulers(account):
+    order = make_order(account)
+    now = timezone.now()
+    assert execute_order(order, now) is True
+    # a second scheduler that read the same due run
+    assert execute_order(order, now) is None
+    assert Transaction.objects.filter(description="월 상환").count() == 1
+
+
+def test_uncovered_withdrawal_is_skipped(account):
+    order = make_order(account, transaction_amount=20000)
+    assert run_due_orders() == (0, 1)
+    order.refresh_from_db()
+    assert order.last_error == "Balance is not enough."
+    assert order.runs == 1
+    account.refresh_from_db()
+    assert account.balance == 10000
+
+
+def test_withdrawal_over_the_limits_is_skipped(account, settings):
+    cache.clear()
+    limits._local.clear()
+    settings.WITHDRAW_LIMITS = ((86400, None, 5000),)
+    post_transaction(account, "WITHDRAW", 3000, "출금")
+    order = make_order(account)
+    assert run_due_orders() == (0, 1)
+    order.refresh_from_db()
+    assert order.last_error == "At most 5000 withdrawn per 86400s."
+    assert order.runs == 1
+    account.refresh_from_db()
+    assert account.balance == 7000
+
+
+def test_failing_order_does_not_undo_the_batch(account, monkeypatch):
+    first = make_order(account, starts_at=timezone.now() - timedelta(minutes=2))
+    second = make_order(account)
+    post = standing_orders.post_transaction
+
+    def fail_second(account, transaction_type, amount, description):
+        if amount == 4000:
+            raise RuntimeError("connection lost")
+        return post(account, transaction_type, amount, description)
+
+    StandingOrder.objects.filter(pk=second.pk).update(transaction_amount=4000)
+    monkeypatch.setattr(standing_orders, "post_transaction", fail_second)
+    assert run_due_orders() == (1, 1)
+
+    first.refresh_from_db()
+    assert first.runs == 1
+    # claimed, and due again once the lease ends
+    second.refresh_from_db()
+    assert second.runs == 0
+    assert run_due_orders() == (0, 0)
+    later = second.next_run_at + timedelta(seconds=1)
+    monkeypatch.undo()
+    assert run_due_orders(now=later) == (1, 0)
+    second.refresh_from_db()
+    assert second.runs == 1
+    assert second.next_run_at == occurrence(second, 1)
+
+
+def test_crash_after_posting_does_not_post_twice(account, monkeypatch):
+    order = make_order(account)
+    post = standing_orders.post_transaction
+
+    def post_and_crash(*args):
+        post(*args)
+        # the process dies before the run is committed
+        raise SystemExit
+
+    monkeypatch.setattr(standing_orders, "post_transaction", post_and_crash)
+    with pytest.raises(SystemExit):
+        run_due_orders()
+    order.refresh_from_db()
+    assert order.runs == 0
+    assert not Transaction.objects.filter(description="월 상환").exists()
+
+    # another scheduler takes the run over once the lease ends
+    monkeypatch.undo()
+    later = order.next_run_at + timedelta(seconds=1)
+    assert run_due_orders(now=later) == (1, 0)
+    assert run_due_orders(now=later) == (0, 0)
+    assert Transaction.objects.filter(description="월 상환").count() == 1
+    order.refresh_from_db()
+    assert order.runs == 1
+
+
+def test_order_ends(account):
+    order = make_order(account, frequency="DAILY", ends_at=timezone.now())
+    assert run_due_orders() == (1, 0)
+    order.refresh_from_db()
+    assert order.next_run_at is None
+
+
+def test_standing_order_api(token_client, account):
+    url = reverse("eightpercent:standing-orders")
+    resp = token_client.post(
+        url,
+        {
+            "transaction_type": "DEPOSIT",
+            "transaction_amount": 500,
+            "description": "적금",
+            "frequency": "WEEKLY",
+        },
+        format="json",
+    )
+    assert resp.status_code == status.HTTP_201_CREATED
+    assert resp.data["next_run_at"] is not None
+
+    resp = token_client.get(url)
+    orders = resp.data["results"]
+    assert [order["description"] for order in orders] == ["적금"]
+
+    order_url = reverse("eightpercent:standing-order", args=[orders[0]["id"]])
+    assert token_client.delete(order_url).status_code == status.HTTP_204_NO_CONTENT
+    assert StandingOrder.objects.get().next_run_at is None
+
+
+def test_standing_order_api_rejects_bad_amount(token_client, account):
+    resp = token_client.post(
+        reverse("eightpercent:standing-orders"),
+        {
+            "transaction_type": "DEPOSIT",
+            "transaction_amount": 0,
+            "description": "적금",
+            "frequency": "WEEKLY",
+        },
+        format="json",
+    )
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST
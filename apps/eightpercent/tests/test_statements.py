@@ -0,0 +1,164 @@
+import os
+from datetime import date, datetime
+
+from django.core.management import call_command
+from django.utils import timezone
+
+import pytest
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from apps.core.utils import private_storage
+from apps.eightpercent.ledger import post_transaction
+from apps.eightpercent.models import Account, Statement, Transaction
+from apps.eightpercent.statements import (
+    generate_statements,
+    next_month,
+    previous_month,
+    statement_path,
+)
+from test.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+OCTOBER = date(2021, 10, 1)
+NOVEMBER = date(2021, 11, 1)
+
+
+@pytest.fixture(autouse=True)
+def private_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path / "media")
+    settings.PRIVATE_ROOT = str(tmp_path / "private")
+
+
+def post_on(account, transaction_type, amount, day):
+    posted = post_transaction(account, transaction_type, amount, "입금")
+    Transaction.objects.filter(pk=posted.pk).update(
+        transaction_date=timezone.make_aware(datetime.combine(day, datetime.min.time()))
+    )
+
+
+@pytest.fixture
+def account(account):
+    post_on(account, "DEPOSIT", 10000, date(2021, 9, 30))
+    post_on(account, "DEPOSIT", 5000, date(2021, 10, 5))
+    post_on(account, "WITHDRAW", 2000, date(2021, 10, 31))
+    post_on(account, "WITHDRAW", 1000, date(2021, 11, 2))
+    return account
+
+
+def test_month_arithmetic():
+    assert next_month(date(2021, 12, 1)) == date(2022, 1, 1)
+    assert previous_month(date(2022, 1, 1)) == date(2021, 12, 1)
+    assert previous_month(NOVEMBER) == OCTOBER
+
+
+def test_generate_statements(account):
+    assert sum(generate_statements(OCTOBER, workers=1)) == 1
+    statement = Statement.objects.get(account=account, month=OCTOBER)
+    assert statement.opening_balance == 10000
+    assert statement.deposits == 5000
+    assert statement.withdrawals == 2000
+    assert statement.closing_balance == 13000
+    assert statement.transaction_count == 2
+
+    content = private_storage().open(statement_path(account.pk, OCTOBER, "csv")).read()
+    lines = content.decode("utf-8-sig").splitlines()
+    assert lines[0].startswith("transaction_date,")
+    assert lines[1].endswith(",DEPOSIT,5000,15000,입금")
+    assert len(lines) == 3
+    html = private_storage().open(statement_path(account.pk, OCTOBER, "html")).read()
+    assert "13000" in html.decode()
+
+    # the next month opens with the closing balance
+    assert sum(generate_statements(NOVEMBER, workers=1)) == 1
+    assert sum(generate_statements(NOVEMBER, workers=1)) == 0
+    statement = Statement.objects.get(account=account, month=NOVEMBER)
+    assert (statement.opening_balance, statement.closing_balance) == (13000, 12000)
+
+
+def test_regenerate_after_correction(account, tmp_path):
+    assert sum(generate_statements(OCTOBER, workers=1)) == 1
+    etag = Statement.objects.get().etag
+    assert sum(generate_statements(OCTOBER, workers=1)) == 0
+
+    post_on(account, "DEPOSIT", 700, date(2021, 10, 20))
+    # a download that started before the statement is replaced
+    download = private_storage().open(statement_path(account.pk, OCTOBER, "csv"))
+    assert sum(generate_statements(OCTOBER, force=True, accounts=[account.pk])) == 1
+    statement = Statement.objects.get()
+    assert statement.closing_balance == 13700
+    assert statement.etag != etag
+
+    with download:
+        assert len(download.read().decode("utf-8-sig").splitlines()) == 3
+    replaced = private_storage().open(statement_path(account.pk, OCTOBER, "csv"))
+    with replaced:
+        assert len(replaced.read().decode("utf-8-sig").splitlines()) == 4
+    assert sorted(os.listdir(tmp_path / "private" / "statements" / "2021-10")) == [
+        f"{account.pk}.csv",
+        f"{account.pk}.html",
+    ]
+    assert not os.path.exists(tmp_path / "media" / "statements")
+
+
+def test_command_only_renders_given_accounts(account):
+    other = Account.objects.create(customer=UserFactory(), balance=0)
+    call_command("generate_statements", "--month", "2021-10", "--workers", "1")
+    assert Statement.objects.count() == 2
+    call_command(
+        "generate_statements",
+        "--month",
+        "2021-10",
+        "--workers",
+        "1",
+        "--force",
+        "--account",
+        str(other.pk),
+    )
+    assert Statement.objects.filter(account=other).get().generated_at > (
+        Statement.objects.filter(account=account).get().generated_at
+    )
+
+
+def test_download_statement(token_client, account):
+    assert sum(generate_statements(OCTOBER, workers=1)) == 1
+    url = reverse(
+        "eightpercent:statement", kwargs={"year": 2021, "month": 10, "fmt": "csv"}
+    )
+    resp = token_client.get(url, HTTP_ACCEPT="text/csv")
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp["Content-Type"] == "text/csv; charset=utf-8"
+    assert "attachment" in resp["Content-Disposition"]
+    assert b"".join(resp.streaming_content).decode("utf-8-sig").count("\n") == 3
+
+    resp = token_client.get(url, HTTP_IF_NONE_MATCH=resp["ETag"])
+    assert resp.status_code == status.HTTP_304_NOT_MODIFIED
+
+    resp = token_client.get(
+        url.replace(".csv", ".html"), HTTP_IF_NONE_MATCH=resp["ETag"]
+    )
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp["Content-Type"] == "text/html; charset=utf-8"
+
+    resp = token_client.get(reverse("eightpercent:statements"))
+    assert resp.data["results"][0]["month"] == "2021-10"
+
+
+def test_missing_statement(token_client, account):
+    for kwargs in (
+        {"year": 2021, "month": 10, "fmt": "csv"},
+        {"year": 2021, "month": 10, "fmt": "pdf"},
+        {"year": 2021, "month": 13, "fmt": "csv"},
+    ):
+        resp = token_client.get(reverse("eightpercent:statement", kwargs=kwargs))
+        assert resp.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_statement_without_files(token_client, account):
+    assert sum(generate_statements(OCTOBER, workers=1)) == 1
+    private_storage().delete(statement_path(account.pk, OCTOBER, "csv"))
+    url = reverse(
+        "eightpercent:statement", kwargs={"year": 2021, "month": 10, "fmt": "csv"}
+    )
+    assert token_client.get(url).status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,57 @@
+from django.core.cache import cache
+
+import pytest
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from apps.eightpercent.models import Account
+from test.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def test_posting_throttled_per_account(token_client, account, settings):
+    cache.clear()
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        "DEFAULT_THROTTLE_RATES": {"posting": "3/minute", "posting_global": None},
+    }
+    url = reverse("eightpercent:deposits")
+    payload = {"transaction_amount": 100, "description": "입금"}
+    codes = [
+        token_client.post(url, data=payload, format="json").status_code
+        for _ in range(4)
+    ]
+    assert codes == [status.HTTP_200_OK] * 3 + [status.HTTP_429_TOO_MANY_REQUESTS]
+
+    resp = token_client.post(reverse("eightpercent:withdraw"), payload, format="json")
+    assert resp.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert 0 < int(resp["Retry-After"]) <= 60
+    account.refresh_from_db()
+    assert account.balance == 300
+
+
+def test_throttled_account_does_not_drain_global_budget(
+    token_client, account, settings
+):
+    cache.clear()
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        "DEFAULT_THROTTLE_RATES": {"posting": "2/minute", "posting_global": "4/minute"},
+    }
+    url = reverse("eightpercent:deposits")
+    payload = {"transaction_amount": 100, "description": "입금"}
+    codes = [
+        token_client.post(url, data=payload, format="json").status_code
+        for _ in range(6)
+    ]
+    assert codes == [status.HTTP_200_OK] * 2 + [status.HTTP_429_TOO_MANY_REQUESTS] * 4
+
+    # two of the four global tokens are left for everyone else
+    other = UserFactory()
+    Account.objects.create(customer=other, balance=0)
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Token {other.auth_token.key}")
+    resp = client.post(url, data=payload, format="json")
+    assert resp.status_code == status.HTTP_200_OK
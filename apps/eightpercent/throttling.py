@@ -0,0 +1,22 @@
+from apps.core.throttling import LeasedRateThrottle
+
+
+class AccountPostingThrottle(LeasedRateThrottle):
+    """
+    Postings per account, rated by ``DEFAULT_THROTTLE_RATES["posting"]``.
+    A user has one account, so the user identifies it without a query.
+    """
+
+    scope = "posting"
+
+    def get_ident(self, request):
+        return request.user.pk
+
+
+class GlobalPostingThrottle(LeasedRateThrottle):
+    """Postings of all accounts together, rated by ``posting_global``."""
+
+    scope = "posting_global"
+
+    def get_ident(self, request):
+        return "all"
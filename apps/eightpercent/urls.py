@@ -1,8 +1,13 @@
 from django.urls import path
 
 from apps.eightpercent.views import (
+    AccountAnalyticsView,
     AccountView,
     DepositViewSet,
+    LedgerEventView,
+    StandingOrderViewSet,
+    StatementListView,
+    StatementView,
     TransactionView,
     WithdrawView,
 )
@@ -11,6 +16,11 @@ app_name = "eightpercent"
 
 urlpatterns = [
     path("account/", AccountView.as_view(), name="account"),
+    path(
+        "account/analytics/",
+        AccountAnalyticsView.as_view(),
+        name="account-analytics",
+    ),
     path("transactions", TransactionView.as_view(), name="transactions"),
     path(
         "transactions/deposits/",
@@ -18,4 +28,25 @@ urlpatterns = [
         name="deposits",
     ),
     path("transactions/withdraw/", WithdrawView.as_view(), name="withdraw"),
+    path("transactions/events", LedgerEventView.as_view(), name="events"),
+    path(
+        "transactions/standing-orders/",
+        StandingOrderViewSet.as_view({"get": "list", "post": "create"}),
+        name="standing-orders",
+    ),
+    path(
+        "transactions/standing-orders/<int:pk>/",
+        StandingOrderViewSet.as_view({"delete": "destroy"}),
+        name="standing-order",
+    ),
+    path(
+        "transactions/statements/",
+        StatementListView.as_view(),
+        name="statements",
+    ),
+    path(
+        "transactions/statements/<int:year>-<int:month>.<str:fmt>",
+        StatementView.as_view(),
+        name="statement",
+    ),
 ]
@@ -1,10 +1,16 @@
-from datetime import datetime
+from django.core.exceptions import ObjectDoesNotExist
 
 
-def validate_date_type(date: str, format) -> bool:
-    if date is None:
-        return False
+def get_user_account(user):
+    """
+    Return the account of ``user`` or ``None``.
+
+    The reverse one-to-one accessor caches the account on the user instance,
+    so every view and serializer handling the same request shares one lookup.
+    """
+    if user is None or not user.is_authenticated:
+        return None
     try:
-        return bool(datetime.strptime(date, format))
-    except ValueError:
-        return False
+        return user.account
+    except ObjectDoesNotExist:
+        return None
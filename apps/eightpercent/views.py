@@ -1,21 +1,51 @@
-from datetime import datetime, timedelta
+import math
+from datetime import date
 
+from django.conf import settings
 from django.db import transaction
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 
+from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import mixins, status, viewsets
 from rest_framework.generics import CreateAPIView, GenericAPIView, ListAPIView
 from rest_framework.mixins import CreateModelMixin, ListModelMixin
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
-
-from apps.eightpercent.models import Account, Transaction
+from rest_framework.views import APIView
+
+from apps.core.idempotency import idempotent
+from apps.core.throttling import OrderedThrottlesMixin
+from apps.core.utils import private_storage
+from apps.eightpercent.analytics import account_analytics
+from apps.eightpercent.feed import (
+    WaiterStream,
+    enter_waiter,
+    event_stream,
+    leave_waiter,
+    serialize_event,
+    wait_for_events,
+)
+from apps.eightpercent.filters import TransactionFilter
+from apps.eightpercent.models import StandingOrder, Statement, Transaction
+from apps.eightpercent.recent import recent_activity
+from apps.eightpercent.renderers import (
+    EventStreamRenderer,
+    IgnoreClientContentNegotiation,
+)
 from apps.eightpercent.serializers import (
     DepositSerializer,
     ReadAccountSerializer,
+    StandingOrderSerializer,
+    StatementSerializer,
     TransactionSerializer,
     WithdrawSerializer,
 )
-from apps.eightpercent.utils import validate_date_type
+from apps.eightpercent.statements import FORMATS, statement_path
+from apps.eightpercent.throttling import AccountPostingThrottle, GlobalPostingThrottle
+from apps.eightpercent.utils import get_user_account
 
 
 class AccountView(CreateModelMixin, ListModelMixin, GenericAPIView):
@@ -30,14 +60,36 @@ class AccountView(CreateModelMixin, ListModelMixin, GenericAPIView):
     def get(self, request, *args, **kwargs):
         account = self.get_queryset()
         serializer = self.get_serializer(account)
-        return Response(serializer.data)
+        if "recent" not in request.query_params or account is None:
+            return Response(serializer.data)
+
+        # balance and last postings for the home screen, from the cache
+        try:
+            limit = int(request.query_params["recent"] or settings.RECENT_ACTIVITY_SIZE)
+        except ValueError:
+            limit = 0
+        if not 0 < limit <= settings.RECENT_ACTIVITY_SIZE:
+            return Response(
+                {
+                    "error": "recent must be between 1 and "
+                    f"{settings.RECENT_ACTIVITY_SIZE}."
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        recent = recent_activity(account.pk, limit)
+        return Response(
+            {
+                **serializer.data,
+                "recent": TransactionSerializer(recent, many=True).data,
+            }
+        )
 
     def get_queryset(self):
         if self.request.method == "GET":
-            return Account.objects.filter(customer=self.request.user.id).first()
+            return get_user_account(self.request.user)
 
     def create(self, request, *args, **kwargs):
-        has_account = Account.objects.filter(customer=request.user.id).first()
+        has_account = get_user_account(request.user)
         if has_account is None:
             serializer = self.get_serializer(data={})
             if serializer.is_valid():
@@ -55,52 +107,47 @@ class AccountView(CreateModelMixin, ListModelMixin, GenericAPIView):
         serializer.save(customer=self.request.user, balance=0)
 
 
-class TransactionView(ListAPIView):
-    """User Transaction View"""
+class AccountAnalyticsView(APIView):
+    """Deposit and withdrawal statistics of the user's account."""
 
     permission_classes = [IsAuthenticated]
-    queryset = Transaction.objects.all()
-    serializer_class = TransactionSerializer
-
-    def filter_queryset(self, queryset):
-
-        account_number = self.request.user.account
-
-        # get query params
-        transaction_type = self.request.query_params.get("transaction_type")
-        start_day = self.request.query_params.get("start_day")
-        end_day = self.request.query_params.get("end_day")
-        ordering = self.request.query_params.get("ordering")
 
-        filter_kwargs = {"account": account_number}
-
-        if transaction_type in ("DEPOSIT", "WITHDRAW", "deposit", "withdraw"):
-            filter_kwargs["transaction_type"] = transaction_type.upper()
+    def get(self, request, *args, **kwargs):
+        account = get_user_account(request.user)
+        if account is None:
+            return Response(
+                {"error": "Account does not exist."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(account_analytics(account.pk))
 
-        format = "%Y-%m-%d"
-        if all(
-            [validate_date_type(start_day, format), validate_date_type(end_day, format)]
-        ):
-            start_day = datetime.strptime(start_day, format)
-            # add one day to end_day
-            end_day = datetime.strptime(end_day, format) + timedelta(days=1)
-            if end_day > start_day:
-                filter_kwargs["transaction_date__gte"] = start_day
-                filter_kwargs["transaction_date__lte"] = end_day
 
-        queryset = queryset.filter(**filter_kwargs)
+class TransactionView(ListAPIView):
+    """User Transaction View"""
 
-        if (ordering == "True") or (ordering == "true"):
-            queryset = queryset.order_by("-transaction_date")
+    permission_classes = [IsAuthenticated]
+    queryset = Transaction.objects.all()
+    serializer_class = TransactionSerializer
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = TransactionFilter
 
-        return super().filter_queryset(queryset)
+    def get_queryset(self):
+        account = get_user_account(self.request.user)
+        if account is None:
+            return self.queryset.none()
+        return self.queryset.filter(account=account)
 
 
-class DepositViewSet(mixins.CreateModelMixin, viewsets.GenericViewSet):
+class DepositViewSet(
+    OrderedThrottlesMixin, mixins.CreateModelMixin, viewsets.GenericViewSet
+):
     queryset = Transaction.objects.all()
     serializer_class = DepositSerializer
     permission_classes = [IsAuthenticated]
+    # the account's own limit first: a throttled account never reaches the global one
+    throttle_classes = [AccountPostingThrottle, GlobalPostingThrottle]
 
+    @idempotent
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(
             data=request.data,
@@ -113,18 +160,20 @@ class DepositViewSet(mixins.CreateModelMixin, viewsets.GenericViewSet):
         return Response(status=status.HTTP_400_BAD_REQUEST)
 
     def perform_create(self, serializer):
-        account = Account.objects.get(customer=self.request.user.id)
+        account = get_user_account(self.request.user)
         serializer.save(
             account=account,
             transaction_type=Transaction.TransactionTypes.DEPOSIT,
         )
 
 
-class WithdrawView(CreateAPIView):
+class WithdrawView(OrderedThrottlesMixin, CreateAPIView):
     serializer_class = WithdrawSerializer
     queryset = None
     permissions_classes = [IsAuthenticated]
+    throttle_classes = [AccountPostingThrottle, GlobalPostingThrottle]
 
+    @idempotent
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(
             data=request.data,
@@ -136,8 +185,180 @@ class WithdrawView(CreateAPIView):
         return Response(status=status.HTTP_400_BAD_REQUEST)
 
     def perform_create(self, serializer):
-        account = Account.objects.get(customer=self.request.user.id)
+        account = get_user_account(self.request.user)
         serializer.save(
             account=account,
             transaction_type=Transaction.TransactionTypes.WITHDRAW,
         )
+
+
+class LedgerEventView(APIView):
+    """
+    Change feed of the user's ledger.
+
+    Returns the events after the ``after`` cursor (or ``Last-Event-ID``),
+    waiting up to ``timeout`` seconds for one when there are none yet.
+    With ``Accept: text/event-stream`` the events are streamed as
+    Server-Sent Events instead. Waiting requests hold a worker thread, so
+    beyond ``LEDGER_FEED_MAX_WAITERS`` of them they are answered with 503.
+    """
+
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [JSONRenderer, EventStreamRenderer]
+
+    def get(self, request, *args, **kwargs):
+        account = get_user_account(request.user)
+        if account is None:
+            return Response(
+                {"error": "Account does not exist."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            after = int(
+                request.query_params.get("after")
+                or request.META.get("HTTP_LAST_EVENT_ID")
+                or 0
+            )
+            timeout = float(request.query_params.get("timeout", 0))
+            if not math.isfinite(timeout):
+                # NaN slips through min()/max() and would wait forever
+                raise ValueError(timeout)
+        except ValueError:
+            return Response(
+                {"error": "after must be an integer and timeout a number."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        streaming = request.accepted_renderer.format == EventStreamRenderer.format
+        timeout = min(max(timeout, 0), settings.LEDGER_FEED_TIMEOUT)
+        if (streaming or timeout) and not enter_waiter():
+            return Response(
+                {"detail": "Too many feed requests are waiting, retry later."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": str(settings.LEDGER_FEED_RETRY_AFTER)},
+            )
+
+        if streaming:
+            response = StreamingHttpResponse(
+                WaiterStream(
+                    event_stream(account, after, settings.LEDGER_FEED_STREAM_SECONDS)
+                ),
+                content_type=EventStreamRenderer.media_type,
+            )
+            response["Cache-Control"] = "no-cache"
+            # nginx would buffer the stream otherwise
+            response["X-Accel-Buffering"] = "no"
+            return response
+
+        try:
+            events = wait_for_events(account, after, timeout)
+        finally:
+            if timeout:
+                leave_waiter()
+        return Response(
+            {
+                "cursor": events[-1].id if events else after,
+                "events": [serialize_event(event) for event in events],
+            }
+        )
+
+
+class StandingOrderViewSet(
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet,
+):
+    """Standing orders of the user's account; deleting one cancels it."""
+
+    queryset = StandingOrder.objects.all()
+    serializer_class = StandingOrderSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        account = get_user_account(self.request.user)
+        if account is None:
+            return self.queryset.none()
+        return self.queryset.filter(account=account).order_by("-created_at")
+
+    def perform_create(self, serializer):
+        serializer.save(account=get_user_account(self.request.user))
+
+    def perform_destroy(self, instance):
+        # kept as the record of its runs
+        instance.next_run_at = None
+        instance.save(update_fields=["next_run_at"])
+
+
+class StatementListView(ListAPIView):
+    """Monthly statements of the user's account, newest first."""
+
+    serializer_class = StatementSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        account = get_user_account(self.request.user)
+        if account is None:
+            return Statement.objects.none()
+        return Statement.objects.filter(account=account).order_by("-month")
+
+
+class StatementView(APIView):
+    """
+    Downloads the pre-rendered statement of a month as ``csv`` or ``html``.
+
+    The file is streamed from storage as generated, with an ``ETag`` and
+    ``Last-Modified`` so clients revalidate with a 304 and only download a
+    statement again after it was regenerated.
+    """
+
+    permission_classes = [IsAuthenticated]
+    content_negotiation_class = IgnoreClientContentNegotiation
+
+    def get(self, request, year, month, fmt, *args, **kwargs):
+        account = get_user_account(request.user)
+        if account is None:
+            return Response(
+                {"error": "Account does not exist."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            month = date(year, month, 1)
+        except ValueError:
+            month = None
+        statement = (
+            Statement.objects.filter(account=account, month=month)
+            .only("etag", "generated_at")
+            .first()
+        )
+        if fmt not in FORMATS or statement is None:
+            return Response(
+                {"error": "Statement does not exist."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        etag = f'"{statement.etag}-{fmt}"'
+        last_modified = int(statement.generated_at.timestamp())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            try:
+                file = private_storage().open(statement_path(account.pk, month, fmt))
+            except FileNotFoundError:
+                # the row outlived its files, e.g. a storage that was not kept
+                return Response(
+                    {"error": "Statement does not exist."},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+            response = FileResponse(
+                file,
+                as_attachment=fmt == "csv",
+                filename=f"statement-{month:%Y-%m}.{fmt}",
+            )
+            # FileResponse guesses the type again over a text/html one
+            response["Content-Type"] = FORMATS[fmt]
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        response["Cache-Control"] = "private, no-cache"
+        return response
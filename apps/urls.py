@@ -6,6 +6,8 @@ from django.views.generic.base import RedirectView
 
 from rest_framework.routers import DefaultRouter
 
+from apps.core.views import metrics, profile_download
+
 router = DefaultRouter()
 
 api_v1_urls = router.urls
@@ -21,6 +23,12 @@ api_v1_urls += [
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/v1/", include(api_v1_urls)),
+    path("metrics", metrics, name="metrics"),
+    re_path(
+        r"^profiles/(?P<name>[\w-]+\.(?:prof|txt))$",
+        profile_download,
+        name="profile-download",
+    ),
     # the 'api-root' from django rest-frameworks default router
     # http://www.django-rest-framework.org/api-guide/routers/#defaultrouter
     re_path(
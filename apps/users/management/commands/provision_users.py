@@ -0,0 +1,60 @@
+import csv
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.users.provisioning import provision_users
+
+REQUIRED_COLUMNS = ("username", "password")
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk create users, auth tokens and accounts from a CSV file with "
+        "username,password[,email,first_name,last_name] columns"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV file with a header row")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Password hashing processes (defaults to the CPU count)",
+        )
+        parser.add_argument(
+            "--no-accounts",
+            action="store_true",
+            help="Do not create an Account for each user",
+        )
+
+    def handle(self, *args, **kwargs):
+        started = time.perf_counter()
+        with open(kwargs["path"], newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            missing = [
+                name
+                for name in REQUIRED_COLUMNS
+                if name not in (reader.fieldnames or ())
+            ]
+            if missing:
+                raise CommandError(f"Missing columns: {', '.join(missing)}.")
+            created, rejects = provision_users(
+                reader,
+                batch_size=kwargs["batch_size"],
+                workers=kwargs["workers"],
+                create_accounts=not kwargs["no_accounts"],
+            )
+        elapsed = time.perf_counter() - started
+
+        for number, reason in rejects:
+            # after the header row
+            self.stderr.write(f"line {number + 1}: {reason}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Provisioned {created} users in {elapsed:.2f}s "
+                f"({created / elapsed if elapsed else 0:.1f} users/s), "
+                f"{len(rejects)} rows rejected"
+            )
+        )
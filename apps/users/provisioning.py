@@ -0,0 +1,104 @@
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from rest_framework.authtoken.models import Token
+
+from apps.core.parallel import process_pool
+from apps.core.utils import batched
+from apps.eightpercent.models import Account
+
+from .models import User
+from .serializers import ProvisionUserSerializer
+
+USER_FIELDS = ("username", "email", "first_name", "last_name")
+
+
+def bulk_create_users(users, create_accounts=True):
+    """
+    Insert ``users`` (with hashed passwords) and their tokens and accounts.
+
+    ``bulk_create`` sends no ``post_save`` signal, so the tokens normally
+    created by ``create_auth_token`` are inserted here as well.
+    """
+    with transaction.atomic():
+        User.objects.bulk_create(users)
+        Token.objects.bulk_create(
+            Token(key=Token.generate_key(), user=user) for user in users
+        )
+        if create_accounts:
+            Account.objects.bulk_create(
+                Account(customer=user, balance=0) for user in users
+            )
+
+
+def _error(errors):
+    field, messages = next(iter(errors.items()))
+    return f"{field}: {messages[0]}"
+
+
+def validate_batch(batch, seen):
+    """
+    Split numbered ``(number, row)`` pairs into valid rows and ``(number,
+    reason)`` rejects: each row is checked by ``ProvisionUserSerializer``,
+    then against the usernames in ``seen`` (earlier in the file, updated
+    here) and, with one query, against the existing users.
+    """
+    checked, rejects = [], []
+    for number, row in batch:
+        serializer = ProvisionUserSerializer(data=row)
+        if serializer.is_valid():
+            checked.append((number, serializer.validated_data))
+        else:
+            rejects.append((number, _error(serializer.errors)))
+
+    taken = set(
+        User.objects.filter(
+            username__in=[row["username"] for _, row in checked]
+        ).values_list("username", flat=True)
+    )
+    valid = []
+    for number, row in checked:
+        if row["username"] in taken:
+            rejects.append((number, f"username {row['username']!r} already exists"))
+        elif row["username"] in seen:
+            rejects.append((number, f"username {row['username']!r} is repeated"))
+        else:
+            seen.add(row["username"])
+            valid.append(row)
+    rejects.sort()
+    return valid, rejects
+
+
+def provision_users(rows, batch_size=1000, workers=None, create_accounts=True):
+    """
+    Create users, auth tokens and (optionally) accounts in batches.
+
+    ``rows`` is an iterable of dicts with ``username``, ``password`` and the
+    optional ``email``, ``first_name`` and ``last_name`` keys. Each batch is
+    checked by ``validate_batch``, the passwords of the valid rows are
+    hashed across a process pool and the users are written by
+    ``bulk_create_users``. Returns ``(created, rejects)`` with ``rejects``
+    as ``(row number, reason)``, numbered from 1.
+    """
+    created, rejects, seen = 0, [], set()
+    with process_pool(workers) as pool_map:
+        for numbered in batched(enumerate(rows, 1), batch_size):
+            batch, batch_rejects = validate_batch(numbered, seen)
+            rejects.extend(batch_rejects)
+            if not batch:
+                continue
+            passwords = pool_map(
+                make_password,
+                [row["password"] for row in batch],
+                chunksize=max(1, len(batch) // 32),
+            )
+            users = [
+                User(
+                    password=password,
+                    **{field: row.get(field, "") for field in USER_FIELDS},
+                )
+                for row, password in zip(batch, passwords)
+            ]
+            bulk_create_users(users, create_accounts=create_accounts)
+            created += len(users)
+    return created, rejects
@@ -30,3 +30,36 @@ class CreateUserSerializer(serializers.ModelSerializer):
             "email",
         )
         extra_kwargs = {"password": {"write_only": True}}
+
+
+class ProvisionUserSerializer(serializers.Serializer):
+    username = serializers.CharField(
+        max_length=150, validators=[User.username_validator]
+    )
+    password = serializers.CharField(write_only=True)
+    email = serializers.EmailField(required=False, allow_blank=True, default="")
+    first_name = serializers.CharField(
+        max_length=150, required=False, allow_blank=True, default=""
+    )
+    last_name = serializers.CharField(
+        max_length=150, required=False, allow_blank=True, default=""
+    )
+
+
+class BulkProvisionSerializer(serializers.Serializer):
+    users = ProvisionUserSerializer(many=True, allow_empty=False)
+    create_accounts = serializers.BooleanField(default=True)
+
+    def validate_users(self, users):
+        # one query for the whole cohort instead of a unique check per row
+        usernames = [user["username"] for user in users]
+        if len(set(usernames)) != len(usernames):
+            raise serializers.ValidationError("Usernames must be unique.")
+        taken = User.objects.filter(username__in=usernames).values_list(
+            "username", flat=True
+        )
+        if taken:
+            raise serializers.ValidationError(
+                f"Usernames already exist: {', '.join(sorted(taken))}"
+            )
+        return users
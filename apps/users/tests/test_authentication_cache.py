@@ -0,0 +1,63 @@
+from django.core.cache import cache
+
+import pytest
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.core.authentications import CachedJWTCookieAuthentication
+from apps.core.caches import token_cache_key, user_cache_key
+
+pytestmark = pytest.mark.django_db
+
+
+class TestCachedTokenAuthentication:
+    def test_warm_request_skips_auth_queries(
+        self, token_client, user, django_assert_num_queries
+    ):
+        url = reverse("users:user-detail", args=[user.id])
+        token_client.get(url)
+        # user only, token and user come from the cache
+        with django_assert_num_queries(1):
+            resp = token_client.get(url)
+        assert resp.status_code == status.HTTP_200_OK
+
+    def test_deleted_token_is_rejected(self, token_client, user):
+        url = reverse("users:user-detail", args=[user.id])
+        token_client.get(url)
+        user.auth_token.delete()
+        resp = token_client.get(url)
+        assert resp.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_deactivated_user_is_rejected(self, token_client, user):
+        url = reverse("users:user-detail", args=[user.id])
+        token_client.get(url)
+        user.is_active = False
+        user.save()
+        resp = token_client.get(url)
+        assert resp.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_password_change_drops_cached_user(self, token_client, user):
+        token_client.get(reverse("users:user-detail", args=[user.id]))
+        assert cache.get(user_cache_key(user.pk)) is not None
+        user.set_password("new-password")
+        user.save()
+        assert cache.get(user_cache_key(user.pk)) is None
+
+    def test_process_local_cache_is_not_used(self, token_client, user, settings):
+        settings.CACHES = {
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        }
+        resp = token_client.get(reverse("users:user-detail", args=[user.id]))
+        assert resp.status_code == status.HTTP_200_OK
+        assert cache.get(token_cache_key(user.auth_token.key)) is None
+        assert cache.get(user_cache_key(user.pk)) is None
+
+
+class TestCachedJWTCookieAuthentication:
+    def test_warm_lookup_skips_queries(self, user, django_assert_num_queries):
+        authentication = CachedJWTCookieAuthentication()
+        token = AccessToken.for_user(user)
+        authentication.get_user(token)
+        with django_assert_num_queries(0):
+            assert authentication.get_user(token) == user
@@ -0,0 +1,131 @@
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+
+import pytest
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from apps.eightpercent.models import Account
+from apps.users.models import User
+from apps.users.provisioning import provision_users
+from test.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def make_rows(size):
+    return [
+        {
+            "username": f"cohort-{n}",
+            "email": f"cohort-{n}@test.com",
+            "password": f"P@s$w0rd-{n}",
+        }
+        for n in range(size)
+    ]
+
+
+class TestProvisionUsers:
+    def test_creates_users_tokens_and_accounts(self):
+        created, rejects = provision_users(make_rows(25), batch_size=10, workers=1)
+
+        assert (created, rejects) == (25, [])
+        assert User.objects.filter(username__startswith="cohort-").count() == 25
+        assert Token.objects.filter(user__username__startswith="cohort-").count() == 25
+        assert (
+            Account.objects.filter(customer__username__startswith="cohort-").count()
+            == 25
+        )
+        assert User.objects.get(username="cohort-3").check_password("P@s$w0rd-3")
+
+    def test_without_accounts(self):
+        provision_users(make_rows(3), workers=1, create_accounts=False)
+        assert not Account.objects.filter(
+            customer__username__startswith="cohort-"
+        ).exists()
+
+    def test_rejects_invalid_rows(self, user):
+        rows = make_rows(4)
+        rows[1]["username"] = user.username
+        rows[2] = {"username": "cohort-2"}
+        rows[3]["username"] = "cohort-0"
+        created, rejects = provision_users(rows, workers=1)
+
+        assert created == 1
+        assert rejects == [
+            (2, f"username {user.username!r} already exists"),
+            (3, "password: This field is required."),
+            (4, "username 'cohort-0' is repeated"),
+        ]
+        assert list(
+            User.objects.filter(username__startswith="cohort-").values_list(
+                "username", flat=True
+            )
+        ) == ["cohort-0"]
+
+
+class TestProvisionUsersCommand:
+    def test_reports_rejected_rows(self, tmp_path):
+        path = tmp_path / "users.csv"
+        path.write_text(
+            "username,password,email\n"
+            "cohort-0,P@s$w0rd,cohort-0@test.com\n"
+            "cohort-1,P@s$w0rd,not-an-email\n"
+        )
+        out, err = StringIO(), StringIO()
+        call_command("provision_users", str(path), workers=1, stdout=out, stderr=err)
+
+        assert "Provisioned 1 users" in out.getvalue()
+        assert "1 rows rejected" in out.getvalue()
+        assert err.getvalue() == "line 3: email: Enter a valid email address.\n"
+
+    def test_requires_columns(self, tmp_path):
+        path = tmp_path / "users.csv"
+        path.write_text("username,email\ncohort-0,cohort-0@test.com\n")
+        with pytest.raises(CommandError, match="Missing columns: password"):
+            call_command("provision_users", str(path), workers=1)
+
+
+class TestBulkProvisionView:
+    @pytest.fixture
+    def admin_client(self):
+        admin = UserFactory(username="admin", email="admin@test.com", is_staff=True)
+        client = APIClient()
+        client.force_authenticate(admin)
+        return client
+
+    def test_bulk_create(self, admin_client):
+        resp = admin_client.post(
+            reverse("users:user-bulk"), data={"users": make_rows(5)}, format="json"
+        )
+        assert resp.status_code == status.HTTP_201_CREATED
+        assert resp.data["created"] == 5
+        assert (
+            Account.objects.filter(customer__username__startswith="cohort-").count()
+            == 5
+        )
+
+    def test_bulk_create_rejects_existing_username(self, admin_client, user):
+        rows = make_rows(2) + [{"username": user.username, "password": "1234"}]
+        resp = admin_client.post(
+            reverse("users:user-bulk"), data={"users": rows}, format="json"
+        )
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+        assert not User.objects.filter(username__startswith="cohort-").exists()
+
+    def test_bulk_create_rejects_invalid_username(self, admin_client):
+        rows = make_rows(2) + [{"username": "bad name!", "password": "1234"}]
+        resp = admin_client.post(
+            reverse("users:user-bulk"), data={"users": rows}, format="json"
+        )
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+        assert "username" in resp.data["users"][2]
+        assert not User.objects.filter(username__startswith="cohort-").exists()
+
+    def test_bulk_create_requires_staff(self, token_client):
+        resp = token_client.post(
+            reverse("users:user-bulk"), data={"users": make_rows(1)}, format="json"
+        )
+        assert resp.status_code == status.HTTP_403_FORBIDDEN
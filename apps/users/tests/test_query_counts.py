@@ -0,0 +1,64 @@
+import pytest
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.reverse import reverse
+
+pytestmark = pytest.mark.django_db
+
+
+class TestUserViewSetQueryCount:
+    def test_list(self, token_client, django_assert_num_queries):
+        # token + user, count, page
+        with django_assert_num_queries(3):
+            resp = token_client.get(reverse("users:user-list"))
+        assert resp.status_code == status.HTTP_200_OK
+
+    def test_retrieve(self, token_client, user, django_assert_num_queries):
+        # token + user, user
+        with django_assert_num_queries(2):
+            resp = token_client.get(reverse("users:user-detail", args=[user.id]))
+        assert resp.status_code == status.HTTP_200_OK
+
+    def test_create(self, no_auth_client, django_assert_num_queries, settings):
+        settings.TASKS_ALWAYS_EAGER = False
+        payload = {
+            "username": "guest10",
+            "email": "guest10@guest.com",
+            "password": "rkskekfkakqktk",
+        }
+        # unique username, insert user, insert token
+        with django_assert_num_queries(3):
+            resp = no_auth_client.post(
+                reverse("users:user-list"), data=payload, format="json"
+            )
+        assert resp.status_code == status.HTTP_201_CREATED
+        # without a task worker
+        assert Token.objects.filter(user__username="guest10").exists()
+
+    def test_partial_update(self, token_client, user, django_assert_num_queries):
+        # token + user, user, update
+        with django_assert_num_queries(3):
+            resp = token_client.patch(
+                reverse("users:user-detail", args=[user.id]),
+                data={"first_name": "test"},
+                format="json",
+            )
+        assert resp.status_code == status.HTTP_200_OK
+
+    @pytest.mark.parametrize("size", [1, 20])
+    def test_bulk(self, token_client, user, django_assert_num_queries, size):
+        user.is_staff = True
+        user.save(update_fields=["is_staff"])
+        rows = [
+            {"username": f"cohort-{n}", "password": f"P@s$w0rd-{n}"}
+            for n in range(size)
+        ]
+        # token + user, taken usernames, taken again when inserting (a
+        # concurrent request may have taken some), savepoint, insert users,
+        # tokens and accounts, release; the same for any number of rows
+        with django_assert_num_queries(8):
+            resp = token_client.post(
+                reverse("users:user-bulk"), data={"users": rows}, format="json"
+            )
+        assert resp.status_code == status.HTTP_201_CREATED
+        assert resp.data["created"] == size
@@ -1,10 +1,17 @@
-from rest_framework import viewsets
-from rest_framework.permissions import AllowAny, IsAuthenticatedOrReadOnly
+import time
+
+from django.conf import settings
+
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticatedOrReadOnly
+from rest_framework.response import Response
 
 from apps.core.serializers import ChooseSerializerClassMixin
 
 from .models import User
-from .serializers import CreateUserSerializer, UserSerializer
+from .provisioning import provision_users
+from .serializers import BulkProvisionSerializer, CreateUserSerializer, UserSerializer
 
 
 class UserViewSet(ChooseSerializerClassMixin, viewsets.ModelViewSet):
@@ -15,9 +22,37 @@ class UserViewSet(ChooseSerializerClassMixin, viewsets.ModelViewSet):
         "create": CreateUserSerializer,
         "update": CreateUserSerializer,
         "partial_update": CreateUserSerializer,
+        "bulk": BulkProvisionSerializer,
     }
 
     def get_permissions(self):
         if self.action in ["create", "update", "partial_update"]:
             self.permission_classes = [AllowAny]
+        if self.action == "bulk":
+            self.permission_classes = [IsAdminUser]
         return super().get_permissions()
+
+    @action(detail=False, methods=["post"])
+    def bulk(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        started = time.perf_counter()
+        created, rejects = provision_users(
+            serializer.validated_data["users"],
+            create_accounts=serializer.validated_data["create_accounts"],
+            workers=settings.PROVISION_USERS_WORKERS,
+        )
+        elapsed = time.perf_counter() - started
+        return Response(
+            {
+                "created": created,
+                # rows taken by a concurrent request since validation
+                "rejected": [
+                    {"row": number, "reason": reason} for number, reason in rejects
+                ],
+                "elapsed": round(elapsed, 3),
+                "users_per_second": round(created / elapsed, 1) if elapsed else None,
+            },
+            status=status.HTTP_201_CREATED,
+        )
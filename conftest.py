@@ -33,6 +33,14 @@ def client(user):
     return client
 
 
+@pytest.fixture
+def token_client(user):
+    headers = {"HTTP_AUTHORIZATION": f"Token {user.auth_token.key}"}
+    client = APIClient()
+    client.credentials(**headers)
+    return client
+
+
 @pytest.fixture
 def no_auth_client():
     client = APIClient()
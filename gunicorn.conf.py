@@ -0,0 +1,9 @@
+import os
+
+# Threaded workers: a ledger feed request waits on its thread instead of
+# blocking a whole process (see LEDGER_FEED_MAX_WAITERS)
+worker_class = "gthread"
+workers = int(os.getenv("GUNICORN_WORKERS", 2))
+threads = int(os.getenv("GUNICORN_THREADS", 8))
+# longer than the longest feed request
+timeout = 60